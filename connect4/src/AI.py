@@ -1,7 +1,68 @@
 """This module provides AI for Connect 4.
 This AI uses minimax algorithm with alpha-beta pruning to evaluate the best possible moves."""
 
-import time
+import os
+from collections import namedtuple
+from position import Position
+from bitboard import WIDTH, SIZE, STRIDE, COLUMN_MASKS, grid_to_bitboard, has_four, winning_cells
+from book import OpeningBook
+from evaluation import evaluate
+from solver import Solver
+from timing import TimeManager, SearchTimeout, TIME, DEPTH, SOLVED
+from transposition import TranspositionTable, EXACT, LOWER, bound_flag
+
+# Positions with at least this many markers are solved exactly instead of searched
+SOLVE_FROM = 16
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+# Moves are ordered by the threats they create from this depth up; below it only the history table is used,
+# because counting the threats of a move costs about as much as searching it
+ORDER_DEPTH = 2
+# Half width of the aspiration window around the score of the previous iteration
+ASPIRATION = 15
+
+# Result of a search: chosen column, its score, deepest finished depth, the statistics of the search,
+# the principal variation, the columns of the line both players are expected to play from the chosen column on,
+# and the limit that ended the search (TIME, NODES, DEPTH or SOLVED from timing.py)
+SearchResult = namedtuple("SearchResult", ["col", "score", "depth", "stats", "pv", "limit"])
+
+class SearchControl:
+
+    """ Class for what controls the AI's searches: the clock, the limits and the statistics.
+
+    Attributes:
+        clock: TimeManager with the time and node limits
+        max_depth: deepest depth to search on every move, None for no limit
+        stats: SearchStats filled during every search, None to not collect statistics """
+
+    def __init__(self):
+
+        """ Constructor for the class. """
+
+        self.clock = TimeManager(5)
+        self.max_depth = None
+        self.stats = None
+
+    def start(self, moves):
+
+        """ Starts the clock and resets the statistics for a new search.
+
+        Args:
+            moves: number of markers in the position to search """
+
+        self.clock.start(moves)
+        if self.stats is not None:
+            self.stats.reset()
+
+    def stop(self):
+
+        """ Stops the clock after a search.
+
+        Returns:
+            summary of the statistics of the search, None if statistics are not collected """
+
+        self.clock.stop()
+        return self.stats.summary() if self.stats is not None else None
+
 
 class AI:
 
@@ -12,43 +73,258 @@ class AI:
         """ Constructor for the class. """
 
         self.columns = [3,2,4,1,5,0,6]
-        self.last_cell = (-1, -1)
-        self.time_limit = 5
-        self.best_moves = {}
-        self.start_time = None
+        self.control = SearchControl()
+        self.table = TranspositionTable()
+        self.nodes = 0
+        self.parallel = None
+        self.history = [[0] * (WIDTH * STRIDE) for _ in range(3)]
+        self.solver = Solver()
+        if os.path.exists(BOOK_PATH):
+            self.solver.book = OpeningBook(BOOK_PATH)
+
+    @property
+    def columns(self):
+
+        """ Order in which columns are searched. """
+
+        return self.orders[None]
+
+    @columns.setter
+    def columns(self, columns):
+
+        """ Sets the order in which columns are searched.
+            The order is also stored with every column moved to the front, so the
+            search can try the best move from the transposition table first
+            without building a new list at every node.
+
+        Args:
+            columns: list of columns in search order """
+
+        self.orders = {None: columns}
+        for col in columns:
+            self.orders[col] = [col] + [other for other in columns if other != col]
+
+    @property
+    def time_limit(self):
+
+        """ Seconds the AI may think on every move. """
+
+        return self.control.clock.time_limit
+
+    @time_limit.setter
+    def time_limit(self, time_limit):
+
+        """ Sets the seconds the AI may think on every move.
+
+        Args:
+            time_limit: seconds for every move """
+
+        self.control.clock.time_limit = time_limit
+
+    @property
+    def max_nodes(self):
+
+        """ Nodes the AI may search on every move, None for no limit. """
+
+        return self.control.clock.max_nodes
+
+    @max_nodes.setter
+    def max_nodes(self, max_nodes):
+
+        """ Sets the nodes the AI may search on every move.
+            The nodes are counted the same way on every machine, so with a node
+            or depth limit and no time limit the AI always plays the same moves.
+
+        Args:
+            max_nodes: nodes for every move, None for no limit """
+
+        self.control.clock.max_nodes = max_nodes
 
     def play(self, grid):
 
         """ Function for AI playing a turn.
             Runs the minimax algorithm until time limit has been reached.
+            The transposition table is kept between turns, so later searches
+            can reuse positions that were already searched.
+            The search also stops at max_depth or max_nodes if they are set, whichever limit comes first.
+            If a parallel search has been set, the columns are searched by its workers instead.
+            Late in the game, or early when the opening book covers the next move, the position
+            is solved exactly. The solver may use half of the time and the nodes, and if
+            it doesn't finish, the position is searched with the rest.
 
         Args:
             grid: current game situation in grid form
 
         Returns:
-            best_col: the column where the AI has chosen to place the next marker """
+            best_col: the column where the AI has chosen to place the next marker
+            score: 1000 if the AI can force a win, -1000 if the opponent can, otherwise
+                   the heuristic score of the position (0 for a solved draw) """
 
-        self.start_time = time.time()
-        self.best_moves = {}
+        result = self.search(grid)
+        return result.col, result.score
 
-        best_col = None
-        for depth in range(1, 100):
-            if time.time() - self.start_time > self.time_limit:
+    def search(self, grid):
+
+        """ Searches the best move like play, but returns more about the search.
+            If the AI has a SearchStats object in stats, it is reset and filled
+            during the search. Without one no statistics are collected.
+
+        Args:
+            grid: current game situation in grid form
+
+        Returns:
+            SearchResult with the best column, its score, the deepest finished depth
+            and a summary of the statistics (None if statistics are not collected) """
+
+        return self.search_position(Position.from_grid(grid, 2))
+
+    def search_position(self, position, max_depth=None):
+
+        """ Searches the best move in a position where player 2 is to move.
+
+        Args:
+            position: position to search, it is the same after the search
+            max_depth: deepest depth of the iterative deepening, the AI's max_depth if not given
+
+        Returns:
+            SearchResult of the search """
+
+        self.nodes = 0
+        self.control.start(position.moves)
+
+        if self.solver is not None and (position.moves >= SOLVE_FROM or self.solver.in_book(position, 1)):
+            self.solver.clock = self.control.clock
+            try:
+                best_col, score = self.solver.best_move(position)
+            except SearchTimeout:
+                # The solver only had part of the time and the nodes, the search gets the rest
+                self.nodes = self.solver.nodes
+                self.control.clock.restart()
+            else:
+                self.nodes = self.solver.nodes
+                score = 1000 if score > 0 else -1000 if score < 0 else 0
+                return self.result(best_col, score, 42 - position.moves, [best_col], SOLVED)
+
+        max_depth = max_depth if max_depth is not None else self.control.max_depth
+        if self.parallel is not None:
+            max_nodes = self.max_nodes - self.nodes if self.max_nodes is not None else None
+            budget = self.control.clock.budget
+            best_col, score, depth, limit = self.parallel.search(position, budget, max_depth, max_nodes)
+            self.nodes += self.parallel.nodes
+            return self.result(best_col, score, depth, [best_col], limit)
+
+        best_col, score, depth, limit = self.deepen(position, max_depth)
+        return self.result(best_col, score, depth, self.principal_variation(position, best_col, depth), limit)
+
+    def deepen(self, position, max_depth=None, window=ASPIRATION):
+
+        """ Iterative deepening: searches one depth deeper at a time until the time runs out.
+            An iteration that is stopped by the clock is thrown away, and a new one
+            is only started if the clock predicts that it can finish.
+            Every iteration after the first starts with an aspiration window around
+            the score of the previous one. If the score falls outside the window,
+            the iteration is searched again with that side of the window open.
+
+        Args:
+            position: position where the AI is to move
+            max_depth: deepest depth to search, all the remaining moves if not given
+            window: half width of the aspiration window, None to always search with the full window
+
+        Returns:
+            best_col: best column of the deepest finished iteration
+            score: score of that column
+            depth: deepest finished depth
+            limit: limit that ended the search, DEPTH if every depth was finished """
+
+        max_depth = min(max_depth, SIZE - position.moves) if max_depth is not None else SIZE - position.moves
+        self.history = [[0] * (WIDTH * STRIDE) for _ in range(3)]
+        best_col, score, finished, limit = None, 0, 0, DEPTH
+        for depth in range(1, max_depth + 1):
+            if not self.control.clock.can_finish():
+                limit = TIME
+                break
+            alpha, beta = float('-inf'), float('inf')
+            # A forced result doesn't change with depth, so there is nothing to aim the window at
+            if window is not None and finished and abs(score) < 1000:
+                alpha, beta = score - window, score + window
+            try:
+                while True:
+                    depth_score, col = self.minimax(position, depth, alpha, beta, is_maximizing=True)
+                    if depth_score <= alpha:
+                        alpha = float('-inf')
+                    elif depth_score >= beta:
+                        beta = float('inf')
+                    else:
+                        break
+            except SearchTimeout as timeout:
+                limit = timeout.args[0] if timeout.args else TIME
                 break
-            score, col = self.minimax(grid, depth, float('-inf'), float('inf'), is_maximizing=True)
+            self.control.clock.iteration_done()
+            finished = depth
+            score = depth_score
             if col is not None:
                 best_col = col
+            if self.control.stats is not None:
+                self.control.stats.iteration(depth, score, col)
+        return best_col, score, finished, limit
 
-        print(f'Depth: {depth}, Time: {time.time()-self.start_time}')
-        return best_col, score
+    def result(self, best_col, score, depth, pv, limit):
 
-    def minimax(self, grid, depth, alpha, beta, is_maximizing):
+        """ Collects the result of a search.
+
+        Args:
+            best_col: chosen column
+            score: score of the chosen column
+            depth: deepest finished depth
+            pv: principal variation starting with the chosen column
+            limit: limit that ended the search
+
+        Returns:
+            SearchResult of the search """
+
+        summary = self.control.stop()
+        return SearchResult(best_col, score, depth, summary, pv, limit)
+
+    def principal_variation(self, position, best_col, depth):
+
+        """ Follows the best moves stored in the transposition table from the chosen column on.
+            The line ends where the table has no move for a position, where the game
+            ends or after depth moves. Entries can be replaced by other positions,
+            so the end of a long line may be shorter than the search depth.
+
+        Args:
+            position: position that was searched, it is the same afterwards
+            best_col: column chosen by the search
+            depth: depth of the search
+
+        Returns:
+            pv: list of columns, empty if no column was chosen """
+
+        pv, played = [], []
+        col = best_col
+        while col is not None and len(pv) < depth and position.can_play(col):
+            pv.append(col)
+            if position.is_winning_move(col) or position.moves + 1 == SIZE:
+                break
+            position.play(col)
+            played.append(col)
+            hashed = position.canonical_hash()
+            entry = self.table.probe(hashed[0])
+            col = None
+            if entry is not None and entry[3] is not None:
+                col = 6 - entry[3] if hashed[1] else entry[3]
+        for col in reversed(played):
+            position.undo(col)
+        return pv
+
+    def minimax(self, position, depth, alpha, beta, is_maximizing):
 
         """ Minimax algorithm with alpha-beta pruning.
             Evaluates potential moves to determine the best possible move.
+            Moves are played and taken back on the same position object.
 
         Args:
-            grid: current or simulated game situation in grid form
+            position: current or simulated game situation as a position
             depth: remaining depth to explore in the game tree
             alpha: best score the maximizer can guarantee so far
             beta: best score the minimizer can guarantee so far
@@ -57,107 +333,258 @@ class AI:
 
         Returns:
             score: evaluated score of the move at this depth
-            best_col: column index of the best move found at this depth  """
+            best_col: column index of the best move found at this depth
 
-        if time.perf_counter() - self.start_time > self.time_limit:
-            timeout = True
-        else: timeout = False
+        Raises:
+            SearchTimeout: if the clock runs out, before anything is stored for unfinished nodes """
 
-        if depth == 0 or self.check_win(self.last_cell[0], self.last_cell[1], grid) or not self.get_valid_columns(grid):
-            return self.evaluate_grid(grid), None
+        self.nodes += 1
+        if self.control.stats is not None:
+            self.control.stats.node(position.moves)
+        if self.nodes % self.control.clock.interval == 0:
+            self.control.clock.check(self.nodes)
 
-        valid_columns = self.get_valid_columns(grid)
-        hash_grid = self.hash_grid(grid)
-        best = self.best_moves.get(hash_grid)
-        if best is not None:
-            valid_columns.remove(best)
-            valid_columns.insert(0, best)
+        if position.moves == SIZE:
+            return 0, None
 
-        if is_maximizing:
-            max_score = float('-inf')
-            best_col = None
-            for col in valid_columns:
-                temp_grid = self.simulate_move(grid, col, 2)
-                if self.check_win(self.last_cell[0], self.last_cell[1], temp_grid):
-                    return 1000, col
-                if not timeout:
-                    score, _ = self.minimax(temp_grid, depth-1, alpha, beta, False)
-                    if score > max_score:
-                        max_score = score
-                        best_col = col
-                    alpha = max(alpha, score)
-                    if beta <= alpha:
-                        break
-            self.best_moves[hash_grid] = best_col
-            return max_score, best_col
+        # The parent only plays moves that don't let the opponent win, so the game is still open here
+        if depth == 0:
+            return evaluate(position, 2), None
 
-        else:
-            min_score = float('inf')
-            best_col = None
-            for col in valid_columns:
-                temp_grid = self.simulate_move(grid, col, 1)
-                if self.check_win(self.last_cell[0], self.last_cell[1], temp_grid):
-                    return -1000, col
-                if not timeout:
-                    score, _ = self.minimax(temp_grid, depth-1, alpha, beta, True)
-                    if score < min_score:
-                        min_score = score
-                        best_col = col
-                    beta = min(beta, score)
-                    if beta <= alpha:
-                        break
-            self.best_moves[hash_grid] = best_col
-            return min_score, best_col
+        sign = 1 if is_maximizing else -1
+        wins = position.winning_cells() & position.possible()
+        if wins:
+            return 1000 * sign, ((wins & -wins).bit_length() - 1) // STRIDE
 
-    def get_valid_columns(self, grid):
+        moves = position.non_losing_moves()
+        result = self.forced_result(position, moves, depth, sign)
+        if result is not None:
+            return result
+
+        hashed = position.canonical_hash()
+        alpha, beta, first, result = self.probe(position, hashed, depth, alpha, beta)
+        if result is not None:
+            return result
+
+        order = self.order_moves(position, moves, first, depth)
+        score, best_col = self.search_moves(position, order, depth, (alpha, beta), is_maximizing)
+        self.store(hashed, depth, score, bound_flag(score, alpha, beta), best_col)
+        return score, best_col
+
+    def forced_result(self, position, moves, depth, sign):
+
+        """ Finds the result of a node that is decided without searching its children.
+            Only moves that don't let the opponent win next are searched. If there are none,
+            the opponent wins next, and a move that makes two threats wins two moves later.
 
-        """ Returns a list of valid columns
-        
         Args:
-            grid: current or simulated game situation in grid form
-        
+            position: position of the node, without a winning move for the player to move
+            moves: bitboard of the moves that don't let the opponent win next
+            depth: remaining depth to explore from the node
+            sign: 1 if the player to move is the maximizer, -1 if not
+
         Returns:
-            valid_columns: columns that are not already full """
+            (score, column) of the node if it is decided, None if it has to be searched """
 
+        if not moves:
+            return -1000 * sign, next(col for col in self.columns if position.can_play(col))
+        threats = position.double_threats(moves) if depth >= 2 else 0
+        if threats:
+            return 1000 * sign, ((threats & -threats).bit_length() - 1) // STRIDE
+        return None
 
-        valid_columns = [col for col in self.columns if grid[0][col] == 0]
-        return valid_columns
+    def probe(self, position, hashed, depth, alpha, beta):
 
-    def simulate_move(self, grid, col, player):
+        """ Looks up a node in the transposition table and narrows its window.
+            A position and its mirror image share one entry, so the best column
+            is mirrored back when the mirrored hash is used.
 
-        """ Edits the grid based on a simulated move.
-            Updates the marker for the last move made.
-        
         Args:
-            grid: current or simulated game situation in grid form
-            col: chosen column for the simulated move
-            player: player whose turn is being simulated
-        
+            position: position of the node
+            hashed: canonical hash of the position and whether it is the mirrored hash
+            depth: remaining depth to explore from the node
+            alpha: best score the maximizer can guarantee so far
+            beta: best score the minimizer can guarantee so far
+
         Returns:
-            grid: grid updated with the simulated move """
+            alpha: alpha narrowed by the entry
+            beta: beta narrowed by the entry
+            first: best column from the entry to search first, None if there is none
+            known: (score, column) from the entry if it decides the node, otherwise None """
+
+        entry = self.table.probe(hashed[0])
+        if self.control.stats is not None:
+            self.control.stats.probe(entry is not None)
+        if entry is None:
+            return alpha, beta, None, None
+        entry_depth, entry_score, flag, best = entry
+        if hashed[1] and best is not None:
+            best = 6 - best
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return alpha, beta, best, (entry_score, best)
+            if flag == LOWER:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if beta <= alpha:
+                return alpha, beta, best, (entry_score, best)
+        return alpha, beta, best if best is not None and position.can_play(best) else None, None
+
+    def search_moves(self, position, order, depth, window, is_maximizing):
 
-        temp_grid = [row[:] for row in grid]
+        """ Searches the children of a node in order until one of them cuts the node off.
+            The move that cut the node off gets a bonus in the history table.
 
-        for r in range(5, -1, -1):
-            if temp_grid[r][col] == 0:
-                temp_grid[r][col] = player
-                self.last_cell = (r, col)
+        Args:
+            position: position of the node
+            order: columns to search, the most promising first
+            depth: remaining depth to explore from the node
+            window: (alpha, beta) of the node
+            is_maximizing: indicates whether the player to move is the maximizer
+
+        Returns:
+            score: best score of the children, or a bound for it if it is outside the window
+            best_col: column of the best child """
+
+        alpha, beta = window
+        best_score, best_col = float('-inf') if is_maximizing else float('inf'), None
+        for index, col in enumerate(order):
+            cell = position.play(col)
+            try:
+                score = self.search_child(position, depth - 1, alpha, beta, not is_maximizing, index == 0)
+            finally:
+                # A timeout unwinds the search, and the position must still be taken back
+                position.undo(col)
+            if is_maximizing:
+                if score > best_score:
+                    best_score, best_col = score, col
+                alpha = max(alpha, score)
+            else:
+                if score < best_score:
+                    best_score, best_col = score, col
+                beta = min(beta, score)
+            if beta <= alpha:
+                self.history[position.player][cell] += depth * depth
+                if self.control.stats is not None:
+                    self.control.stats.cutoff(index)
                 break
+        return best_score, best_col
+
+    def search_child(self, position, depth, alpha, beta, is_maximizing, first):
+
+        """ Searches a child of a node with principal variation search.
+            Only the first child is searched with the full window. The other children
+            are expected to be worse, so they are searched with a null window that
+            only tells whether they are, which cuts off much more of their trees.
+            A child that turns out better is searched again with the full window.
+            Scores are whole numbers, so a window of width 1 can't contain a score.
+
+        Args:
+            position: position of the child
+            depth: remaining depth to explore from the child
+            alpha: best score the maximizer can guarantee so far
+            beta: best score the minimizer can guarantee so far
+            is_maximizing: indicates whether the player to move in the child is the maximizer
+            first: True for the first child searched from the node
+
+        Returns:
+            score: score of the child, exact if it is between alpha and beta """
+
+        if first:
+            return self.minimax(position, depth, alpha, beta, is_maximizing)[0]
+        if is_maximizing:
+            score = self.minimax(position, depth, beta - 1, beta, True)[0]
+        else:
+            score = self.minimax(position, depth, alpha, alpha + 1, False)[0]
+        if alpha < score < beta:
+            score = self.minimax(position, depth, alpha, beta, is_maximizing)[0]
+        return score
+
+    def order_moves(self, position, moves, first, depth):
+
+        """ Orders the moves of a node from the most to the least promising.
+            The best move from the transposition table comes first. The other moves
+            are ordered by the number of winning cells they give the player to move,
+            then by the history table, and then by the column order. Near the leaves
+            only the history table is used.
+
+        Args:
+            position: position of the node
+            moves: bitboard of the moves to search, one cell per column
+            first: best column from the transposition table, None if there is none
+            depth: depth left to search from the node
+
+        Returns:
+            ordered: list of the columns to search """
+
+        ordered = [col for col in self.orders[first] if moves & COLUMN_MASKS[col]]
+        start = 1 if ordered and ordered[0] == first else 0
+        if len(ordered) - start > 1:
+            current = position.current
+            occupied = current | position.opponent
+            history = self.history[position.player]
+
+            def rank(col):
+                move = moves & COLUMN_MASKS[col]
+                return winning_cells(current | move, occupied | move).bit_count(), history[move.bit_length() - 1]
 
-        return temp_grid
+            def rank_history(col):
+                return history[(moves & COLUMN_MASKS[col]).bit_length() - 1]
 
-    def evaluate_grid(self, grid):
+            key = rank if depth >= ORDER_DEPTH else rank_history
+            ordered[start:] = sorted(ordered[start:], key=key, reverse=True)
+        return ordered
+
+    def store(self, hashed, depth, score, flag, best_col):
+
+        """ Stores a searched position in the transposition table.
+            A position and its mirror image share one entry, so the best column
+            is mirrored too when the mirrored hash is used.
+
+        Args:
+            hashed: canonical hash of the position and whether it is the mirrored hash
+            depth: depth the position was searched to
+            score: score found for the position
+            flag: whether the score is exact or a bound
+            best_col: best column found for the position """
+
+        if best_col is None:
+            return
+        key, mirrored = hashed
+        if mirrored:
+            best_col = 6 - best_col
+        self.table.store(key, depth, score, flag, best_col)
+        if self.control.stats is not None:
+            self.control.stats.store()
+
+    def get_valid_columns(self, position):
+
+        """ Returns a list of valid columns
+
+        Args:
+            position: current or simulated game situation as a position
+
+        Returns:
+            valid_columns: columns that are not already full """
+
+        valid_columns = [col for col in self.columns if position.can_play(col)]
+        return valid_columns
+
+    def evaluate_grid(self, row, col, grid):
 
         """ Checks if current game situation is a win
         
         Args:
+            row: row of the last move
+            col: column of the last move
             grid: current or simulated game situation in grid form
         
         Returns:
             grid value 1000 if AI wins, -1000 if opponent wins, 0 otherwise """
 
-        if self.check_win(self.last_cell[0], self.last_cell[1], grid):
-            if grid[self.last_cell[0]][self.last_cell[1]] == 2:
+        if self.check_win(row, col, grid):
+            if grid[row][col] == 2:
                 return 1000
             else:
                 return -1000
@@ -183,61 +610,4 @@ class AI:
         if row == col == -1:
             return False
 
-        row_start = max(0, row - 3)
-        col_start = max(0, col - 3)
-        row_end = min(5, row + 3)
-        col_end = min(6, col + 3)
-
-        for r in range(row_start, row_end + 1):
-            for c in range(col_start, col_end + 1):
-                if grid[r][c] == player:
-                    if (self.check_direction(grid, r, c, 1, 0) or
-                        self.check_direction(grid, r, c, 0, 1) or
-                        self.check_direction(grid, r, c, 1, 1) or
-                        self.check_direction(grid, r, c, 1, -1)):
-                        return True
-        return False
-
-    def check_direction(self, grid, row, col, delta_row, delta_col):
-
-        """ Checks if there are four connected markers starting from speficied cell.
-
-        Args:
-            grid: current or simulated game situation in grid form
-            row: row index of the cell currently being checked
-            col: column index of the cell currently being check
-            delta_row: vertical direction
-                -1 = row above, 0 = same row, 1 = row below
-            delta_col: horizontal direction
-                -1 = left side column, 0 = same column, 1 = right side column
-
-        Returns:
-            True if win row was found
-            False if no win row was found """
-
-        player = grid[row][col]
-        if player == 0:
-            return False
-        count = 0
-
-        for i in range(4):
-            r = row + i * delta_row
-            c = col + i * delta_col
-            if 0 <= r < 6 and 0 <= c < 7 and grid[r][c] == player:
-                count += 1
-            else:
-                break
-
-        return count == 4
-
-    def hash_grid(self, grid):
-
-        """ Turns grid into a hash table.
-        
-        Args:
-            grid: current or simulated game situation in grid form
-        
-        Return:
-            grid in hash table form"""
-
-        return tuple(tuple(row) for row in grid)
+        return has_four(grid_to_bitboard(grid, player))
@@ -0,0 +1,225 @@
+"""This module provides batch analysis of Connect 4 positions, for example to label the positions of game logs.
+Positions are read from a stream of grids or move strings and searched by one AI, or by worker processes."""
+
+import argparse
+import functools
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from AI import AI
+from bitboard import has_four
+from position import Position
+from transposition import SharedTranspositionTable
+
+
+def to_position(item):
+
+    """ Creates a position from a grid or a move string.
+        The AI always searches for player 2, so the markers are labeled
+        so that player 2 is the player to move.
+
+    Args:
+        item: grid in the form used by the game, or a string of columns from 1 to 7 like "4453"
+
+    Returns:
+        position: position where player 2 is to move
+
+    Raises:
+        ValueError: if a move string has an invalid move """
+
+    if isinstance(item, str):
+        moves = item.strip()
+        return Position.from_moves(moves, 2 if len(moves) % 2 == 0 else 1)
+
+    markers = sum(cell != 0 for row in item for cell in row)
+    if markers % 2 == 0:
+        # Player 1 made the first move, so it is player 1's turn: swap the markers
+        item = [[3 - cell if cell else 0 for cell in row] for row in item]
+    return Position.from_grid(item, 2)
+
+
+def create_ai(time_limit, max_nodes, solve, cache=None):
+
+    """ Creates an AI with a budget for every position.
+
+    Args:
+        time_limit: seconds for every position, None for no time limit
+        max_nodes: nodes for every position, None for no node limit
+        solve: True if late positions may be solved exactly
+        cache: path of a table file for the solver, None for a table of its own
+
+    Returns:
+        ai: AI to analyse positions with """
+
+    ai = AI()
+    ai.time_limit = time_limit if time_limit is not None else float('inf')
+    ai.max_nodes = max_nodes
+    if not solve:
+        ai.solver = None
+    elif cache is not None:
+        ai.solver.table = SharedTranspositionTable(cache)
+    return ai
+
+
+# A worker process creates its AI once, so the transposition table is shared by all its positions
+worker_ai = functools.lru_cache(maxsize=None)(create_ai)
+
+
+def analyse_position(ai, item):
+
+    """ Searches the best move of one position.
+        A position where the game has already ended is not searched.
+
+    Args:
+        ai: AI to search with
+        item: grid or move string of the position
+
+    Returns:
+        best_col: best column found, None if the game has ended
+        score: score of the position for the player to move
+        depth: deepest finished depth, 0 if the game has ended """
+
+    position = to_position(item)
+    if has_four(position.opponent):
+        return None, -1000, 0
+    if position.is_full():
+        return None, 0, 0
+    result = ai.search_position(position)
+    return result.col, result.score, result.depth
+
+
+def analyse_in_worker(budget, item):
+
+    """ Searches the best move of one position in a worker process.
+
+    Args:
+        budget: (time_limit, max_nodes, solve, cache) for create_ai
+        item: grid or move string of the position
+
+    Returns:
+        the same as analyse_position """
+
+    return analyse_position(worker_ai(*budget), item)
+
+
+class Analyzer:
+
+    """ Class for analysing a stream of positions.
+
+    Attributes:
+        budget: (time_limit, max_nodes, solve, cache) used for every position
+        workers: number of worker processes, 1 to analyse in this process
+        chunk_size: number of positions sent to the workers at once
+        positions: number of positions analysed
+        time: seconds the analysis has taken """
+
+    def __init__(self, time_limit=1.0, max_nodes=None, solve=True, workers=1, cache=None):
+
+        """ Constructor for the class.
+
+        Args:
+            time_limit: seconds for every position, None for no time limit
+            max_nodes: nodes for every position, None for no node limit
+            solve: True if late positions may be solved exactly
+            workers: number of worker processes
+            cache: path of a table file for the solver, shared by all workers
+                and kept between analyses, None for no file """
+
+        self.budget = (time_limit, max_nodes, solve, cache)
+        self.workers = workers
+        self.chunk_size = 16
+        self.positions = 0
+        self.time = 0.0
+
+    def analyse(self, items):
+
+        """ Analyses positions one at a time, in the order they are given.
+            The input is read lazily, so it can be a file or any other stream.
+            One transposition table is shared by all positions of the analysis.
+            With workers, a batch of positions is read and spread over the
+            workers at a time, and every worker keeps its own transposition table.
+            With a cache file the solver table is in the file, shared by all workers.
+
+        Args:
+            items: iterable of grids or move strings
+
+        Yields:
+            (best_col, score, depth) for every position """
+
+        self.positions = 0
+        start = time.perf_counter()
+        items = iter(items)
+
+        if self.workers == 1:
+            ai = create_ai(*self.budget)
+            try:
+                for item in items:
+                    yield self.count(analyse_position(ai, item), start)
+            finally:
+                if self.budget[3] is not None and ai.solver is not None:
+                    ai.solver.table.close()
+            return
+
+        if self.budget[3] is not None:
+            # The file is created here, so the workers don't create it at the same time
+            SharedTranspositionTable(self.budget[3]).close()
+        analyse = functools.partial(analyse_in_worker, self.budget)
+        with ProcessPoolExecutor(self.workers) as executor:
+            batch_size = self.workers * self.chunk_size
+            while batch := list(itertools.islice(items, batch_size)):
+                for result in executor.map(analyse, batch, chunksize=self.chunk_size):
+                    yield self.count(result, start)
+
+    def count(self, result, start):
+
+        """ Counts an analysed position.
+
+        Args:
+            result: result of the position
+            start: clock time when the analysis started
+
+        Returns:
+            result: the same result """
+
+        self.positions += 1
+        self.time = time.perf_counter() - start
+        return result
+
+    def positions_per_sec(self):
+
+        """ Returns the throughput of the latest analysis. """
+
+        return self.positions / self.time if self.time > 0 else 0.0
+
+
+def main():
+
+    """ Analyses the move strings of a file, one position per line, and prints the results.
+        Columns are printed from 1 to 7 like in the move strings, and - when the game has ended. """
+
+    parser = argparse.ArgumentParser(description="Analyse Connect 4 positions given as move strings")
+    parser.add_argument("file", type=argparse.FileType("r", encoding="utf-8"),
+                        help="file with one move string per line, - for standard input")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds for every position")
+    parser.add_argument("--nodes", type=int, help="nodes for every position")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--no-solve", action="store_true", help="don't solve late positions exactly")
+    parser.add_argument("--cache", help="file that keeps solved positions between runs and workers")
+    parser.add_argument("--cold", action="store_true", help="empty the cache file first")
+    arguments = parser.parse_args()
+
+    if arguments.cache and arguments.cold:
+        SharedTranspositionTable(arguments.cache, warm_start=False).close()
+    analyzer = Analyzer(arguments.time, arguments.nodes, not arguments.no_solve, arguments.workers, arguments.cache)
+    with arguments.file as file:
+        lines = (line.split()[0] for line in file if line.strip() and not line.startswith("#"))
+        lines, items = itertools.tee(lines)
+        for moves, (col, score, depth) in zip(lines, analyzer.analyse(items)):
+            print(moves, col + 1 if col is not None else "-", score, depth)
+    print(f'{analyzer.positions} positions in {analyzer.time:.2f} s, '
+          f'{analyzer.positions_per_sec():.1f} positions/sec', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,546 @@
+"""This module provides benchmarks for the Connect 4 AI.
+Run it with `python src/benchmark.py` (or `invoke bench`) to benchmark a fixed corpus of positions
+and compare the results against the stored baseline."""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from AI import AI, ASPIRATION
+from position import Position
+from parallel import ParallelSearch
+from playouts import Playouts
+from solver import Solver
+from stats import SearchStats
+from bitboard import COLUMN_MASKS, grid_to_bitboard, has_four
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark")
+CORPUS_PATH = os.path.join(BENCHMARK_DIR, "corpus.txt")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Positions from the AI tests, the AI is player 2 and is to move
+GRIDS = {
+    "empty": [[0] * 7 for _ in range(6)],
+    "play_for_win": [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 1, 1],
+                     [0, 0, 0, 0, 1, 1, 2],
+                     [0, 0, 0, 2, 2, 2, 1],
+                     [0, 0, 1, 2, 1, 2, 1]],
+    "win_in_five_moves": [[0, 0, 0, 0, 0, 0, 0],
+                          [0, 0, 0, 0, 0, 0, 0],
+                          [0, 0, 0, 2, 1, 0, 0],
+                          [0, 0, 0, 2, 2, 0, 0],
+                          [0, 0, 2, 1, 2, 1, 0],
+                          [1, 0, 1, 2, 1, 1, 2]],
+    "avoid_loss": [[0, 0, 0, 0, 0, 0, 0],
+                   [0, 0, 0, 0, 0, 0, 0],
+                   [0, 0, 0, 2, 0, 0, 0],
+                   [0, 0, 1, 2, 0, 0, 0],
+                   [0, 0, 1, 1, 0, 0, 0],
+                   [0, 0, 1, 2, 0, 0, 0]],
+}
+
+
+def random_grids(count, seed=0):
+
+    """ Plays random games and collects the grid after every move.
+
+    Args:
+        count: number of grids to collect
+        seed: seed for the random moves
+
+    Returns:
+        grids: list of (grid, row, col) tuples where row and col are the last move """
+
+    rng = random.Random(seed)
+    grids = []
+    while len(grids) < count:
+        grid = [[0] * 7 for _ in range(6)]
+        player = 1
+        for _ in range(42):
+            columns = [col for col in range(7) if grid[0][col] == 0]
+            col = rng.choice(columns)
+            row = max(r for r in range(6) if grid[r][col] == 0)
+            grid[row][col] = player
+            grids.append(([line[:] for line in grid], row, col))
+            if has_four(grid_to_bitboard(grid, player)) or len(grids) == count:
+                break
+            player = 3 - player
+    return grids
+
+
+def scan_check_win(grid, row, col):
+
+    """ Win check that scans the cells around the last move.
+        This is how wins were detected before bitboards and is kept as a reference.
+
+    Args:
+        grid: game situation in grid form
+        row: row of the last move
+        col: column of the last move
+
+    Returns:
+        True if the last move connected four
+        False if it didn't """
+
+    player = grid[row][col]
+    for r in range(max(0, row - 3), min(5, row + 3) + 1):
+        for c in range(max(0, col - 3), min(6, col + 3) + 1):
+            if grid[r][c] != player:
+                continue
+            for delta_row, delta_col in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                count = 0
+                for i in range(4):
+                    rr = r + i * delta_row
+                    cc = c + i * delta_col
+                    if 0 <= rr < 6 and 0 <= cc < 7 and grid[rr][cc] == player:
+                        count += 1
+                    else:
+                        break
+                if count == 4:
+                    return True
+    return False
+
+
+def bench_win_detection(count=2000, repeat=5):
+
+    """ Compares the grid scan with the shift-and-mask check.
+        Both are given the same grids, the bitboards are built beforehand.
+
+    Args:
+        count: number of grids to check
+        repeat: how many times every grid is checked
+
+    Returns:
+        dictionary with checks per second for both methods """
+
+    grids = random_grids(count)
+    boards = [grid_to_bitboard(grid, grid[row][col]) for grid, row, col in grids]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for grid, row, col in grids:
+            scan_check_win(grid, row, col)
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for board in boards:
+            has_four(board)
+    mask_time = time.perf_counter() - start
+
+    checks = count * repeat
+    return {"scan_checks_per_sec": checks / scan_time, "mask_checks_per_sec": checks / mask_time}
+
+
+def bench_search(depth=10):
+
+    """ Measures how many nodes the minimax search visits per second.
+
+    Args:
+        depth: fixed depth searched from the empty grid
+
+    Returns:
+        dictionary with the node count, time and nodes per second """
+
+    ai = AI()
+    position = Position.from_grid(GRIDS["empty"], 2)
+
+    start = time.perf_counter()
+    ai.minimax(position, depth, float('-inf'), float('inf'), True)
+    elapsed = time.perf_counter() - start
+    return {"nodes": ai.nodes, "time": elapsed, "nodes_per_sec": ai.nodes / elapsed}
+
+
+def bench_allocations(depth=8):
+
+    """ Measures the memory the minimax search allocates with tracemalloc.
+        The AI and its transposition table are created before tracing starts,
+        so only the search itself is measured. Snapshots before and after the
+        search tell how many blocks the search leaves allocated per node, and
+        the peak tells how much memory it uses at once above the starting point.
+        Blocks that are freed again during the search show up only in the peak.
+
+    Args:
+        depth: fixed depth searched from the empty grid
+
+    Returns:
+        dictionary with the node count, the peak memory in bytes and the blocks and bytes left allocated,
+        in total and per node """
+
+    ai = AI()
+    position = Position.from_grid(GRIDS["empty"], 2)
+
+    tracemalloc.start()
+    first = tracemalloc.take_snapshot()
+    before = tracemalloc.get_traced_memory()[0]
+    ai.minimax(position, depth, float('-inf'), float('inf'), True)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    second = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # The snapshots themselves are allocated by tracemalloc, so its own traces are left out
+    own = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    changes = second.filter_traces(own).compare_to(first.filter_traces(own), "filename")
+    blocks = sum(change.count_diff for change in changes)
+    size = sum(change.size_diff for change in changes)
+    return {"nodes": ai.nodes, "peak_bytes": peak, "blocks": blocks, "bytes": size,
+            "blocks_per_node": blocks / ai.nodes, "bytes_per_node": size / ai.nodes}
+
+
+def bench_ordering(depth=10):
+
+    """ Measures how much the move ordering saves, by searching the positions
+        of the AI tests with it and again with the plain column order.
+
+    Args:
+        depth: fixed depth of the iterative deepening
+
+    Returns:
+        list of dictionaries with the nodes of both searches for every position """
+
+    results = []
+    for name, grid in GRIDS.items():
+        nodes = []
+        for ordered in (True, False):
+            ai = AI()
+            if not ordered:
+                ai.order_moves = lambda position, moves, first, depth, ai=ai: [
+                    col for col in ai.orders[first] if moves & COLUMN_MASKS[col]]
+            ai.time_limit = float('inf')
+            position = Position.from_grid(grid, 2)
+            ai.control.clock.start(position.moves)
+            ai.deepen(position, depth)
+            nodes.append(ai.nodes)
+        results.append({"name": name, "nodes": nodes[0], "static_nodes": nodes[1],
+                        "saved": 1 - nodes[0] / nodes[1]})
+    return results
+
+
+def nodes_per_iteration(stats):
+
+    """ Returns the nodes of every finished iteration of a search.
+
+    Args:
+        stats: SearchStats of the search
+
+    Returns:
+        list with the nodes of the iterations from depth 1 on """
+
+    totals = [event["nodes"] for event in stats.iterations]
+    return [total - previous for total, previous in zip(totals, [0] + totals)]
+
+
+def bench_windows(depth=10):
+
+    """ Measures how much principal variation search and aspiration windows save,
+        by searching the positions of the AI tests with them and again with
+        the full window at every node and every iteration.
+
+    Args:
+        depth: fixed depth of the iterative deepening
+
+    Returns:
+        list of dictionaries with the nodes of every depth of both searches for every position """
+
+    results = []
+    for name, grid in GRIDS.items():
+        nodes = []
+        for narrowed in (True, False):
+            ai = AI()
+            ai.control.stats = SearchStats()
+            if not narrowed:
+                ai.search_child = lambda position, depth, alpha, beta, is_maximizing, first, ai=ai: ai.minimax(
+                    position, depth, alpha, beta, is_maximizing)[0]
+            ai.time_limit = float('inf')
+            position = Position.from_grid(grid, 2)
+            ai.control.clock.start(position.moves)
+            ai.deepen(position, depth, ASPIRATION if narrowed else None)
+            nodes.append(nodes_per_iteration(ai.control.stats))
+        results.append({"name": name, "nodes_per_depth": nodes[0], "full_window_nodes_per_depth": nodes[1],
+                        "saved": 1 - sum(nodes[0]) / sum(nodes[1])})
+    return results
+
+
+def bench_playouts(games=100000):
+
+    """ Measures how many random games the batched playouts play per second.
+
+    Args:
+        games: number of games played from the empty grid
+
+    Returns:
+        dictionary with the random and greedy games per second """
+
+    results = {}
+    for name, greedy in (("random", False), ("greedy", True)):
+        playouts = Playouts(np.zeros(games), np.zeros(games))
+        start = time.perf_counter()
+        playouts.run(np.random.default_rng(0), greedy)
+        results[name] = games / (time.perf_counter() - start)
+    return results
+
+
+def bench_parallel(worker_counts=(1, 2, 4, 8, 16), depth=9):
+
+    """ Measures the speedup of the parallel search with different numbers of workers.
+        Every search goes to the same fixed depth, so they all do the same work.
+
+    Args:
+        worker_counts: numbers of workers to measure
+        depth: fixed depth of the searches
+
+    Returns:
+        list of dictionaries with the workers, time, speedup, nodes per second and chosen move """
+
+    position = Position.from_grid(GRIDS["avoid_loss"], 2)
+
+    results = []
+    for workers in worker_counts:
+        search = ParallelSearch(workers)
+        start = time.perf_counter()
+        best_col, _, _, _ = search.search(position, float('inf'), max_depth=depth)
+        elapsed = time.perf_counter() - start
+        search.close()
+        results.append({"workers": workers, "time": elapsed, "speedup": results[0]["time"] / elapsed if results else 1,
+                        "nodes_per_sec": search.nodes / elapsed, "move": best_col})
+    return results
+
+
+def read_corpus(path=CORPUS_PATH):
+
+    """ Reads the solver positions of the benchmark corpus.
+
+    Args:
+        path: path of the corpus file
+
+    Returns:
+        list of (group, moves, score) tuples """
+
+    corpus = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip() and not line.startswith("#"):
+                group, moves, score = line.split()
+                corpus.append((group, moves, int(score)))
+    return corpus
+
+
+def count_probes(table):
+
+    """ Counts the probes and hits of a transposition table.
+
+    Args:
+        table: transposition table to count
+
+    Returns:
+        dictionary with the number of probes and hits, updated as the table is used """
+
+    counts = {"probes": 0, "hits": 0}
+    probe = table.probe
+
+    def counting_probe(key):
+        entry = probe(key)
+        counts["probes"] += 1
+        counts["hits"] += entry is not None
+        return entry
+
+    table.probe = counting_probe
+    return counts
+
+
+def bench_corpus_search(depth=10, time_limit=1.0):
+
+    """ Searches the positions of the AI tests.
+        Every position is searched with iterative deepening to a fixed depth,
+        which always takes the same number of nodes, and again for a fixed time
+        to see which depth the search reaches.
+
+    Args:
+        depth: fixed depth of the first search
+        time_limit: seconds for the second search
+
+    Returns:
+        list of dictionaries with the results of every position """
+
+    results = []
+    for name, grid in GRIDS.items():
+        ai = AI()
+        ai.control.stats = SearchStats()
+        ai.time_limit = float('inf')
+        position = Position.from_grid(grid, 2)
+        start = time.perf_counter()
+        ai.control.clock.start(position.moves)
+        ai.deepen(position, depth)
+        elapsed = time.perf_counter() - start
+
+        timed = AI()
+        timed.time_limit = time_limit
+        timed.control.clock.start(position.moves)
+        _, _, reached, _ = timed.deepen(position)
+
+        stats = ai.control.stats.summary()
+        results.append({"name": name, "nodes": ai.nodes, "time": elapsed, "nodes_per_sec": ai.nodes / elapsed,
+                        "nodes_per_depth": nodes_per_iteration(ai.control.stats), "hit_rate": stats["hit_rate"],
+                        "first_move_cutoff_rate": stats["first_move_cutoff_rate"], "depth_reached": reached})
+    return results
+
+
+def bench_corpus_solve(corpus=None):
+
+    """ Solves the positions of the corpus and checks the scores.
+
+    Args:
+        corpus: list of (group, moves, score) tuples, the corpus file is read if not given
+
+    Returns:
+        list of dictionaries with the results of every position """
+
+    results = []
+    for group, moves, expected in corpus if corpus is not None else read_corpus():
+        solver = Solver()
+        counts = count_probes(solver.table)
+        position = Position.from_moves(moves)
+        start = time.perf_counter()
+        score = solver.solve(position)
+        elapsed = time.perf_counter() - start
+        results.append({"name": f"{group} {moves}", "group": group, "nodes": solver.nodes, "time": elapsed,
+                        "nodes_per_sec": solver.nodes / elapsed if elapsed else 0.0,
+                        "hit_rate": counts["hits"] / max(1, counts["probes"]), "correct": score == expected})
+    return results
+
+
+def summarize(solve_results):
+
+    """ Adds up the solver results of every group.
+
+    Args:
+        solve_results: results from bench_corpus_solve
+
+    Returns:
+        dictionary from group to its total nodes, total time and nodes per second """
+
+    groups = {}
+    for result in solve_results:
+        group = groups.setdefault(result["group"], {"positions": 0, "nodes": 0, "time": 0.0})
+        group["positions"] += 1
+        group["nodes"] += result["nodes"]
+        group["time"] += result["time"]
+    for group in groups.values():
+        group["nodes_per_sec"] = group["nodes"] / group["time"] if group["time"] else 0.0
+    return groups
+
+
+def run_benchmarks():
+
+    """ Runs the corpus benchmarks.
+
+    Returns:
+        dictionary with the search results, solver results and solver group totals """
+
+    solve = bench_corpus_solve()
+    return {"search": bench_corpus_search(), "solve": solve, "groups": summarize(solve)}
+
+
+def compare(results, baseline, node_tolerance=0.1, time_tolerance=0.5):
+
+    """ Compares benchmark results against a baseline.
+        Node counts don't depend on the machine, so they are compared for every
+        position. Times are only compared for the totals of the solver groups.
+
+    Args:
+        results: results from run_benchmarks
+        baseline: earlier results from run_benchmarks
+        node_tolerance: allowed relative increase in nodes
+        time_tolerance: allowed relative increase in time
+
+    Returns:
+        list of regressions found, empty if there are none """
+
+    regressions = []
+    for kind in ("search", "solve"):
+        old = {result["name"]: result for result in baseline.get(kind, [])}
+        for result in results[kind]:
+            if not result.get("correct", True):
+                regressions.append(f'{result["name"]}: wrong score')
+            before = old.get(result["name"])
+            if before and result["nodes"] > before["nodes"] * (1 + node_tolerance):
+                regressions.append(f'{result["name"]}: {before["nodes"]} -> {result["nodes"]} nodes')
+    for name, group in results["groups"].items():
+        before = baseline.get("groups", {}).get(name)
+        if before and group["time"] > before["time"] * (1 + time_tolerance):
+            regressions.append(f'{name}: {before["time"]:.2f} -> {group["time"]:.2f} s')
+    return regressions
+
+
+def main():
+
+    """ Runs the benchmarks, prints the results and compares them against the baseline.
+        Exits with status 1 if a regression was found. """
+
+    parser = argparse.ArgumentParser(description="Benchmark the Connect 4 AI")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--micro", action="store_true",
+                        help="also run the win check, allocation, playout, move ordering, search window "
+                             "and parallel benchmarks")
+    arguments = parser.parse_args()
+
+    if arguments.micro:
+        win = bench_win_detection()
+        print(f'Win checks/sec: scan {win["scan_checks_per_sec"]:.0f}, '
+              f'shift-and-mask {win["mask_checks_per_sec"]:.0f}')
+        search = bench_search()
+        print(f'Search: {search["nodes"]} nodes in {search["time"]:.2f} s, '
+              f'{search["nodes_per_sec"]:.0f} nodes/sec')
+        allocations = bench_allocations()
+        print(f'Search allocations: {allocations["blocks"]} blocks ({allocations["bytes"]} bytes) left allocated '
+              f'over {allocations["nodes"]} nodes, {allocations["blocks_per_node"]:.3f} blocks/node, '
+              f'{allocations["bytes_per_node"]:.2f} bytes/node, peak memory {allocations["peak_bytes"]} bytes')
+        playouts = bench_playouts()
+        print(f'Playouts/sec: random {playouts["random"]:.0f}, greedy {playouts["greedy"]:.0f}')
+        for result in bench_ordering():
+            print(f'Move ordering, {result["name"]}: {result["static_nodes"]} -> {result["nodes"]} nodes, '
+                  f'{result["saved"]:.0%} saved')
+        for result in bench_windows():
+            print(f'Search windows, {result["name"]}: {sum(result["full_window_nodes_per_depth"])} -> '
+                  f'{sum(result["nodes_per_depth"])} nodes, {result["saved"]:.0%} saved, nodes per depth '
+                  f'{" ".join(map(str, result["nodes_per_depth"]))}')
+        for result in bench_parallel():
+            print(f'Parallel search, {result["workers"]} workers: {result["time"]:.2f} s, '
+                  f'speedup {result["speedup"]:.2f}, {result["nodes_per_sec"]:.0f} nodes/sec, move {result["move"]}')
+
+    results = run_benchmarks()
+    for result in results["search"]:
+        print(f'{result["name"]}: {result["nodes"]} nodes, {result["time"]:.2f} s, '
+              f'{result["nodes_per_sec"]:.0f} nodes/sec, hit rate {result["hit_rate"]:.2f}, '
+              f'first move cutoffs {result["first_move_cutoff_rate"]:.2f}, depth {result["depth_reached"]}')
+        print(f'    nodes per depth {" ".join(map(str, result["nodes_per_depth"]))}')
+    for name, group in results["groups"].items():
+        print(f'{name}: {group["positions"]} positions, {group["nodes"]} nodes, {group["time"]:.2f} s, '
+              f'{group["nodes_per_sec"]:.0f} nodes/sec')
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if arguments.save:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        return
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""This module provides the bitboard layout and win detection shared by the game and the AI.
+A bitboard stores the markers of one player as bits of an integer, one column after another."""
+
+WIDTH = 7
+HEIGHT = 6
+STRIDE = HEIGHT + 1
+SIZE = WIDTH * HEIGHT
+
+BOTTOM = tuple(col * STRIDE for col in range(WIDTH))
+TOP = tuple(col * STRIDE + HEIGHT for col in range(WIDTH))
+
+# Distance between neighbouring cells: vertical, horizontal and the two diagonals
+DIRECTIONS = (1, STRIDE, STRIDE - 1, STRIDE + 1)
+
+# Cells of every column, the bottom cell of every column and all cells of the grid
+COLUMN_MASKS = tuple(((1 << HEIGHT) - 1) << col * STRIDE for col in range(WIDTH))
+BOTTOM_MASK = sum(1 << bit for bit in BOTTOM)
+BOARD_MASK = sum(COLUMN_MASKS)
+
+
+def cell_bit(row, col):
+
+    """ Returns the bit index of a grid cell.
+        Columns take STRIDE bits each, starting from the bottom row.
+        The extra bit on top of each column stays empty so that lines can't wrap
+        from one column to the next.
+
+    Args:
+        row: grid row, 0 being the top row
+        col: grid column
+
+    Returns:
+        index of the bit representing the cell """
+
+    return col * STRIDE + HEIGHT - 1 - row
+
+
+def bit_cell(bit):
+
+    """ Returns the grid cell of a bit index, the reverse of cell_bit.
+
+    Args:
+        bit: index of the bit representing the cell
+
+    Returns:
+        row: grid row, 0 being the top row
+        col: grid column """
+
+    return HEIGHT - 1 - bit % STRIDE, bit // STRIDE
+
+
+def grid_to_bitboard(grid, player):
+
+    """ Collects the markers of one player from the grid.
+
+    Args:
+        grid: game situation in grid form
+        player: player whose markers are collected
+
+    Returns:
+        bitboard of the player's markers """
+
+    board = 0
+    for row in range(HEIGHT):
+        for col in range(WIDTH):
+            if grid[row][col] == player:
+                board |= 1 << cell_bit(row, col)
+    return board
+
+
+def has_four(board):
+
+    """ Checks if a bitboard contains four connected markers.
+        For each direction, the board is shifted onto itself to find pairs,
+        and the pairs are shifted onto themselves to find fours.
+
+    Args:
+        board: bitboard of one player's markers
+
+    Returns:
+        True if there are four markers in a row
+        False if there are not """
+
+    for shift in DIRECTIONS:
+        pairs = board & (board >> shift)
+        if pairs & (pairs >> 2 * shift):
+            return True
+    return False
+
+
+def winning_cells(board, occupied):
+
+    """ Finds the empty cells that would complete four for a player.
+        For each direction, the board is shifted so that three markers in a line
+        land on the missing fourth cell, which can be at either end or in between.
+        The cells don't have to be playable yet: a cell can be waiting higher up in a column.
+
+    Args:
+        board: bitboard of the player's markers
+        occupied: bitboard of the markers of both players
+
+    Returns:
+        bitboard of the empty cells where the player would connect four """
+
+    # Markers fill columns from the bottom, so a vertical line can only be completed on top
+    up = board << 1
+    cells = up & (up << 1) & (up << 2)
+    for shift in DIRECTIONS[1:]:
+        left = board << shift
+        left_two = left << shift
+        right = board >> shift
+        right_two = right >> shift
+        cells |= left & left_two & (left_two << shift | right)
+        cells |= right & right_two & (right_two >> shift | left)
+    return cells & (BOARD_MASK ^ occupied)
@@ -0,0 +1,164 @@
+"""This module provides an opening book of solved positions for the Connect 4 AI.
+The book is generated offline with `python src/book.py PLIES PATH` and read through a memory map."""
+
+import mmap
+import struct
+import sys
+from bitboard import SIZE
+from position import Position
+from solver import Solver
+
+MAGIC = b"C4BK"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<Qb")
+
+
+def book_positions(plies):
+
+    """ Lists every position that can be reached in at most the given number of moves.
+        Positions that are already won are left out, and a position and its
+        mirror image are listed only once.
+
+    Args:
+        plies: number of moves to play from the empty grid
+
+    Returns:
+        positions: dictionary from canonical key to a position with that key """
+
+    positions = {}
+    layer = [[]]
+    for depth in range(plies + 1):
+        next_layer = []
+        for moves in layer:
+            position = Position()
+            for col in moves:
+                position.play(col)
+            key = position.canonical_key()
+            if key in positions:
+                continue
+            positions[key] = position
+            if depth < plies:
+                next_layer.extend(moves + [col] for col in range(7)
+                                  if position.can_play(col) and not position.is_winning_move(col))
+        layer = next_layer
+    return positions
+
+
+def write_book(path, records, plies):
+
+    """ Writes records to a book file sorted by key.
+
+    Args:
+        path: path of the book file
+        records: iterable of (canonical key, score) pairs
+        plies: number of moves the book covers """
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, plies))
+        for key, score in sorted(records):
+            file.write(RECORD.pack(key, score))
+
+
+def back_up(position, scores):
+
+    """ Scores a position with negamax from the scores of its children.
+
+    Args:
+        position: position that isn't won yet
+        scores: dictionary from canonical key to score, with every child
+
+    Returns:
+        score of the position """
+
+    if position.can_win_next():
+        return (SIZE + 1 - position.moves) // 2
+    best = -SIZE
+    for col in range(7):
+        if position.can_play(col):
+            position.play(col)
+            best = max(best, -scores[position.canonical_key()])
+            position.undo(col)
+    return best
+
+
+def generate(path, plies, solver=None):
+
+    """ Scores every position up to the given number of moves and writes them to a book.
+        Only the positions after the last move are solved, and every earlier
+        position is scored from its children, which are in the book already.
+        Solving takes a long time, so this is meant to be run offline.
+
+    Args:
+        path: path of the book file
+        plies: number of moves the book covers
+        solver: solver to use, a new one is created if not given """
+
+    solver = solver if solver is not None else Solver()
+    scores = {}
+    for key, position in sorted(book_positions(plies).items(), key=lambda item: -item[1].moves):
+        scores[key] = solver.solve(position) if position.moves == plies else back_up(position, scores)
+    write_book(path, scores.items(), plies)
+
+
+class OpeningBook:
+
+    """ Class for looking up scores from a book file.
+        The file is memory-mapped, so opening it doesn't read the records into
+        memory and processes reading the same book share the same pages.
+
+    Attributes:
+        map: memory map of the book file
+        plies: number of moves the book covers
+        size: number of records in the book """
+
+    def __init__(self, path):
+
+        """ Constructor for the class. Opens the book file.
+
+        Args:
+            path: path of the book file
+
+        Raises:
+            ValueError: if the file is not a book file """
+
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.plies = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a book file")
+        self.size = (len(self.map) - HEADER.size) // RECORD.size
+
+    def lookup(self, position):
+
+        """ Finds the score of a position with binary search.
+
+        Args:
+            position: position to look up
+
+        Returns:
+            score of the position, None if the position isn't in the book """
+
+        key = position.canonical_key()
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            record_key, score = RECORD.unpack_from(self.map, HEADER.size + middle * RECORD.size)
+            if record_key == key:
+                return score
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+
+        """ Closes the memory map of the book. """
+
+        self.map.close()
+
+
+if __name__ == "__main__":
+    generate(sys.argv[2], int(sys.argv[1]))
@@ -1,91 +1,119 @@
 """This module provides functionality for a Connect 4 game playable against AI.
-This module does not include user interface but is playable through command line instead."""
+The Game class holds the game state and rules without any input, output or waiting,
+so programs can play many games quickly. ConnectFour is the command line front end on top of it."""
 
 import time
+from bitboard import SIZE, grid_to_bitboard, has_four
+from ponder import Ponderer
+from position import Position
 
-class ConnectFour:
+class Game:
 
     """ Class for handling game logic and game situation.
 
     Attributes:
-        AI: AI that will be playing against the player """
+        grid: game situation, 6 rows of 7 cells from the top row down, 0 for an empty cell
+        turn: player whose turn it is, 1 or 2
+        history: columns of the moves made with play, in order
+        result: None while the game goes on, then the winner (1 or 2) or 0 for a draw """
 
-    def __init__(self, AI):
+    def __init__(self):
 
-        """ Constuctor for the class. Creates a playable game.
+        """ Constructor for the class. Creates a game where player 1 moves first. """
+
+        self.grid = [[0] * 7 for _ in range(6)]
+        self.turn = 1
+        self.history = []
+        self.result = None
+
+    @classmethod
+    def from_moves(cls, moves):
+
+        """ Creates a game from a move string.
 
         Args:
-            AI: object from AI class """
+            moves: string of columns from 1 to 7 like "4453", player 1 moving first
 
-        self.ai = AI
-        self.grid = [[0] * 7 for _ in range(6)]
-        self.turn = 0
-        self.exit = False
+        Returns:
+            game: game after the moves
 
-    def run(self):
+        Raises:
+            ValueError: if a move is not valid """
 
-        """ Main function for running the game. """
+        game = cls()
+        for move in moves:
+            if not move.isdigit():
+                raise ValueError(f"invalid move {move}")
+            game.play(int(move) - 1)
+        return game
 
-        success = False
-        self.turn = 1
+    def to_moves(self):
 
-        while True:
-            if self.turn == 1:
-                for row in self.grid:
-                    print(row)
-                try:
-                    column = input("Choose column: ")
-                    if column is None:
-                        continue
-                    if column == "exit":
-                        self.exit = True
-                        break
-                    if int(column) not in range(1, 8):
-                        print("Invalid input, try again")
-                        time.sleep(1)
-                        continue
-                    if self.grid[0][int(column) - 1] == 0:
-                        column = int(column) - 1
-                        success = self.play_turn(self.turn, int(column))
-                    else:
-                        print("Column is full, try a different column")
-                        success = False
-                        time.sleep(1)
-
-                except ValueError:
-                    pass
-
-            elif self.turn == 2:
-                column, _ = self.ai.play(self.grid)
-                if column in range(0, 7) and self.grid[0][column] == 0:
-                    success = self.play_turn(self.turn, column)
-
-            if success:
-                if self.check_win(success[0], success[1]):
-                    print(f"Winner: {self.turn}")
-                    time.sleep(1)
-                    for row in self.grid:
-                        print(row)
-                    time.sleep(1)
-                    break
-                if self.grid_full():
-                    print("No winner. Out of turns")
-                    time.sleep(1)
-                    break
-                self.switch_turn()
-                print(f"Player {self.turn}'s turn")
-                time.sleep(1)
+        """ Returns the moves made with play as a string of columns from 1 to 7. """
 
-        input_exit = input("Exit? (yes or no): ")
-        if input_exit == "yes":
-            self.exit = True
+        return "".join(str(col + 1) for col in self.history)
 
-        if not self.exit:
-            print("Starting new game")
-            time.sleep(1)
+    def legal_moves(self):
+
+        """ Returns the columns that can be played, none if the game is over. """
 
-            self.reset_grid()
-            self.run()
+        if self.result is not None:
+            return []
+        return [col for col in range(7) if self.grid[0][col] == 0]
+
+    def play(self, column):
+
+        """ Makes a move for the player whose turn it is and updates the result.
+            The turn passes to the other player unless the game ended.
+
+        Args:
+            column: column of the move
+
+        Returns:
+            row: row where the marker landed
+            column: column of the move
+
+        Raises:
+            ValueError: if the game is over or the column can't be played """
+
+        if column not in self.legal_moves():
+            raise ValueError("game is over" if self.result is not None else f"invalid column {column}")
+        row, column = self.play_turn(self.turn, column)
+        self.history.append(column)
+        if self.check_win(row, column):
+            self.result = self.turn
+        elif self.grid_full():
+            self.result = 0
+        else:
+            self.switch_turn()
+        return row, column
+
+    def undo(self):
+
+        """ Takes back the latest move made with play.
+
+        Returns:
+            column: column of the move taken back
+
+        Raises:
+            IndexError: if there are no moves to take back """
+
+        column = self.history.pop()
+        row = next(row for row in range(6) if self.grid[row][column] != 0)
+        self.grid[row][column] = 0
+        if self.result is None:
+            self.switch_turn()
+        self.result = None
+        return column
+
+    def reset(self):
+
+        """ Starts a new game where player 1 moves first. """
+
+        self.reset_grid()
+        self.turn = 1
+        self.history = []
+        self.result = None
 
     def play_turn(self, player, column):
 
@@ -125,59 +153,25 @@ class ConnectFour:
 
     def check_win(self, row, col):
 
-        """ Checks if current player won the game.
-
-        Returns:
-            True if current player won
-            False if current player did not win """
-
-        row_start = max(0, row - 3)
-        col_start = max(0, col - 3)
-        row_end = min(5, row + 3)
-        col_end = min(6, col + 3)
-
-        for r in range(row_start, row_end + 1):
-            for c in range(col_start, col_end + 1):
-                if self.grid[r][c] == self.turn:
-                    if (self.check_direction(r, c, 1, 0) or
-                        self.check_direction(r, c, 0, 1) or
-                        self.check_direction(r, c, 1, 1) or
-                        self.check_direction(r, c, 1, -1)):
-                        return True
-        return False
-
-    def check_direction(self, row, col, delta_row, delta_col):
-
-        """ Checks if there are four connected markers starting from speficied cell.
+        """ Checks if current player won the game with the last move.
 
         Args:
-            row: row index of the cell currently being checked
-            col: column index of the cell currently being check
-            delta_row: vertical direction
-                -1 = row above, 0 = same row, 1 = row below
-            delta_col: horizontal direction
-                -1 = left side column, 0 = same column, 1 = right side column
+            row: row of the last move
+            col: column of the last move
 
         Returns:
-            True if win row was found
-            False if no win row was found """
-
-        count = 0
+            True if current player won
+            False if current player did not win """
 
-        for i in range(4):
-            r = row + i * delta_row
-            c = col + i * delta_col
-            if 0 <= r < 6 and 0 <= c < 7 and self.grid[r][c] == self.turn:
-                count += 1
-            else:
-                break
+        if self.grid[row][col] != self.turn:
+            return False
 
-        return count == 4
+        return has_four(grid_to_bitboard(self.grid, self.turn))
 
     def grid_full(self):
 
         """ Checks if the grid is full.
-        
+
         Returns:
             True if grid is full
             False if grid is not full """
@@ -194,3 +188,149 @@ class ConnectFour:
         """ Resets grid back to the default state. """
 
         self.grid = [[0] * 7 for _ in range(6)]
+
+
+class ConnectFour(Game):
+
+    """ Class for playing games against the AI in the command line.
+
+    Attributes:
+        AI: AI that will be playing against the player
+        delay: seconds to wait after messages, so the player can read them
+        exit: True when the player wants to stop playing
+        ponderer: Ponderer that searches while the player thinks, None without pondering
+        depth: depth the AI reached on its latest search, a pondered move must be as deep """
+
+    def __init__(self, AI=None, delay=1, ponder=False):
+
+        """ Constuctor for the class. Creates a playable game.
+
+        Args:
+            AI: object from AI class
+            delay: seconds to wait after messages, 0 for no waiting
+            ponder: True to let the AI search while the player thinks """
+
+        super().__init__()
+        self.ai = AI
+        self.delay = delay
+        self.exit = False
+        self.ponderer = Ponderer(AI) if ponder else None
+        # No pondered move is deep enough before the AI has searched once
+        self.depth = SIZE
+
+    def run(self):
+
+        """ Main function for running the game.
+            New games are started in the same loop until the player exits. """
+
+        self.turn = 1
+        self.result = None
+
+        while True:
+            self.run_game()
+
+            input_exit = input("Exit? (yes or no): ")
+            if input_exit == "yes":
+                self.exit = True
+            if self.exit:
+                break
+
+            print("Starting new game")
+            self.wait()
+            self.reset()
+
+    def run_game(self):
+
+        """ Plays one game, until it is over or the player exits.
+            With pondering the AI searches the player's replies while
+            the game waits for the player's column. """
+
+        pondered = None
+        while self.result is None:
+            if self.turn == 1:
+                for row in self.grid:
+                    print(row)
+                if self.ponderer is not None and self.ponderer.thread is None:
+                    self.ponderer.start(Position.from_grid(self.grid, 1))
+                column = input("Choose column: ")
+                if column == "exit":
+                    self.exit = True
+                    if self.ponderer is not None:
+                        self.ponderer.stop()
+                    return
+                column = self.read_column(column)
+                if self.ponderer is not None and column is not None:
+                    pondered = self.ponderer.stop(column)
+            else:
+                column = self.ai_move(pondered)
+            if column not in self.legal_moves():
+                continue
+
+            self.play(column)
+            if self.result is None:
+                print(f"Player {self.turn}'s turn")
+                self.wait()
+
+        if self.result:
+            print(f"Winner: {self.result}")
+            self.wait()
+            for row in self.grid:
+                print(row)
+            self.wait()
+        else:
+            print("No winner. Out of turns")
+            self.wait()
+
+    def ai_move(self, pondered):
+
+        """ Chooses the AI's move. A pondered move is played right away if it was
+            searched at least as deep as the AI's latest search, otherwise the AI
+            searches again, starting from the table the pondering filled.
+
+        Args:
+            pondered: SearchResult of the pondering for the player's latest move, or None
+
+        Returns:
+            column of the AI's move """
+
+        if self.ponderer is None:
+            column, _ = self.ai.play(self.grid)
+            return column
+        if self.ponderer.is_hit(pondered, self.depth):
+            return pondered.col
+        result = self.ai.search(self.grid)
+        # A solved position reports the rest of the game as its depth, which says nothing about the time
+        if result.depth < SIZE - len(self.history):
+            self.depth = result.depth
+        return result.col
+
+    def read_column(self, text):
+
+        """ Reads the column the player chose.
+
+        Args:
+            text: column from 1 to 7 as the player typed it
+
+        Returns:
+            column from 0 to 6, None if it can't be played """
+
+        try:
+            column = int(text)
+        except (TypeError, ValueError):
+            return None
+        if column not in range(1, 8):
+            print("Invalid input, try again")
+            self.wait()
+            return None
+        if self.grid[0][column - 1] != 0:
+            print("Column is full, try a different column")
+            self.wait()
+            return None
+        return column - 1
+
+    def wait(self):
+
+        """ Waits for the delay so the player can read the latest message. """
+
+        if self.delay:
+            time.sleep(self.delay)
@@ -0,0 +1,101 @@
+"""This module provides a heuristic evaluation of Connect 4 positions.
+A position is scored by counting the lines of four cells that only one player has markers in."""
+
+from bitboard import WIDTH, HEIGHT, STRIDE, DIRECTIONS, cell_bit
+
+# Score of a line with 0, 1, 2, 3 or 4 markers of only one player
+WEIGHTS = (0, 0, 2, 10, 100)
+MAX_SCORE = 999
+
+
+def _build_line_starts():
+
+    """ Finds the cells where a line of four begins in every direction.
+
+    Returns:
+        starts: for each direction, a mask of the cells where a line begins """
+
+    starts = {}
+    for delta_row, delta_col, shift in ((-1, 0, 1), (0, 1, STRIDE), (1, 1, STRIDE - 1), (-1, 1, STRIDE + 1)):
+        starts[shift] = 0
+        for row in range(HEIGHT):
+            for col in range(WIDTH):
+                end_row = row + 3 * delta_row
+                end_col = col + 3 * delta_col
+                if 0 <= end_row < HEIGHT and 0 <= end_col < WIDTH:
+                    starts[shift] |= 1 << cell_bit(row, col)
+    return tuple(starts[shift] for shift in DIRECTIONS)
+
+
+LINE_STARTS = _build_line_starts()
+
+
+def score_lines(own, other):
+
+    """ Scores the lines of four that only one player has markers in.
+        Every direction is handled with whole bitboards at once: the board is
+        shifted onto itself to stack the four cells of every line on the bit where
+        the line begins, and the markers are summed bit by bit.
+
+    Args:
+        own: bitboard of the player the score is for
+        other: bitboard of the other player
+
+    Returns:
+        score: positive if the lines favor own, negative if they favor other """
+
+    score = 0
+    for shift, starts in zip(DIRECTIONS, LINE_STARTS):
+        own_shifted = (own, own >> shift, own >> 2 * shift, own >> 3 * shift)
+        other_shifted = (other, other >> shift, other >> 2 * shift, other >> 3 * shift)
+        score += _count_lines(own_shifted, starts & ~(other_shifted[0] | other_shifted[1] |
+                                                      other_shifted[2] | other_shifted[3]))
+        score -= _count_lines(other_shifted, starts & ~(own_shifted[0] | own_shifted[1] |
+                                                        own_shifted[2] | own_shifted[3]))
+    return score
+
+
+def _count_lines(shifted, open_lines):
+
+    """ Adds up the weights of the open lines of one player in one direction.
+        The four cells of a line are summed as two pairs: a pair bit is set when
+        both cells have a marker and a single bit when exactly one of them has.
+
+    Args:
+        shifted: bitboard of the player shifted by 0, 1, 2 and 3 cells along the direction
+        open_lines: mask of line beginnings where the other player has no markers
+
+    Returns:
+        sum of the line weights """
+
+    first, second, third, fourth = shifted
+    low_pair = first & second
+    low_single = first ^ second
+    high_pair = third & fourth
+    high_single = third ^ fourth
+
+    fours = low_pair & high_pair & open_lines
+    threes = (low_pair & high_single | high_pair & low_single) & open_lines
+    twos = (low_pair & ~(high_pair | high_single) | high_pair & ~(low_pair | low_single)
+            | low_single & high_single) & open_lines
+
+    return WEIGHTS[4] * fours.bit_count() + WEIGHTS[3] * threes.bit_count() + WEIGHTS[2] * twos.bit_count()
+
+
+def evaluate(position, player):
+
+    """ Evaluates a position from the point of view of one player.
+        The score stays below the score of a win.
+
+    Args:
+        position: position to evaluate
+        player: player the score is for
+
+    Returns:
+        heuristic score of the position """
+
+    if position.player == player:
+        score = score_lines(position.current, position.opponent)
+    else:
+        score = score_lines(position.opponent, position.current)
+    return max(-MAX_SCORE, min(MAX_SCORE, score))
@@ -0,0 +1,222 @@
+"""This module provides a load test client for the engine service in service.py.
+Many games are played at the same time: random moves for player 1 and AI moves for player 2,
+and the time the service takes to reply to every AI move is measured."""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from service import EngineService
+
+
+def percentile(values, fraction):
+
+    """ Returns a percentile with the nearest-rank method.
+
+    Args:
+        values: list of numbers
+        fraction: percentile as a fraction, like 0.99
+
+    Returns:
+        the smallest value that is at least the given fraction of the values, 0.0 for no values """
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Client:
+
+    """ Class for a connection to the engine service.
+        Replies can come in a different order than the requests,
+        so they are matched to the requests by id.
+
+    Attributes:
+        reader: stream of replies
+        writer: stream for requests
+        pending: futures of requests waiting for a reply, by id
+        ids: counter for request ids
+        listener: task that reads the replies """
+
+    def __init__(self, reader, writer):
+
+        """ Constructor for the class.
+
+        Args:
+            reader: stream of replies
+            writer: stream for requests """
+
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.ids = itertools.count(1)
+        self.listener = asyncio.create_task(self.listen())
+
+    @classmethod
+    async def connect(cls, host, port):
+
+        """ Opens a connection to the service.
+
+        Args:
+            host: address of the service
+            port: port of the service
+
+        Returns:
+            client: connected client """
+
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def listen(self):
+
+        """ Reads replies and hands them to the requests waiting for them. """
+
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            future = self.pending.pop(response["id"], None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+    async def request(self, op, **fields):
+
+        """ Sends a request and waits for its reply.
+
+        Args:
+            op: operation of the request
+            fields: other fields of the request
+
+        Returns:
+            reply as a dictionary
+
+        Raises:
+            RuntimeError: if the service replies with an error """
+
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        response = await future
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    async def close(self):
+
+        """ Closes the connection. """
+
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+
+async def play_game(client, time_limit, rng):
+
+    """ Plays one game through the service.
+
+    Args:
+        client: connected client
+        time_limit: seconds for every AI move
+        rng: random number generator for player 1's moves
+
+    Returns:
+        latencies: seconds every AI move took from request to reply """
+
+    state = await client.request("new")
+    game = state["game"]
+    latencies = []
+    while state["result"] is None:
+        if state["turn"] == 1:
+            col = rng.choice([col for col in range(7) if state["grid"][0][col] == 0])
+            state = await client.request("play", game=game, col=col)
+        else:
+            start = time.perf_counter()
+            state = await client.request("ai", game=game, time=time_limit)
+            latencies.append(time.perf_counter() - start)
+    await client.request("close", game=game)
+    return latencies
+
+
+async def load_test(host, port, games=20, concurrency=10, time_limit=0.1, seed=0):
+
+    """ Plays games through the service, many of them at the same time.
+
+    Args:
+        host: address of the service
+        port: port of the service
+        games: number of games to play
+        concurrency: number of games played at the same time, each on its own connection
+        time_limit: seconds for every AI move
+        seed: seed for player 1's random moves
+
+    Returns:
+        dictionary with the number of AI moves, the 50th and 99th percentile
+        and mean of the move latency, the total time and AI moves per second """
+
+    rng = random.Random(seed)
+    seeds = iter([rng.getrandbits(32) for _ in range(games)])
+    latencies = []
+
+    async def player():
+        client = await Client.connect(host, port)
+        try:
+            for game_seed in seeds:
+                latencies.extend(await play_game(client, time_limit, random.Random(game_seed)))
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player() for _ in range(min(games, concurrency))))
+    elapsed = time.perf_counter() - start
+    return {"moves": len(latencies), "p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99),
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0, "time": elapsed,
+            "moves_per_sec": len(latencies) / elapsed}
+
+
+async def run(arguments):
+
+    """ Runs the load test, against a service started here if no port is given.
+
+    Args:
+        arguments: parsed command line arguments
+
+    Returns:
+        dictionary with the results of the load test """
+
+    service = None
+    port = arguments.port
+    if port is None:
+        service = EngineService(arguments.workers)
+        port = await service.start(arguments.host)
+    try:
+        return await load_test(arguments.host, port, arguments.games, arguments.concurrency,
+                               arguments.time, arguments.seed)
+    finally:
+        if service is not None:
+            await service.close()
+
+
+def main():
+
+    """ Runs the load test from the command line and prints the results. """
+
+    parser = argparse.ArgumentParser(description="Load test for the Connect 4 engine service")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the service")
+    parser.add_argument("--port", type=int, help="port of the service, a service is started here if not given")
+    parser.add_argument("--workers", type=int, default=2, help="searches at the same time in a started service")
+    parser.add_argument("--games", type=int, default=20, help="number of games")
+    parser.add_argument("--concurrency", type=int, default=10, help="games at the same time")
+    parser.add_argument("--time", type=float, default=0.1, help="seconds for every AI move")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random moves")
+    results = asyncio.run(run(parser.parse_args()))
+    print(f'{results["moves"]} AI moves in {results["time"]:.2f} s, {results["moves_per_sec"]:.1f} moves/sec')
+    print(f'Move latency: p50 {results["p50"] * 1000:.0f} ms, p99 {results["p99"] * 1000:.0f} ms, '
+          f'mean {results["mean"] * 1000:.0f} ms')
+
+
+if __name__ == "__main__":
+    main()
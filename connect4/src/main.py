@@ -4,6 +4,6 @@ from connect4 import ConnectFour
 from AI import AI
 
 ai = AI()
-connect4 = ConnectFour(ai)
+connect4 = ConnectFour(ai, ponder=True)
 
 connect4.run()
@@ -0,0 +1,466 @@
+"""This module provides a Monte Carlo tree search engine for Connect 4, an alternative to the minimax AI.
+The tree is stored in flat arrays, and the leaves are scored in batches with the playouts of playouts.py."""
+
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from AI import SearchResult
+from bitboard import SIZE, STRIDE, COLUMN_MASKS, BOTTOM_MASK, BOARD_MASK, has_four
+from playouts import Playouts
+from position import Position
+from timing import TimeManager, TIME, SOLVED
+
+# Children are created in this column order, so equal moves prefer the middle
+ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+# State of a node: the game goes on, the player who moved into the node won, or the grid is full
+OPEN = 0
+WON = 1
+DRAWN = 2
+
+
+class Tree:
+
+    """ Class for a search tree stored in flat arrays, with one entry per node in every array.
+        The children of a node are stored next to each other, so a node only keeps
+        where its children start and how many there are. The boards of a node are
+        stored from the view of the player to move, like in Position, and its value
+        from the view of the player who moved into it, which is what the parent compares.
+        The root is always node 0.
+
+    Attributes:
+        parent: index of the parent of every node, -1 for the root
+        first: index of the first child of every node, -1 if the node has no children yet
+        count: number of children of every node
+        move: column of the move into every node
+        state: OPEN, WON or DRAWN for every node
+        visits: number of playouts through every node
+        value: sum of the results of the playouts through every node
+        boards: bitboards of the player to move and of the opponent, two for every node """
+
+    def __init__(self, current, opponent):
+
+        """ Constructor for the class. Creates a tree with only the root.
+
+        Args:
+            current: bitboard of the player to move at the root
+            opponent: bitboard of the other player """
+
+        self.parent = array('i')
+        self.first = array('i')
+        self.count = array('b')
+        self.move = array('b')
+        self.state = array('b')
+        self.visits = array('q')
+        self.value = array('d')
+        self.boards = array('Q')
+        self.add(-1, -1, current, opponent, OPEN)
+
+    def __len__(self):
+
+        """ Returns the number of nodes in the tree. """
+
+        return len(self.parent)
+
+    def add(self, parent, move, current, opponent, state):
+
+        """ Adds a node without visits.
+
+        Args:
+            parent: index of the parent node
+            move: column of the move into the node
+            current: bitboard of the player to move in the node
+            opponent: bitboard of the other player
+            state: OPEN, WON or DRAWN
+
+        Returns:
+            index of the new node """
+
+        self.parent.append(parent)
+        self.first.append(-1)
+        self.count.append(0)
+        self.move.append(move)
+        self.state.append(state)
+        self.visits.append(0)
+        self.value.append(0.0)
+        self.boards.append(current)
+        self.boards.append(opponent)
+        return len(self.parent) - 1
+
+    def expand(self, node):
+
+        """ Adds a child for every move of a node.
+
+        Args:
+            node: index of a node whose game goes on """
+
+        current, opponent = self.boards[2 * node], self.boards[2 * node + 1]
+        occupied = current | opponent
+        possible = occupied + BOTTOM_MASK & BOARD_MASK
+        full = occupied.bit_count() + 1 == SIZE
+        self.first[node] = len(self)
+        for col in ORDER:
+            move = possible & COLUMN_MASKS[col]
+            if move:
+                played = current | move
+                state = WON if has_four(played) else DRAWN if full else OPEN
+                self.add(node, col, opponent, played, state)
+        self.count[node] = len(self) - self.first[node]
+
+    def select(self, exploration):
+
+        """ Walks from the root to a leaf, taking the child with the highest
+            upper confidence bound (UCT) at every step. A leaf that has been
+            visited before is expanded and its first child is taken.
+            Every node on the way gets its visit right away, so the next walk of
+            the same batch sees it as explored more and tends to go elsewhere.
+
+        Args:
+            exploration: weight of the exploration term of the bound
+
+        Returns:
+            index of the leaf """
+
+        visits, value, first, count, state = self.visits, self.value, self.first, self.count, self.state
+        node = 0
+        visits[node] += 1
+        while first[node] >= 0 and state[node] == OPEN:
+            scale = exploration * math.sqrt(math.log(visits[node]))
+            best, best_bound = -1, float('-inf')
+            for child in range(first[node], first[node] + count[node]):
+                child_visits = visits[child]
+                if child_visits == 0:
+                    best = child
+                    break
+                bound = value[child] / child_visits + scale / math.sqrt(child_visits)
+                if bound > best_bound:
+                    best, best_bound = child, bound
+            node = best
+            visits[node] += 1
+
+        if state[node] == OPEN and visits[node] > 1:
+            self.expand(node)
+            node = first[node]
+            visits[node] += 1
+        return node
+
+    def backup(self, node, total, games):
+
+        """ Adds the results of playouts to a node and every node above it.
+            The node's visit from select is already counted.
+
+        Args:
+            node: index of the leaf the playouts started from
+            total: sum of the results for the player who moved into the node
+            games: number of playouts """
+
+        while node >= 0:
+            self.visits[node] += games - 1
+            self.value[node] += total
+            total = -total
+            node = self.parent[node]
+
+    def find(self, current, opponent):
+
+        """ Looks for a position among the root, its children and their children.
+
+        Args:
+            current: bitboard of the player to move
+            opponent: bitboard of the other player
+
+        Returns:
+            index of the node of the position, None if it isn't there """
+
+        nodes = [0]
+        for _ in range(3):
+            for node in nodes:
+                if self.boards[2 * node] == current and self.boards[2 * node + 1] == opponent:
+                    return node
+            nodes = [child for node in nodes if self.first[node] >= 0
+                     for child in range(self.first[node], self.first[node] + self.count[node])]
+        return None
+
+    def subtree(self, node):
+
+        """ Copies the part of the tree under a node into a new tree where the node is the root.
+
+        Args:
+            node: index of the new root
+
+        Returns:
+            tree: the new tree """
+
+        tree = Tree(self.boards[2 * node], self.boards[2 * node + 1])
+        tree.visits[0], tree.value[0] = self.visits[node], self.value[node]
+        copies = [(node, 0)]
+        while copies:
+            old, new = copies.pop()
+            if self.first[old] < 0:
+                continue
+            tree.first[new], tree.count[new] = len(tree), self.count[old]
+            for child in range(self.first[old], self.first[old] + self.count[old]):
+                index = tree.add(new, self.move[child], self.boards[2 * child], self.boards[2 * child + 1],
+                                 self.state[child])
+                tree.visits[index], tree.value[index] = self.visits[child], self.value[child]
+                copies.append((child, index))
+        return tree
+
+    def root_moves(self):
+
+        """ Returns (column, visits, value) of every child of the root. """
+
+        if self.first[0] < 0:
+            return []
+        return [(self.move[child], self.visits[child], self.value[child])
+                for child in range(self.first[0], self.first[0] + self.count[0])]
+
+
+def pick(moves):
+
+    """ Picks the move with the most visits.
+
+    Args:
+        moves: list of (column, visits, value), the value for the player who makes the move
+
+    Returns:
+        best_col: column with the most visits
+        score: average result of the column scaled to -999...999 like a heuristic score """
+
+    col, visits, value = max(moves, key=lambda move: move[1])
+    return col, round(999 * value / visits) if visits else 0
+
+
+class MCTS:
+
+    """ Class for a Monte Carlo tree search engine with the same interface as the AI.
+        The search can be stopped at any time: start sets the position, every
+        iterate makes the tree bigger and best_move tells the best move so far.
+        The tree is kept between moves, so the part under the moves that were
+        played is reused. The AI is player 2, like in the AI class.
+
+    Attributes:
+        tree: search tree of the current position
+        clock: TimeManager that decides how long a move may take
+        rng: NumPy random generator for the playouts
+        exploration: weight of the exploration term of UCT
+        batch: number of leaves selected before their playouts are played
+        playouts: number of playouts from every leaf
+        parallel: RootParallel for worker processes, None to search in this process
+        nodes: number of playouts in the latest search """
+
+    def __init__(self, exploration=1.4, batch=128, playouts=8, seed=None):
+
+        """ Constructor for the class.
+
+        Args:
+            exploration: weight of the exploration term of UCT
+            batch: number of leaves selected before their playouts are played
+            playouts: number of playouts from every leaf
+            seed: seed for the playouts, None for a random seed """
+
+        self.tree = Tree(0, 0)
+        self.clock = TimeManager(5)
+        self.rng = np.random.default_rng(seed)
+        self.exploration = exploration
+        self.batch = batch
+        self.playouts = playouts
+        self.parallel = None
+        self.nodes = 0
+
+    @property
+    def time_limit(self):
+
+        """ Seconds the engine may think about every move. """
+
+        return self.clock.time_limit
+
+    @time_limit.setter
+    def time_limit(self, time_limit):
+
+        """ Sets the seconds the engine may think about every move.
+
+        Args:
+            time_limit: seconds for every move """
+
+        self.clock.time_limit = time_limit
+
+    def play(self, grid):
+
+        """ Chooses a move like AI.play.
+
+        Args:
+            grid: current game situation in grid form
+
+        Returns:
+            best_col: the column where the engine has chosen to place the next marker
+            score: 1000 for a move that wins right away, otherwise the average
+                   playout result of the move scaled to -999...999 """
+
+        result = self.search_position(Position.from_grid(grid, 2))
+        return result.col, result.score
+
+    def search_position(self, position, max_depth=None):
+
+        """ Searches a position until the time for the move runs out.
+
+        Args:
+            position: position to search
+            max_depth: not used, for the same interface as AI.search_position
+
+        Returns:
+            SearchResult with the move, its score, the length of the most visited line and the line """
+
+        del max_depth
+        self.clock.start(position.moves)
+        self.nodes = 0
+        wins = position.winning_cells() & position.possible()
+        if wins:
+            self.clock.stop()
+            col = ((wins & -wins).bit_length() - 1) // STRIDE
+            return SearchResult(col, 1000, 1, None, [col], SOLVED)
+
+        if self.parallel is not None:
+            best_col, score, self.nodes = self.parallel.search(position, self.clock.budget, self)
+            self.clock.stop()
+            return SearchResult(best_col, score, 1, None, [best_col], TIME)
+
+        self.start(position)
+        while self.tree.first[0] < 0 or self.clock.elapsed() < self.clock.budget:
+            self.iterate()
+        self.clock.stop()
+        best_col, score = self.best_move()
+        pv = self.principal_variation()
+        return SearchResult(best_col, score, len(pv), None, pv, TIME)
+
+    def start(self, position):
+
+        """ Makes a position the root of the tree. If the position is in the
+            tree of the previous search, the part of the tree under it is kept.
+
+        Args:
+            position: position to search """
+
+        node = self.tree.find(position.current, position.opponent)
+        if node is None:
+            self.tree = Tree(position.current, position.opponent)
+        elif node:
+            self.tree = self.tree.subtree(node)
+
+    def iterate(self):
+
+        """ Selects a batch of leaves, plays out from all of them at once and backs up the results. """
+
+        tree = self.tree
+        leaves = [tree.select(self.exploration) for _ in range(self.batch)]
+        open_leaves = [leaf for leaf in leaves if tree.state[leaf] == OPEN]
+        if open_leaves:
+            current = np.array([tree.boards[2 * leaf] for leaf in open_leaves], dtype=np.uint64)
+            opponent = np.array([tree.boards[2 * leaf + 1] for leaf in open_leaves], dtype=np.uint64)
+            games = Playouts(current.repeat(self.playouts), opponent.repeat(self.playouts))
+            results = games.run(self.rng, greedy=True).reshape(len(open_leaves), self.playouts).sum(axis=1)
+            # The results are for the player to move in the leaf, the leaf's value is for the other player
+            for leaf, total in zip(open_leaves, results.tolist()):
+                tree.backup(leaf, -total, self.playouts)
+        for leaf in leaves:
+            if tree.state[leaf] != OPEN:
+                tree.backup(leaf, self.playouts if tree.state[leaf] == WON else 0, self.playouts)
+        self.nodes += len(leaves) * self.playouts
+
+    def best_move(self):
+
+        """ Returns the best move found so far and its score, like pick.
+            A move that wins right away is always the best. """
+
+        tree = self.tree
+        if tree.first[0] < 0:
+            return None, 0
+        for child in range(tree.first[0], tree.first[0] + tree.count[0]):
+            if tree.state[child] == WON:
+                return tree.move[child], 1000
+        return pick(tree.root_moves())
+
+    def principal_variation(self):
+
+        """ Returns the columns of the line that follows the most visited child from the root. """
+
+        tree, node, pv = self.tree, 0, []
+        while tree.first[node] >= 0:
+            node = max(range(tree.first[node], tree.first[node] + tree.count[node]), key=tree.visits.__getitem__)
+            pv.append(tree.move[node])
+        return pv
+
+
+def search_in_worker(task):
+
+    """ Searches a position with a new tree in a worker process.
+
+    Args:
+        task: (current, opponent, moves, time_limit, exploration, batch, playouts) of the search
+
+    Returns:
+        moves: (column, visits, value) of every move of the root
+        nodes: number of playouts """
+
+    current, opponent, moves, time_limit, exploration, batch, playouts = task
+    engine = MCTS(exploration, batch, playouts)
+    engine.clock.time_limit = time_limit
+    engine.clock.start(moves)
+    engine.tree = Tree(current, opponent)
+    while engine.tree.first[0] < 0 or engine.clock.elapsed() < time_limit:
+        engine.iterate()
+    return engine.tree.root_moves(), engine.nodes
+
+
+class RootParallel:
+
+    """ Class for root parallel tree search: every worker process grows its own
+        tree from the same position, and the visits of the moves of the roots
+        are added up. The workers don't share anything while they search.
+
+    Attributes:
+        workers: number of worker processes
+        executor: process pool """
+
+    def __init__(self, workers):
+
+        """ Constructor for the class.
+
+        Args:
+            workers: number of worker processes """
+
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(workers)
+
+    def search(self, position, time_limit, engine):
+
+        """ Searches a position on every worker and combines the results.
+
+        Args:
+            position: position to search
+            time_limit: seconds the search may take
+            engine: MCTS whose settings the workers use
+
+        Returns:
+            best_col: column with the most visits over all workers
+            score: score of the column like pick
+            nodes: number of playouts of all workers """
+
+        task = (position.current, position.opponent, position.moves, time_limit,
+                engine.exploration, engine.batch, engine.playouts)
+        totals = {}
+        nodes = 0
+        for moves, worker_nodes in self.executor.map(search_in_worker, [task] * self.workers):
+            nodes += worker_nodes
+            for col, visits, value in moves:
+                total = totals.setdefault(col, [0, 0.0])
+                total[0] += visits
+                total[1] += value
+        best_col, score = pick([(col, visits, value) for col, (visits, value) in totals.items()])
+        return best_col, score, nodes
+
+    def close(self):
+
+        """ Shuts down the worker processes. """
+
+        self.executor.shutdown()
@@ -0,0 +1,168 @@
+"""This module provides a parallel search for the Connect 4 AI.
+The columns of the current turn are split across worker processes and each worker searches its own columns."""
+
+import functools
+import math
+from concurrent.futures import ProcessPoolExecutor
+from AI import AI
+from bitboard import SIZE
+from timing import SearchTimeout, TIME, DEPTH
+
+
+def create_worker_ai():
+
+    """ Creates the AI that searches the columns of one process.
+        The columns are searched with minimax only, so the AI has no solver.
+
+    Returns:
+        ai: AI to search columns with """
+
+    ai = AI()
+    ai.solver = None
+    return ai
+
+
+# A process creates its AI once, so the table and the AI aren't allocated again for every column
+worker_ai = functools.lru_cache(maxsize=None)(create_worker_ai)
+
+
+def search_column(position, col, time_limit, max_depth, max_nodes=None):
+
+    """ Searches the position after a move in one column with iterative deepening.
+        Runs in a worker process, or in the calling process with one worker.
+        The process reuses one AI, but its table and history are cleared first,
+        so the result doesn't depend on which columns the same worker searched before.
+
+    Args:
+        position: position before the move, the AI is to move
+        col: column of the move
+        time_limit: seconds the column may be searched for
+        max_depth: deepest depth to search, counted from the position before the move
+        max_nodes: nodes the column may search, None for no limit
+
+    Returns:
+        col: column of the move
+        scores: score of the move for every depth that was finished
+        nodes: number of nodes searched
+        limit: limit that ended the search of the column, DEPTH if every depth was finished """
+
+    ai = worker_ai()
+    ai.table.clear()
+    ai.history = [[0] * len(history) for history in ai.history]
+    ai.nodes = 0
+    ai.time_limit = time_limit
+    ai.max_nodes = max_nodes
+    ai.control.clock.start(position.moves)
+
+    if position.is_winning_move(col):
+        return col, [1000] * max_depth, 1, DEPTH
+
+    position.play(col)
+    scores, limit = [], DEPTH
+    try:
+        for depth in range(1, max_depth + 1):
+            if not ai.control.clock.can_finish():
+                limit = TIME
+                break
+            try:
+                score, _ = ai.minimax(position, depth - 1, float('-inf'), float('inf'), is_maximizing=False)
+            except SearchTimeout as timeout:
+                limit = timeout.args[0] if timeout.args else TIME
+                break
+            ai.control.clock.iteration_done()
+            scores.append(score)
+    finally:
+        position.undo(col)
+    return col, scores, ai.nodes, limit
+
+
+def combine(results):
+
+    """ Picks the best column from the results of the columns.
+        The columns are compared at the deepest depth every one of them finished.
+
+    Args:
+        results: results of search_column in the order the columns are preferred
+
+    Returns:
+        best_col: best column
+        score: score of the best column
+        depth: deepest depth finished for every column
+        limit: limit that stopped the first column that got no deeper, DEPTH if every depth was finished """
+
+    depth = min(len(scores) for _, scores, _, _ in results)
+    limit = next(limit for _, scores, _, limit in results if len(scores) == depth)
+    best_col, best_score = None, float('-inf')
+    for col, scores, _, _ in results:
+        if scores[depth - 1] > best_score:
+            best_col, best_score = col, scores[depth - 1]
+    return best_col, best_score, depth, limit
+
+
+class ParallelSearch:
+
+    """ Class for searching the columns of a turn in parallel.
+        The results are combined by depth and column order only, never by the
+        order the workers finish in. With a depth or node limit and no time
+        limit, the chosen move is the same for any number of workers.
+
+    Attributes:
+        workers: number of worker processes
+        executor: process pool, None with one worker
+        columns: order in which columns are preferred when scores are equal
+        nodes: number of nodes searched in the latest search """
+
+    def __init__(self, workers):
+
+        """ Constructor for the class.
+
+        Args:
+            workers: number of worker processes """
+
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        self.columns = [3, 2, 4, 1, 5, 0, 6]
+        self.nodes = 0
+
+    def search(self, position, time_limit, max_depth=None, max_nodes=None):
+
+        """ Searches every valid column and picks the best one.
+            If there are more columns than workers, the time limit is shared
+            between the rounds of columns every worker has to search. The node
+            limit is shared evenly between the columns.
+
+        Args:
+            position: position where the AI is to move
+            time_limit: seconds the search may take
+            max_depth: deepest depth to search, all the remaining moves if not given
+            max_nodes: nodes the search may take, None for no limit
+
+        Returns:
+            best_col: best column found
+            score: score of the best column
+            depth: deepest depth finished for every column
+            limit: limit that ended the search, DEPTH if every depth was finished """
+
+        columns = [col for col in self.columns if position.can_play(col)]
+        if not columns:
+            return None, 0, 0, DEPTH
+        max_depth = min(max_depth, SIZE - position.moves) if max_depth is not None else SIZE - position.moves
+        rounds = math.ceil(len(columns) / self.workers)
+        count = len(columns)
+        column_nodes = max_nodes // count if max_nodes is not None else None
+        arguments = ([position] * count, columns, [time_limit / rounds] * count,
+                     [max_depth] * count, [column_nodes] * count)
+        if self.executor is None:
+            results = list(map(search_column, *arguments))
+        else:
+            results = list(self.executor.map(search_column, *arguments))
+
+        self.nodes = sum(nodes for _, _, nodes, _ in results)
+        return combine(results)
+
+    def close(self):
+
+        """ Shuts down the worker processes. """
+
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,212 @@
+"""This module provides random playouts of many Connect 4 games at the same time.
+The games are stored as NumPy arrays of bitboards in the same layout as position.py,
+and every step makes one move in all games that are not over."""
+
+import argparse
+import time
+import numpy as np
+from bitboard import WIDTH, STRIDE, SIZE, DIRECTIONS, COLUMN_MASKS, BOTTOM_MASK, BOARD_MASK, winning_cells
+
+COLUMNS = np.array(COLUMN_MASKS, dtype=np.uint64)
+
+
+def has_four(boards):
+
+    """ Checks which bitboards contain four connected markers, like bitboard.has_four.
+
+    Args:
+        boards: array of bitboards
+
+    Returns:
+        array that is True for the bitboards with four in a row """
+
+    won = np.zeros(len(boards), dtype=bool)
+    for shift in DIRECTIONS:
+        pairs = boards & (boards >> shift)
+        won |= (pairs & (pairs >> 2 * shift)) != 0
+    return won
+
+
+def lowest_column(cells):
+
+    """ Finds the column of the lowest set cell of every bitboard.
+
+    Args:
+        cells: array of bitboards
+
+    Returns:
+        array with the column of the lowest cell, meaningless for empty bitboards """
+
+    lowest = cells & (~cells + np.uint64(1))
+    return np.bitwise_count(lowest - np.uint64(1)) // STRIDE
+
+
+class Playouts:
+
+    """ Class for playing many games at the same time.
+        Every game is stored from the view of the player to move, like in Position,
+        so the same array operations work for both players. Only the games that
+        are not over are kept in the arrays of bitboards, so finished games cost nothing.
+
+    Attributes:
+        current: bitboards of the players to move in the games that are not over
+        opponent: bitboards of the players who made the previous move in those games
+        live: index of each game that is not over
+        results: result of every game for the player who was to move at the start,
+            1 for a win, -1 for a loss, 0 for a draw or a game that goes on
+        history: (live, columns) of every step, the games that moved and their columns
+        ply: number of steps played """
+
+    def __init__(self, current, opponent):
+
+        """ Constructor for the class.
+
+        Args:
+            current: array of the bitboards of the players to move
+            opponent: array of the bitboards of the players who made the previous move """
+
+        current = np.asarray(current, dtype=np.uint64)
+        opponent = np.asarray(opponent, dtype=np.uint64)
+        self.results = np.zeros(len(current), dtype=np.int8)
+        self.live = np.flatnonzero(np.bitwise_count(current | opponent) < SIZE)
+        self.current = current[self.live]
+        self.opponent = opponent[self.live]
+        self.history = []
+        self.ply = 0
+
+    @classmethod
+    def from_positions(cls, positions, repeat=1):
+
+        """ Creates games that start from positions.
+
+        Args:
+            positions: list of positions that are not over
+            repeat: number of games that start from every position
+
+        Returns:
+            playouts: games in the order of the positions, repeat games for each """
+
+        current = np.repeat(np.array([position.current for position in positions], dtype=np.uint64), repeat)
+        opponent = np.repeat(np.array([position.opponent for position in positions], dtype=np.uint64), repeat)
+        return cls(current, opponent)
+
+    def possible(self):
+
+        """ Returns the playable cell of every column of every game, like Position.possible. """
+
+        return ((self.current | self.opponent) + np.uint64(BOTTOM_MASK)) & np.uint64(BOARD_MASK)
+
+    def choose(self, rng, greedy=False):
+
+        """ Chooses a random column for every game that is not over.
+            Columns are drawn again for the games where the column is full,
+            which is faster than drawing among the playable columns.
+            A greedy player wins if it can, and otherwise blocks the opponent's win if it can.
+
+        Args:
+            rng: NumPy random generator
+            greedy: True for greedy moves, False for plain random moves
+
+        Returns:
+            array with the column of every game that is not over """
+
+        possible = self.possible()
+        columns = rng.integers(0, WIDTH, len(possible))
+        full = np.flatnonzero((possible & COLUMNS[columns]) == 0)
+        while len(full):
+            columns[full] = rng.integers(0, WIDTH, len(full))
+            full = full[(possible[full] & COLUMNS[columns[full]]) == 0]
+
+        if greedy:
+            occupied = self.current | self.opponent
+            blocks = winning_cells(self.opponent, occupied) & possible
+            columns = np.where(blocks != 0, lowest_column(blocks), columns)
+            wins = winning_cells(self.current, occupied) & possible
+            columns = np.where(wins != 0, lowest_column(wins), columns)
+        return columns
+
+    def step(self, columns):
+
+        """ Plays one move in every game that is not over and updates the results.
+            Games that end are removed from the arrays.
+
+        Args:
+            columns: column of every game that is not over, from choose """
+
+        played = self.current | (self.possible() & COLUMNS[columns])
+        won = has_four(played)
+        self.results[self.live[won]] = 1 if self.ply % 2 == 0 else -1
+        self.history.append((self.live, columns))
+        self.ply += 1
+
+        keep = ~won & (np.bitwise_count(played | self.opponent) < SIZE)
+        if keep.all():
+            self.current, self.opponent = self.opponent, played
+        else:
+            self.current, self.opponent = self.opponent[keep], played[keep]
+            self.live = self.live[keep]
+
+    def run(self, rng=None, greedy=False):
+
+        """ Plays all games to the end.
+
+        Args:
+            rng: NumPy random generator, a new one if not given
+            greedy: True for greedy moves, False for plain random moves
+
+        Returns:
+            results: result of every game for the player who was to move at the start """
+
+        rng = rng if rng is not None else np.random.default_rng()
+        while len(self.live):
+            self.step(self.choose(rng, greedy))
+        return self.results
+
+    def move_strings(self):
+
+        """ Returns the moves played in every game as strings of columns from 1 to 7. """
+
+        moves = [[] for _ in self.results]
+        for live, columns in self.history:
+            for game, col in zip(live.tolist(), columns.tolist()):
+                moves[game].append(str(col + 1))
+        return ["".join(game) for game in moves]
+
+
+def playout_score(position, games, rng=None, greedy=False):
+
+    """ Scores a position by playing random games from it.
+
+    Args:
+        position: position that is not over
+        games: number of games to play
+        rng: NumPy random generator, a new one if not given
+        greedy: True for greedy moves, False for plain random moves
+
+    Returns:
+        average result for the player to move, between -1 and 1 """
+
+    return float(Playouts.from_positions([position], games).run(rng, greedy).mean())
+
+
+def main():
+
+    """ Plays random games from the empty grid and prints the throughput. """
+
+    parser = argparse.ArgumentParser(description="Random Connect 4 playouts with NumPy")
+    parser.add_argument("--games", type=int, default=100000, help="number of games")
+    parser.add_argument("--greedy", action="store_true", help="win and block when possible")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the moves")
+    arguments = parser.parse_args()
+
+    playouts = Playouts(np.zeros(arguments.games), np.zeros(arguments.games))
+    start = time.perf_counter()
+    results = playouts.run(np.random.default_rng(arguments.seed), arguments.greedy)
+    elapsed = time.perf_counter() - start
+    print(f'{arguments.games} games in {elapsed:.2f} s, {arguments.games / elapsed:.0f} games/sec')
+    print(f'First player wins {np.mean(results == 1):.3f}, loses {np.mean(results == -1):.3f}, '
+          f'draws {np.mean(results == 0):.3f}')
+
+
+if __name__ == "__main__":
+    main()
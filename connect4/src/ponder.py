@@ -0,0 +1,129 @@
+"""This module provides pondering for the Connect 4 AI: searching on the opponent's time.
+While the opponent thinks, a background thread searches the position after every reply
+they can make, so the AI can answer the reply that comes at once or from a warm table."""
+
+import threading
+from AI import SOLVE_FROM, SearchResult
+from bitboard import SIZE
+from timing import TimeManager
+
+
+class Ponderer:
+
+    """ Class for searching the replies of the opponent in a background thread.
+        The replies are searched one depth at a time in turn, so all of them get
+        about as deep whenever the opponent moves. The search uses the AI's
+        transposition table, so even a reply that wasn't searched deep enough
+        starts from positions the table already knows. The AI must not search
+        anything else while it ponders.
+        Replies that the AI would solve exactly are not pondered, because the
+        AI solves them on its own move instead of searching them.
+
+    Attributes:
+        ai: AI that ponders
+        clock: TimeManager without a time limit, cancelled when the opponent moves
+        results: SearchResult of the deepest finished search of every reply by column
+        thread: background thread, None when the AI is not pondering """
+
+    def __init__(self, ai):
+
+        """ Constructor for the class.
+
+        Args:
+            ai: AI that ponders between its moves """
+
+        self.ai = ai
+        self.clock = TimeManager(float('inf'))
+        self.results = {}
+        self.thread = None
+
+    def start(self, position):
+
+        """ Starts pondering in a background thread.
+
+        Args:
+            position: position where the opponent is to move, it belongs to the thread until stop """
+
+        self.results = {}
+        self.clock = TimeManager(float('inf'))
+        self.clock.start(position.moves)
+        self.thread = threading.Thread(target=self.ponder, args=(position,), daemon=True)
+        self.thread.start()
+
+    def ponder(self, position):
+
+        """ Searches the replies one depth deeper at a time until pondering is stopped.
+
+        Args:
+            position: position where the opponent is to move """
+
+        ai, clock = self.ai, self.ai.control.clock
+        ai.control.clock = self.clock
+        try:
+            replies = [col for col in ai.columns if position.can_play(col) and not position.is_winning_move(col)]
+            replies = [col for col in replies if not self.solved(position, col)]
+            for depth in range(1, SIZE - position.moves):
+                for col in replies:
+                    position.play(col)
+                    try:
+                        best_col, score, finished, limit = ai.deepen(position, depth)
+                        if finished == depth:
+                            self.results[col] = SearchResult(best_col, score, depth, None,
+                                                             ai.principal_variation(position, best_col, depth), limit)
+                    finally:
+                        position.undo(col)
+                    # A search stopped by the clock returns what it finished, so the flag ends the loops
+                    if self.clock.max_nodes == 0:
+                        return
+        finally:
+            ai.control.clock = clock
+
+    def solved(self, position, col):
+
+        """ Checks if the AI would solve the position after a reply instead of searching it.
+
+        Args:
+            position: position where the opponent is to move
+            col: column of the reply
+
+        Returns:
+            True if the position after the reply is solved exactly by AI.search_position """
+
+        if self.ai.solver is None:
+            return False
+        if position.moves + 1 >= SOLVE_FROM:
+            return True
+        position.play(col)
+        try:
+            return self.ai.solver.in_book(position, 1)
+        finally:
+            position.undo(col)
+
+    def stop(self, col=None):
+
+        """ Stops pondering and waits for the background thread to finish.
+
+        Args:
+            col: column of the opponent's reply, None if it doesn't matter
+
+        Returns:
+            SearchResult of the reply, None if the reply wasn't searched to any depth """
+
+        if self.thread is not None:
+            self.clock.cancel()
+            self.thread.join()
+            self.thread = None
+        return self.results.get(col)
+
+    def is_hit(self, result, depth):
+
+        """ Checks if a pondered result can be played without searching again.
+
+        Args:
+            result: SearchResult from stop, or None
+            depth: depth the AI reached on its latest own move
+
+        Returns:
+            True if the reply was searched at least as deep, or to a forced win or loss """
+
+        return result is not None and result.col is not None and (result.depth >= depth or abs(result.score) == 1000)
@@ -0,0 +1,372 @@
+"""This module provides a bitboard representation of a Connect 4 position.
+Markers of both players are stored as bits of two integers, which makes playing and undoing moves constant time."""
+
+import random
+from bitboard import WIDTH, HEIGHT, STRIDE, SIZE, BOTTOM, TOP, BOTTOM_MASK, BOARD_MASK, has_four, winning_cells
+
+
+def _build_zobrist_keys():
+
+    """ Draws a random 64-bit number for every player and cell.
+        The seed is fixed so that hashes stay the same between runs.
+
+    Returns:
+        keys: keys[player][bit] for the cells of both players
+        mirror_keys: the same keys for the cell mirrored over the middle column
+        side: key that is included when it is player 2's turn """
+
+    rng = random.Random(4)
+    keys = [[0] * (WIDTH * STRIDE)]
+    for _ in range(2):
+        keys.append([rng.getrandbits(64) for _ in range(WIDTH * STRIDE)])
+
+    mirror_keys = []
+    for player_keys in keys:
+        mirror_keys.append([player_keys[(WIDTH - 1 - bit // STRIDE) * STRIDE + bit % STRIDE]
+                            for bit in range(WIDTH * STRIDE)])
+
+    return keys, mirror_keys, rng.getrandbits(64)
+
+
+ZOBRIST, MIRROR_ZOBRIST, SIDE = _build_zobrist_keys()
+
+
+class Position:
+
+    """ Class for a Connect 4 position stored as bitboards.
+
+    Attributes:
+        current: bitboard of the player whose turn it is
+        opponent: bitboard of the player who made the previous move
+        heights: index of the next free bit in each column
+        player: player whose turn it is (1 or 2)
+        moves: number of markers on the grid
+        hash: Zobrist hash of the position, updated with every move
+        mirror_hash: Zobrist hash of the position mirrored left to right """
+
+    def __init__(self, player=1):
+
+        """ Constructor for the class. Creates an empty position.
+
+        Args:
+            player: player who makes the first move """
+
+        self.current = 0
+        self.opponent = 0
+        self.heights = list(BOTTOM)
+        self.player = player
+        self.moves = 0
+        self.hash = SIDE if player == 2 else 0
+        self.mirror_hash = self.hash
+
+    @classmethod
+    def from_grid(cls, grid, player):
+
+        """ Creates a position from the grid used by the game.
+
+        Args:
+            grid: game situation in grid form
+            player: player whose turn it is
+
+        Returns:
+            position: position matching the grid """
+
+        position = cls(player)
+        for col in range(WIDTH):
+            for row in range(HEIGHT - 1, -1, -1):
+                marker = grid[row][col]
+                if marker == 0:
+                    break
+                cell = position.heights[col]
+                if marker == player:
+                    position.current |= 1 << cell
+                else:
+                    position.opponent |= 1 << cell
+                position.hash ^= ZOBRIST[marker][cell]
+                position.mirror_hash ^= MIRROR_ZOBRIST[marker][cell]
+                position.heights[col] += 1
+                position.moves += 1
+        return position
+
+    @classmethod
+    def from_moves(cls, moves, player=1):
+
+        """ Creates a position by playing a sequence of moves from the empty grid.
+
+        Args:
+            moves: string of column numbers from 1 to 7, like "4453"
+            player: player who makes the first move
+
+        Returns:
+            position: position after the moves
+
+        Raises:
+            ValueError: if a move is not a column number or the column is full """
+
+        position = cls(player)
+        for move in moves:
+            col = int(move) - 1
+            if not 0 <= col < WIDTH or not position.can_play(col):
+                raise ValueError(f"Invalid move {move} in {moves}")
+            position.play(col)
+        return position
+
+    @classmethod
+    def from_key(cls, key):
+
+        """ Creates a position from its key, the reverse of key.
+            Every column of the key holds the markers of the player to move plus
+            the occupied cells, which is one less than a power of two plus the markers,
+            so the height of the column is where the highest bit ends up.
+            Player 1 is taken to have made the first move.
+
+        Args:
+            key: key of a position
+
+        Returns:
+            position: position with the key
+
+        Raises:
+            ValueError: if the number is not the key of any position """
+
+        if key < 0 or key >> WIDTH * STRIDE:
+            raise ValueError(f"invalid position key {key}")
+        columns = []
+        for col in range(WIDTH):
+            column = key >> col * STRIDE & (1 << STRIDE) - 1
+            height = (column + 1).bit_length() - 1
+            if height > HEIGHT:
+                raise ValueError(f"invalid position key {key}")
+            columns.append((height, column - ((1 << height) - 1)))
+        player = 1 if sum(height for height, _ in columns) % 2 == 0 else 2
+        grid = [[0] * WIDTH for _ in range(HEIGHT)]
+        for col, (height, markers) in enumerate(columns):
+            for cell in range(height):
+                grid[HEIGHT - 1 - cell][col] = player if markers >> cell & 1 else 3 - player
+        return cls.from_grid(grid, player)
+
+    def to_grid(self):
+
+        """ Returns the grid used by the game, the reverse of from_grid.
+
+        Returns:
+            grid: 6 rows of 7 cells from the top row down, 0 for an empty cell """
+
+        grid = [[0] * WIDTH for _ in range(HEIGHT)]
+        for col in range(WIDTH):
+            for cell in range(self.heights[col] - col * STRIDE):
+                bit = 1 << col * STRIDE + cell
+                grid[HEIGHT - 1 - cell][col] = self.player if self.current & bit else 3 - self.player
+        return grid
+
+    def can_play(self, col):
+
+        """ Checks if a column still has room for a marker.
+
+        Args:
+            col: column to check
+
+        Returns:
+            True if the column is not full
+            False if the column is full """
+
+        return self.heights[col] < TOP[col]
+
+    def play(self, col):
+
+        """ Places a marker for the current player and passes the turn.
+            The column must not be full.
+
+        Args:
+            col: column of the move
+
+        Returns:
+            cell: bit index of the placed marker """
+
+        cell = self.heights[col]
+        self.heights[col] += 1
+        self.current, self.opponent = self.opponent, self.current | 1 << cell
+        self.hash ^= ZOBRIST[self.player][cell] ^ SIDE
+        self.mirror_hash ^= MIRROR_ZOBRIST[self.player][cell] ^ SIDE
+        self.player = 3 - self.player
+        self.moves += 1
+        return cell
+
+    def undo(self, col):
+
+        """ Takes back the latest marker placed in a column and passes the turn back.
+
+        Args:
+            col: column of the move to take back
+
+        Returns:
+            cell: bit index of the removed marker """
+
+        self.heights[col] -= 1
+        cell = self.heights[col]
+        self.current, self.opponent = self.opponent ^ 1 << cell, self.current
+        self.player = 3 - self.player
+        self.hash ^= ZOBRIST[self.player][cell] ^ SIDE
+        self.mirror_hash ^= MIRROR_ZOBRIST[self.player][cell] ^ SIDE
+        self.moves -= 1
+        return cell
+
+    def is_winning_move(self, col):
+
+        """ Checks if the current player would win by playing in a column.
+
+        Args:
+            col: column of the move
+
+        Returns:
+            True if the move connects four
+            False if the move doesn't connect four """
+
+        return has_four(self.current | 1 << self.heights[col])
+
+    def possible(self):
+
+        """ Returns the cells where a marker can be placed right now.
+            Adding the bottom cells to the occupied cells carries the bit of
+            every column over its markers to the first empty cell.
+
+        Returns:
+            bitboard with the playable cell of every column that is not full """
+
+        return (self.current | self.opponent) + BOTTOM_MASK & BOARD_MASK
+
+    def winning_cells(self):
+
+        """ Returns the empty cells where the current player would connect four.
+
+        Returns:
+            bitboard of the cells, playable or not """
+
+        return winning_cells(self.current, self.current | self.opponent)
+
+    def opponent_winning_cells(self):
+
+        """ Returns the empty cells where the opponent would connect four.
+
+        Returns:
+            bitboard of the cells, playable or not """
+
+        return winning_cells(self.opponent, self.current | self.opponent)
+
+    def can_win_next(self):
+
+        """ Checks if the current player can connect four with this move.
+
+        Returns:
+            True if a winning cell is playable
+            False if not """
+
+        return self.winning_cells() & self.possible() != 0
+
+    def forced_blocks(self):
+
+        """ Returns the cells the current player must play to stop the opponent
+            from winning on the next move.
+
+        Returns:
+            bitboard of the playable winning cells of the opponent """
+
+        return self.opponent_winning_cells() & self.possible()
+
+    def non_losing_moves(self):
+
+        """ Returns the moves that don't let the opponent win on the next move.
+            The current player must not be able to win with this move.
+            If the opponent has a playable winning cell, it must be blocked, and with
+            two of them every move loses. A move right below a winning cell of the
+            opponent would let the opponent play there, so it is left out too.
+
+        Returns:
+            bitboard with the playable cells of the moves, 0 if every move loses """
+
+        possible = self.possible()
+        threats = self.opponent_winning_cells()
+        forced = possible & threats
+        if forced:
+            if forced & (forced - 1):
+                return 0
+            possible = forced
+        return possible & ~(threats >> 1)
+
+    def double_threats(self, moves=None):
+
+        """ Returns the non-losing moves after which the current player has two
+            playable winning cells. The opponent can block only one of them, so
+            such a move wins the game two moves later. The current player must
+            not be able to win with this move.
+
+        Args:
+            moves: the non-losing moves if they are already known
+
+        Returns:
+            bitboard with the playable cells of the moves """
+
+        if moves is None:
+            moves = self.non_losing_moves()
+        occupied = self.current | self.opponent
+        threats = 0
+        remaining = moves
+        while remaining:
+            move = remaining & -remaining
+            remaining ^= move
+            after = occupied | move
+            playable = winning_cells(self.current | move, after) & (after + BOTTOM_MASK & BOARD_MASK)
+            if playable & (playable - 1):
+                threats |= move
+        return threats
+
+    def is_full(self):
+
+        """ Checks if the grid is full.
+
+        Returns:
+            True if there are no moves left
+            False if there are moves left """
+
+        return self.moves == SIZE
+
+    def key(self):
+
+        """ Returns an integer that identifies the position.
+            Adding the current player's markers to the occupied cells
+            gives a different number for every position.
+
+        Returns:
+            key of the position """
+
+        return self.current + (self.current | self.opponent)
+
+    def canonical_key(self):
+
+        """ Returns the same key for a position and its mirror image.
+            Every column takes its own STRIDE bits of the key, so the key
+            is mirrored by reversing the order of the columns.
+
+        Returns:
+            smaller of the key and the mirrored key """
+
+        key = self.key()
+        column_mask = (1 << STRIDE) - 1
+        mirrored = 0
+        for col in range(WIDTH):
+            mirrored |= (key >> col * STRIDE & column_mask) << (WIDTH - 1 - col) * STRIDE
+        return min(key, mirrored)
+
+    def canonical_hash(self):
+
+        """ Returns the same hash for a position and its mirror image.
+            Mirrored positions have the same score, so they can share
+            transposition table entries.
+
+        Returns:
+            canonical: smaller of the hash and the mirrored hash
+            mirrored: True if the canonical hash is the mirrored one """
+
+        if self.mirror_hash < self.hash:
+            return self.mirror_hash, True
+        return self.hash, False
@@ -0,0 +1,247 @@
+"""This module provides reading and writing of Connect 4 game records, for example for labeled positions
+and regression corpora. A record is a move string, the key of the position after the moves and an optional
+score. Records are stored one per line in text files or as fixed-size records in binary files, and
+they are read and written lazily, so files don't need to fit in memory."""
+
+import argparse
+import struct
+from collections import namedtuple
+from position import Position
+
+MAGIC = b"C4GR"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+# Key, the moves packed 3 bits each, number of moves and score
+RECORD = struct.Struct("<Q16sBb")
+# Score stored in binary files for records without a score
+NO_SCORE = -128
+
+# Record of a game or position: string of columns from 1 to 7, key of the position after the moves
+# (Position.key, unique and below 2**49) and a score, None if the record has no score
+Record = namedtuple("Record", ["moves", "key", "score"])
+
+
+def encode(moves, score=None):
+
+    """ Creates a record from a move string.
+
+    Args:
+        moves: string of columns from 1 to 7 like "4453", player 1 moving first
+        score: score of the position, None for no score
+
+    Returns:
+        record of the moves
+
+    Raises:
+        ValueError: if a move is not valid """
+
+    return Record(moves, Position.from_moves(moves).key(), score)
+
+
+def moves_to_grid(moves):
+
+    """ Returns the grid of the game after a move string, in the layout of ConnectFour.grid. """
+
+    return Position.from_moves(moves).to_grid()
+
+
+def key_to_grid(key):
+
+    """ Returns the grid of the position with a key, in the layout of ConnectFour.grid. """
+
+    return Position.from_key(key).to_grid()
+
+
+def grid_to_key(grid):
+
+    """ Returns the key of the position in a grid where player 1 made the first move.
+
+    Args:
+        grid: game situation in the layout of ConnectFour.grid
+
+    Returns:
+        key of the position """
+
+    markers = sum(cell != 0 for row in grid for cell in row)
+    return Position.from_grid(grid, 1 if markers % 2 == 0 else 2).key()
+
+
+def pack_moves(moves):
+
+    """ Packs a move string into 16 bytes, 3 bits for every move.
+
+    Args:
+        moves: string of at most 42 columns from 1 to 7
+
+    Returns:
+        the packed moves """
+
+    packed = 0
+    for index, move in enumerate(moves):
+        packed |= (int(move) - 1) << 3 * index
+    return packed.to_bytes(16, "little")
+
+
+def unpack_moves(packed, count):
+
+    """ Unpacks a move string packed with pack_moves.
+
+    Args:
+        packed: the packed moves
+        count: number of moves
+
+    Returns:
+        string of columns from 1 to 7 """
+
+    value = int.from_bytes(packed, "little")
+    return "".join(str((value >> 3 * index & 7) + 1) for index in range(count))
+
+
+def read_text(lines):
+
+    """ Reads records from lines of text.
+        Every line has the moves, the key as a hexadecimal number and the score,
+        separated by tabs. The key and the score can be left out, so a file with
+        one move string per line can be read too. Empty lines and lines starting
+        with # are skipped.
+
+    Args:
+        lines: iterable of lines, like an open text file
+
+    Yields:
+        record of every line
+
+    Raises:
+        ValueError: if a line has an invalid move or a key that doesn't match its moves """
+
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.rstrip("\r\n").split("\t")
+        record = encode(fields[0].strip())
+        if len(fields) > 1 and fields[1] and int(fields[1], 16) != record.key:
+            raise ValueError(f"key {fields[1]} doesn't match the moves {record.moves}")
+        if len(fields) > 2 and fields[2]:
+            record = record._replace(score=int(fields[2]))
+        yield record
+
+
+def write_text(file, records):
+
+    """ Writes records as lines of text for read_text.
+
+    Args:
+        file: text file open for writing
+        records: iterable of records
+
+    Returns:
+        number of records written """
+
+    count = 0
+    for moves, key, score in records:
+        file.write(f'{moves}\t{key:016x}\t{"" if score is None else score}\n')
+        count += 1
+    return count
+
+
+def read_binary(file):
+
+    """ Reads records from a binary file written with write_binary.
+
+    Args:
+        file: binary file open for reading
+
+    Yields:
+        record of every fixed-size record in the file
+
+    Raises:
+        ValueError: if the file is not a record file """
+
+    magic, version, size = HEADER.unpack(file.read(HEADER.size).ljust(HEADER.size, b"\0"))
+    if magic != MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError("not a record file")
+    while len(chunk := file.read(RECORD.size)) == RECORD.size:
+        key, packed, count, score = RECORD.unpack(chunk)
+        yield Record(unpack_moves(packed, count), key, None if score == NO_SCORE else score)
+
+
+def write_binary(file, records):
+
+    """ Writes records to a binary file, a header and then one fixed-size record for every record.
+
+    Args:
+        file: binary file open for writing
+        records: iterable of records, with scores between -127 and 127
+
+    Returns:
+        number of records written """
+
+    file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+    count = 0
+    for moves, key, score in records:
+        file.write(RECORD.pack(key, pack_moves(moves), len(moves), NO_SCORE if score is None else score))
+        count += 1
+    return count
+
+
+def is_binary(path):
+
+    """ Checks if a file is a binary record file by its first bytes. """
+
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def read_records(path):
+
+    """ Reads the records of a text or binary file, whichever the file is.
+
+    Args:
+        path: path of the file
+
+    Yields:
+        record of every game or position in the file """
+
+    if is_binary(path):
+        with open(path, "rb") as file:
+            yield from read_binary(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            yield from read_text(file)
+
+
+def write_records(path, records, binary=False):
+
+    """ Writes records to a text or binary file.
+
+    Args:
+        path: path of the file
+        records: iterable of records
+        binary: True for a binary file, False for a text file
+
+    Returns:
+        number of records written """
+
+    if binary:
+        with open(path, "wb") as file:
+            return write_binary(file, records)
+    with open(path, "w", encoding="utf-8") as file:
+        return write_text(file, records)
+
+
+def main():
+
+    """ Converts a record file between the text and binary formats. """
+
+    parser = argparse.ArgumentParser(description="Convert Connect 4 record files between text and binary")
+    parser.add_argument("input", help="text file with a move string per line, or a binary record file")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--binary", action="store_true", help="write a binary file instead of a text file")
+    arguments = parser.parse_args()
+
+    count = write_records(arguments.output, read_records(arguments.input), arguments.binary)
+    print(f'{count} records written to {arguments.output}')
+
+
+if __name__ == "__main__":
+    main()
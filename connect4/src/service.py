@@ -0,0 +1,351 @@
+"""This module provides an engine service that hosts many Connect 4 games at the same time.
+Clients connect to a local socket and send requests as JSON objects, one per line.
+Every request gets one JSON line back with the same "id".
+
+Requests:
+    {"op": "new"}: starts a game, the reply has its "game" number
+    {"op": "play", "game": 1, "col": 3}: plays a move for the player whose turn it is
+    {"op": "ai", "game": 1, "time": 0.5, "depth": 8, "nodes": 100000}: lets the AI play the move,
+        "time", "depth" and "nodes" are optional and the search stops at the first limit it reaches,
+        "time": null searches without a time limit, which gives the same move on every machine
+    {"op": "cancel", "game": 1}: stops the AI search of a game without playing a move
+    {"op": "state", "game": 1}: returns the state of a game
+    {"op": "close", "game": 1}: ends a game"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from AI import AI
+from analysis import to_position
+from connect4 import Game
+from transposition import TranspositionTable, SharedTranspositionTable
+
+
+class ServiceError(Exception):
+
+    """ Raised when a request can't be carried out. The message is sent back to the client. """
+
+
+class Session:
+
+    """ Class for one game hosted by the service.
+
+    Attributes:
+        game: game state
+        search: AI searching a move for the game, None if there is no search
+        waiting: True while a search of the game waits for a free AI
+        cancelled: True if the latest search was cancelled """
+
+    def __init__(self):
+
+        """ Constructor for the class. Starts a game where player 1 moves first. """
+
+        self.game = Game()
+        self.search = None
+        self.waiting = False
+        self.cancelled = False
+
+    @property
+    def result(self):
+
+        """ None while the game goes on, then the winner (1 or 2) or 0 for a draw. """
+
+        return self.game.result
+
+    def play(self, col):
+
+        """ Plays a move for the player whose turn it is.
+
+        Args:
+            col: column of the move
+
+        Raises:
+            ServiceError: if the game is over or the move is not valid """
+
+        if self.result is not None:
+            raise ServiceError("game is over")
+        if not isinstance(col, int) or col not in self.game.legal_moves():
+            raise ServiceError(f"invalid column {col}")
+        self.game.play(col)
+
+    def cancel(self):
+
+        """ Cancels the search of the game, also one that is still waiting for a free AI. """
+
+        if self.search is not None or self.waiting:
+            self.cancelled = True
+        if self.search is not None:
+            self.search.control.clock.cancel()
+
+    def state(self):
+
+        """ Returns the state of the game for a reply. """
+
+        return {"grid": self.game.grid, "turn": self.game.turn, "result": self.result}
+
+
+class EngineService:
+
+    """ Class for the engine service.
+        Searches run on a thread pool so the event loop keeps serving other
+        games. Every thread has its own AI, so the AIs are never shared by two
+        searches at the same time. An AI's transposition table is kept between
+        searches, and positions of one game help the other games too.
+        With a cache file all AIs share one solver table, which is kept in the
+        file for the next time the service is started.
+
+    Attributes:
+        sessions: games by number
+        ais: queue of AIs that are not searching
+        executor: thread pool for the searches
+        time_limit: seconds for a move when the request doesn't give a time
+        next_game: number of the next game
+        server: asyncio server, None until the service is started
+        cache: solver table shared by the AIs, None if there is no cache file """
+
+    def __init__(self, workers=2, time_limit=1.0, table_memory=1 << 22, cache=None):
+
+        """ Constructor for the class.
+
+        Args:
+            workers: number of searches that can run at the same time
+            time_limit: seconds for a move when the request doesn't give a time
+            table_memory: bytes for the transposition table of every AI
+            cache: path of a table file for the solver, None for a table for every AI """
+
+        self.sessions = {}
+        self.cache = SharedTranspositionTable(cache) if cache is not None else None
+        self.ais = asyncio.Queue()
+        for _ in range(workers):
+            ai = AI()
+            ai.table = TranspositionTable(table_memory)
+            if self.cache is not None:
+                ai.solver.table = self.cache
+            self.ais.put_nowait(ai)
+        self.executor = ThreadPoolExecutor(workers)
+        self.time_limit = time_limit
+        self.next_game = 1
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+
+        """ Starts listening for clients.
+
+        Args:
+            host: address to listen on
+            port: port to listen on, 0 for any free port
+
+        Returns:
+            port: port the service listens on """
+
+        self.server = await asyncio.start_server(self.serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+
+        """ Stops the service. Searches that are running are finished first. """
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+
+    async def serve(self, reader, writer):
+
+        """ Serves one client connection.
+            Requests are handled at the same time, so a search doesn't block
+            a cancel request on the same connection.
+
+        Args:
+            reader: stream of the client's requests
+            writer: stream for the replies """
+
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self.reply(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def reply(self, line, writer, lock):
+
+        """ Handles one request and writes the reply.
+
+        Args:
+            line: request as a JSON line
+            writer: stream for the replies
+            lock: lock that keeps replies on the connection from mixing """
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServiceError("a request must be a JSON object")
+            request_id = request.get("id")
+            response = {"id": request_id, "ok": True, **await self.handle(request)}
+        except (ServiceError, ValueError, TypeError) as error:
+            response = {"id": request_id, "ok": False, "error": str(error)}
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # The client waits for a reply to every request, so even an unexpected error gets one
+            response = {"id": request_id, "ok": False, "error": f"internal error: {error!r}"}
+        async with lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def handle(self, request):
+
+        """ Carries out a request.
+
+        Args:
+            request: request as a dictionary
+
+        Returns:
+            dictionary of the fields of the reply
+
+        Raises:
+            ServiceError: if the request can't be carried out """
+
+        operation = request.get("op")
+        if operation == "new":
+            game = self.next_game
+            self.next_game += 1
+            self.sessions[game] = Session()
+            return {"game": game, **self.sessions[game].state()}
+
+        session = self.session(request)
+        if operation == "play":
+            if session.search is not None or session.waiting:
+                raise ServiceError("the AI is searching a move")
+            session.play(request.get("col"))
+            return session.state()
+        if operation == "ai":
+            return await self.search(session, request.get("time", self.time_limit), request.get("depth"),
+                                     request.get("nodes"))
+        if operation == "cancel":
+            session.cancel()
+            return session.state()
+        if operation == "state":
+            return session.state()
+        if operation == "close":
+            session.cancel()
+            del self.sessions[request["game"]]
+            return {}
+        raise ServiceError(f"unknown operation {operation}")
+
+    def session(self, request):
+
+        """ Finds the game of a request.
+
+        Args:
+            request: request as a dictionary
+
+        Returns:
+            session of the game
+
+        Raises:
+            ServiceError: if there is no such game """
+
+        session = self.sessions.get(request.get("game"))
+        if session is None:
+            raise ServiceError(f"no game {request.get('game')}")
+        return session
+
+    async def search(self, session, time_limit, max_depth=None, max_nodes=None):
+
+        """ Lets the AI play a move in a game.
+            The search runs on the thread pool while the event loop serves others.
+
+        Args:
+            session: game to play in
+            time_limit: seconds for the search, None for no time limit
+            max_depth: deepest depth of the search, None for no limit
+            max_nodes: nodes the search may visit, None for no limit
+
+        Returns:
+            dictionary with the move, its score and depth, the limit that ended the search, the seconds
+            the reply took and the state of the game, or only the state if the search was cancelled
+
+        Raises:
+            ServiceError: if the game is over or already has a search """
+
+        start = time.perf_counter()
+        if session.result is not None or session.search is not None or session.waiting:
+            raise ServiceError("game is over" if session.result is not None else "the AI is already searching a move")
+        session.waiting, session.cancelled = True, False
+        try:
+            ai = await self.ais.get()
+        finally:
+            session.waiting = False
+        # A cancel that came while waiting for a free AI stops the search before it starts
+        if session.cancelled:
+            self.ais.put_nowait(ai)
+            return {"cancelled": True, **session.state()}
+        session.search = ai
+        try:
+            ai.time_limit = float(time_limit) if time_limit is not None else float('inf')
+            ai.control.max_depth = int(max_depth) if max_depth is not None else None
+            ai.max_nodes = int(max_nodes) if max_nodes is not None else None
+            position = to_position(session.game.grid)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, ai.search_position, position)
+        finally:
+            session.search = None
+            self.ais.put_nowait(ai)
+
+        if session.cancelled:
+            return {"cancelled": True, **session.state()}
+        session.play(result.col)
+        return {"col": result.col, "score": result.score, "depth": result.depth, "limit": result.limit,
+                "time": time.perf_counter() - start, **session.state()}
+
+
+async def run(host, port, workers, time_limit, cache=None):
+
+    """ Runs the service until it is stopped.
+
+    Args:
+        host: address to listen on
+        port: port to listen on
+        workers: number of searches that can run at the same time
+        time_limit: seconds for a move when the request doesn't give a time
+        cache: path of a table file for the solver, None for no file """
+
+    service = EngineService(workers, time_limit, cache=cache)
+    port = await service.start(host, port)
+    print(f"Listening on {host}:{port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+
+    """ Starts the service from the command line. """
+
+    parser = argparse.ArgumentParser(description="Connect 4 engine service")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=2, help="number of searches at the same time")
+    parser.add_argument("--time", type=float, default=1.0, help="default seconds for a move")
+    parser.add_argument("--cache", help="file that keeps solved positions between runs")
+    parser.add_argument("--cold", action="store_true", help="empty the cache file first")
+    arguments = parser.parse_args()
+    if arguments.cache and arguments.cold:
+        SharedTranspositionTable(arguments.cache, warm_start=False).close()
+    try:
+        asyncio.run(run(arguments.host, arguments.port, arguments.workers, arguments.time, arguments.cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
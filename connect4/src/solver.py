@@ -0,0 +1,236 @@
+"""This module provides a solver that finds the exact game-theoretic value of a Connect 4 position.
+The solver uses negamax with alpha-beta pruning and narrows down the score with null-window searches."""
+
+from bitboard import SIZE, COLUMN_MASKS
+from timing import SearchTimeout
+from transposition import TranspositionTable, LOWER, UPPER
+
+# Part of the time and the nodes for a move the solver may use, the rest is left for a search if it runs out
+SOLVE_SHARE = 0.5
+
+
+class Solver:
+
+    """ Class for solving Connect 4 positions.
+        Scores are given from the point of view of the player to move.
+        A positive score means that player wins: the earlier the win, the higher the score.
+        If the player wins with their last marker the score is 1, and one more for
+        every marker they have left after the win. A draw is 0 and losses are negative.
+
+    Attributes:
+        columns: order in which columns are searched
+        table: transposition table for bounds of solved positions
+        book: opening book with scores of early positions, None if there is no book
+        nodes: number of nodes searched
+        clock: TimeManager that stops the solver, None to always solve to the end """
+
+    def __init__(self, table=None):
+
+        """ Constructor for the class.
+
+        Args:
+            table: transposition table to use, a new one is created if not given """
+
+        self.columns = [3, 2, 4, 1, 5, 0, 6]
+        self.table = table if table is not None else TranspositionTable()
+        self.book = None
+        self.nodes = 0
+        self.clock = None
+
+    def solve(self, position):
+
+        """ Finds the exact score of a position.
+            The score is narrowed down with null-window searches that only tell
+            whether the score is above or below a guess. The guess is taken from
+            the middle of the possible scores, leaning towards zero because
+            searches close to zero are the fastest.
+
+        Args:
+            position: position to solve
+
+        Returns:
+            score: exact score of the position """
+
+        self.nodes = 0
+        return self.bisect(position)
+
+    def bisect(self, position):
+
+        """ Narrows down the score of a position with null-window searches.
+            Positions found in the opening book are not searched at all.
+
+        Args:
+            position: position to solve
+
+        Returns:
+            score: exact score of the position """
+
+        if self.in_book(position):
+            score = self.book.lookup(position)
+            if score is not None:
+                return score
+
+        if self.can_win_now(position):
+            return (SIZE + 1 - position.moves) // 2
+
+        low = -((SIZE - position.moves) // 2)
+        high = (SIZE + 1 - position.moves) // 2
+        while low < high:
+            guess = low + (high - low) // 2
+            if 0 >= guess > int(low / 2):
+                guess = int(low / 2)
+            elif 0 <= guess < int(high / 2):
+                guess = int(high / 2)
+            score = self.negamax(position, guess, guess + 1)
+            if score <= guess:
+                high = score
+            else:
+                low = score
+        return low
+
+    def best_move(self, position):
+
+        """ Finds the column with the best score.
+
+        Args:
+            position: position to solve
+
+        Returns:
+            best_col: column of the best move
+            score: exact score of the position
+
+        Raises:
+            SearchTimeout: if the solver's share of the clock runs out, the position is the same afterwards """
+
+        self.nodes = 0
+        for col in self.columns:
+            if position.can_play(col) and position.is_winning_move(col):
+                return col, (SIZE + 1 - position.moves) // 2
+
+        best_col, best_score = None, -SIZE
+        for col in self.columns:
+            if position.can_play(col):
+                position.play(col)
+                try:
+                    score = -self.bisect(position)
+                finally:
+                    position.undo(col)
+                if best_col is None or score > best_score:
+                    best_col, best_score = col, score
+        return best_col, best_score
+
+    def in_book(self, position, ahead=0):
+
+        """ Checks if a position is early enough to be in the opening book.
+
+        Args:
+            position: position to check
+            ahead: number of moves after the position that must be in the book too
+
+        Returns:
+            True if the book covers positions with this many markers
+            False if it doesn't or there is no book """
+
+        return self.book is not None and position.moves + ahead <= self.book.plies
+
+    def can_win_now(self, position):
+
+        """ Checks if the player to move has a winning move.
+
+        Args:
+            position: position to check
+
+        Returns:
+            True if there is a winning move
+            False if there isn't """
+
+        return position.can_win_next()
+
+    def window(self, position, key, alpha, beta):
+
+        """ Narrows the search window with the bounds known without searching the position.
+
+        Args:
+            position: position to search, without a winning move for the player to move
+            key: key of the position in the transposition table
+            alpha: score the player to move is already guaranteed
+            beta: score the opponent is already guaranteed
+
+        Returns:
+            alpha: new alpha
+            beta: new beta
+            score: score of the position, or a bound for it, if the window closed, otherwise None """
+
+        # The opponent can't win with their next move either, so the earliest loss is two markers later
+        low = -((SIZE - 2 - position.moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha, beta, alpha
+
+        entry = self.table.probe(key)
+        if entry is not None:
+            _, bound, flag, _ = entry
+            if flag == UPPER and bound < beta:
+                beta = bound
+            elif flag == LOWER and bound > alpha:
+                alpha = bound
+            if alpha >= beta:
+                return alpha, beta, bound
+
+        # The player to move can't win right away, so the earliest possible win is one marker later
+        high = (SIZE - 1 - position.moves) // 2
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return alpha, beta, beta
+        return alpha, beta, None
+
+    def negamax(self, position, alpha, beta):
+
+        """ Negamax search with alpha-beta pruning.
+            The position must not have a winning move for the player to move.
+            Only moves that don't let the opponent win on the next move are searched,
+            so the children don't have winning moves either.
+            Scores outside the window (alpha, beta) are only bounds: a score at most
+            alpha is an upper bound and a score at least beta is a lower bound.
+
+        Args:
+            position: position to search
+            alpha: score the player to move is already guaranteed
+            beta: score the opponent is already guaranteed
+
+        Returns:
+            score of the position, or a bound for it """
+
+        self.nodes += 1
+        if self.clock is not None and self.nodes % self.clock.interval == 0:
+            limit = self.clock.exceeded(self.nodes, SOLVE_SHARE)
+            if limit is not None:
+                raise SearchTimeout(limit)
+        moves = position.non_losing_moves()
+        if not moves:
+            return -((SIZE - position.moves) // 2)
+        if position.moves >= SIZE - 2:
+            return 0
+
+        key = position.canonical_hash()[0]
+        alpha, beta, score = self.window(position, key, alpha, beta)
+        if score is not None:
+            return score
+
+        for col in self.columns:
+            if moves & COLUMN_MASKS[col]:
+                position.play(col)
+                try:
+                    score = -self.negamax(position, -beta, -alpha)
+                finally:
+                    # A timeout unwinds the search, and the position must still be taken back
+                    position.undo(col)
+                if score >= beta:
+                    self.table.store(key, 0, score, LOWER, None)
+                    return score
+                alpha = max(alpha, score)
+
+        self.table.store(key, 0, alpha, UPPER, None)
+        return alpha
@@ -0,0 +1,114 @@
+"""This module provides statistics about the searches of the Connect 4 AI.
+Statistics are only collected when the AI has a SearchStats object."""
+
+import time
+
+
+class SearchStats:
+
+    """ Class for collecting statistics about a search.
+
+    Attributes:
+        on_iteration: function called with a dictionary after every iteration of the search, or None
+        nodes: number of nodes visited with each number of markers on the grid
+        cutoffs: number of cutoffs after each move index, index 0 being the first move searched
+        probes: number of transposition table lookups
+        hits: number of lookups that found the position
+        stores: number of positions stored in the transposition table
+        iterations: time, nodes, score and move of every finished iteration """
+
+    def __init__(self, on_iteration=None):
+
+        """ Constructor for the class.
+
+        Args:
+            on_iteration: function to call with a dictionary after every iteration """
+
+        self.on_iteration = on_iteration
+        self.reset()
+
+    def reset(self):
+
+        """ Clears the statistics for a new search. """
+
+        self.nodes = [0] * 43
+        self.cutoffs = [0] * 7
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.iterations = []
+        self.start = time.perf_counter()
+
+    def node(self, moves):
+
+        """ Counts a visited node.
+
+        Args:
+            moves: number of markers on the grid in the node """
+
+        self.nodes[moves] += 1
+
+    def cutoff(self, index):
+
+        """ Counts a cutoff.
+
+        Args:
+            index: index of the move that caused the cutoff in the search order """
+
+        self.cutoffs[index] += 1
+
+    def probe(self, hit):
+
+        """ Counts a transposition table lookup.
+
+        Args:
+            hit: True if the position was found """
+
+        self.probes += 1
+        self.hits += hit
+
+    def store(self):
+
+        """ Counts a position stored in the transposition table. """
+
+        self.stores += 1
+
+    def iteration(self, depth, score, col):
+
+        """ Records a finished iteration of iterative deepening.
+
+        Args:
+            depth: depth of the iteration
+            score: score found by the iteration
+            col: best column found by the iteration """
+
+        now = time.perf_counter()
+        previous = self.iterations[-1]["elapsed"] if self.iterations else 0.0
+        event = {"depth": depth, "score": score, "col": col, "nodes": sum(self.nodes),
+                 "elapsed": now - self.start, "time": now - self.start - previous}
+        self.iterations.append(event)
+        if self.on_iteration is not None:
+            self.on_iteration(event)
+
+    def summary(self):
+
+        """ Returns the statistics in a form that doesn't change with later searches.
+
+        Returns:
+            dictionary of the statistics """
+
+        cutoffs = sum(self.cutoffs)
+        # Every depth between the first and the last one searched has nodes
+        return {
+            "nodes": sum(self.nodes),
+            "nodes_per_depth": [nodes for nodes in self.nodes if nodes],
+            "cutoffs": cutoffs,
+            "cutoffs_per_index": list(self.cutoffs),
+            "first_move_cutoff_rate": self.cutoffs[0] / cutoffs if cutoffs else 0.0,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "iterations": list(self.iterations),
+            "time": time.perf_counter() - self.start,
+        }
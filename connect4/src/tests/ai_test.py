@@ -1,6 +1,11 @@
 import unittest
 from unittest.mock import Mock
 from AI import AI
+from transposition import TranspositionTable
+from solver import Solver
+from stats import SearchStats
+from timing import TimeManager, TIME, NODES, DEPTH, SOLVED
+from position import Position
 
 class TestAI(unittest.TestCase):
     def setUp(self):
@@ -8,10 +13,14 @@ class TestAI(unittest.TestCase):
 
     def test_init(self):
         self.assertEqual(self.AI.columns, [3,2,4,1,5,0,6])
-        self.assertEqual(self.AI.last_cell, (-1, -1))
         self.assertEqual(self.AI.time_limit, 5)
-        self.assertEqual(self.AI.best_moves, {})
-        self.assertEqual(self.AI.start_time, None)
+        self.assertIsInstance(self.AI.table, TranspositionTable)
+        self.assertIsInstance(self.AI.control.clock, TimeManager)
+        self.assertEqual(self.AI.nodes, 0)
+        self.assertEqual(self.AI.parallel, None)
+        self.assertEqual(self.AI.control.stats, None)
+        self.assertEqual(self.AI.control.max_depth, None)
+        self.assertIsInstance(self.AI.solver, Solver)
 
     def test_play(self):
         grid = [[0, 0, 0, 0, 0, 0, 0] for _ in range(6)]
@@ -36,6 +45,8 @@ class TestAI(unittest.TestCase):
                 [0, 0, 0, 2, 2, 0, 0],
                 [0, 0, 2, 1, 2, 1, 0],
                 [1, 0, 1, 2, 1, 1, 2]]
+        self.AI.time_limit = float('inf')
+        self.AI.control.max_depth = 10
         best_col, score = self.AI.play(grid)
         self.assertEqual(best_col, 5)
         self.assertEqual(score, 1000)
@@ -47,9 +58,200 @@ class TestAI(unittest.TestCase):
                 [0, 0, 1, 2, 0, 0, 0],
                 [0, 0, 1, 1, 0, 0, 0],
                 [0, 0, 1, 2, 0, 0, 0]]
+        self.AI.time_limit = float('inf')
+        self.AI.control.max_depth = 10
         best_col, _ = self.AI.play(grid)
         self.assertEqual(best_col, 2)
 
+    def test_minimax_finds_double_threat(self):
+        position = Position.from_moves("4455", 2)
+        self.assertEqual(self.AI.minimax(position, 2, float('-inf'), float('inf'), True), (1000, 2))
+        self.assertEqual(position.moves, 4)
+
+    def test_minimax_blocks_threat(self):
+        position = Position.from_moves("12121", 2)
+        _, best_col = self.AI.minimax(position, 1, float('-inf'), float('inf'), True)
+        self.assertEqual(best_col, 0)
+
+    def test_minimax_sees_unstoppable_threats(self):
+        position = Position.from_moves("44556", 2)
+        score, best_col = self.AI.minimax(position, 1, float('-inf'), float('inf'), True)
+        self.assertEqual(score, -1000)
+        self.assertIsNotNone(best_col)
+
+    def test_play_solves_late_game(self):
+        grid = [[2, 0, 2, 1, 2, 2, 2],
+                [2, 1, 1, 2, 2, 2, 1],
+                [1, 1, 1, 2, 1, 1, 1],
+                [2, 2, 1, 1, 2, 2, 1],
+                [2, 2, 2, 1, 2, 2, 2],
+                [2, 1, 2, 2, 2, 1, 1]]
+        self.assertEqual(self.AI.play(grid), (1, 0))
+
+    def test_search_without_stats(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0] for _ in range(6)]
+        self.AI.time_limit = 0.1
+        result = self.AI.search(grid)
+        self.assertIsNotNone(result.col)
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertEqual(result.stats, None)
+
+    def test_search_collects_stats(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0] for _ in range(6)]
+        events = []
+        self.AI.control.stats = SearchStats(on_iteration=events.append)
+        self.AI.time_limit = 0.1
+        result = self.AI.search(grid)
+        self.assertEqual(result.stats["nodes"], self.AI.nodes)
+        self.assertEqual(len(result.stats["iterations"]), result.depth)
+        self.assertEqual(events, result.stats["iterations"])
+        self.assertEqual(result.stats["nodes_per_depth"][0], result.depth)
+        self.assertGreater(result.stats["probes"], 0)
+        self.assertGreater(result.stats["stores"], 0)
+        self.assertEqual(result.stats["cutoffs"], sum(result.stats["cutoffs_per_index"]))
+
+    def test_depth_limit(self):
+        self.AI.time_limit = float('inf')
+        self.AI.control.max_depth = 4
+        result = self.AI.search_position(Position.from_moves("4453", 2))
+        self.assertEqual((result.depth, result.limit), (4, DEPTH))
+        result = self.AI.search_position(Position.from_moves("4453", 2), 3)
+        self.assertEqual((result.depth, result.limit), (3, DEPTH))
+
+    def test_node_limit_is_reproducible(self):
+        results = []
+        for _ in range(2):
+            ai = AI()
+            ai.time_limit = float('inf')
+            ai.max_nodes = 5000
+            results.append((ai.search_position(Position.from_moves("44", 2)), ai.nodes))
+        (first, nodes), (second, _) = results
+        self.assertEqual(first.limit, NODES)
+        self.assertEqual(first[:3], second[:3])
+        self.assertEqual(nodes, results[1][1])
+        self.assertLess(nodes, 5000 + self.AI.control.clock.interval)
+
+    def test_limits_combine(self):
+        self.AI.time_limit = 0.05
+        self.AI.control.max_depth = 30
+        self.AI.max_nodes = 10 ** 9
+        self.assertEqual(self.AI.search_position(Position.from_moves("44", 2)).limit, TIME)
+        self.AI.time_limit = 5
+        self.AI.max_nodes = 2000
+        self.assertEqual(self.AI.search_position(Position.from_moves("44", 2)).limit, NODES)
+
+    def test_solved_limit(self):
+        result = self.AI.search_position(Position.from_moves("25777131474464721415", 2))
+        self.assertEqual(result.limit, SOLVED)
+
+    def test_time_limit_sets_clock(self):
+        self.AI.time_limit = 2
+        self.assertEqual(self.AI.control.clock.time_limit, 2)
+
+    def test_deepen_stops_before_unfinishable_iteration(self):
+        position = Position()
+        self.AI.time_limit = 0
+        self.AI.control.clock.start(position.moves)
+        best_col, _, depth, _ = self.AI.deepen(position)
+        self.assertEqual(depth, 1)
+        self.assertEqual(best_col, 3)
+
+    def test_deepen_discards_stopped_iteration(self):
+        position = Position()
+        expected = AI().minimax(position, 1, float('-inf'), float('inf'), True)[0]
+        self.AI.time_limit = 0
+        self.AI.control.clock.interval = 1
+        self.AI.control.clock.can_finish = Mock(return_value=True)
+        self.AI.control.clock.start(position.moves)
+        best_col, score, depth, _ = self.AI.deepen(position)
+        self.assertEqual(position.moves, 0)
+        self.assertEqual(position.current | position.opponent, 0)
+        self.assertEqual(depth, 1)
+        self.assertEqual(best_col, 3)
+        self.assertEqual(score, expected)
+
+    def test_search_keeps_time_limit(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0] for _ in range(6)]
+        self.AI.time_limit = 0.3
+        self.AI.search(grid)
+        self.assertLess(self.AI.control.clock.elapsed(), 1.0)
+
+    def test_order_moves_by_threats(self):
+        position = Position.from_moves("4455")
+        order = self.AI.order_moves(position, position.possible(), None, 4)
+        self.assertEqual(order[:2], [2, 5])
+        self.assertEqual(sorted(order), list(range(7)))
+
+    def test_order_moves_puts_table_move_first(self):
+        position = Position.from_moves("4455")
+        order = self.AI.order_moves(position, position.possible(), 3, 4)
+        self.assertEqual(order[:3], [3, 2, 5])
+
+    def test_order_moves_by_history_near_leaves(self):
+        position = Position.from_moves("4455")
+        self.assertEqual(self.AI.order_moves(position, position.possible(), None, 1), [3, 2, 4, 1, 5, 0, 6])
+        self.AI.history[position.player][0] = 5
+        self.assertEqual(self.AI.order_moves(position, position.possible(), None, 1), [0, 3, 2, 4, 1, 5, 6])
+
+    def test_deepen_fills_history(self):
+        self.AI.time_limit = float('inf')
+        position = Position.from_moves("44", 2)
+        self.AI.control.clock.start(position.moves)
+        self.AI.deepen(position, 6)
+        self.assertGreater(sum(map(sum, self.AI.history)), 0)
+
+    def test_windows_keep_scores(self):
+        for moves in ("", "44", "4453", "332211", "4444"):
+            scores = []
+            for window in (None, 1, 15):
+                ai = AI()
+                ai.time_limit = float('inf')
+                if window is None:
+                    ai.search_child = lambda position, depth, alpha, beta, is_maximizing, first, ai=ai: ai.minimax(
+                        position, depth, alpha, beta, is_maximizing)[0]
+                position = Position.from_moves(moves, 2)
+                ai.control.clock.start(position.moves)
+                scores.append(ai.deepen(position, 6, window)[1])
+            self.assertEqual(scores, [scores[0]] * 3, moves)
+
+    def test_search_child_null_window(self):
+        position = Position.from_moves("4453")
+        self.AI.minimax = Mock(return_value=(5, None))
+        self.assertEqual(self.AI.search_child(position, 3, 0, 10, False, False), 5)
+        self.assertEqual([call.args[2:4] for call in self.AI.minimax.call_args_list], [(0, 1), (0, 10)])
+        self.AI.minimax = Mock(return_value=(-5, None))
+        self.assertEqual(self.AI.search_child(position, 3, 0, 10, False, False), -5)
+        self.assertEqual(self.AI.minimax.call_count, 1)
+
+    def test_search_after_solver_timeout(self):
+        self.AI.time_limit = float('inf')
+        self.AI.max_nodes = 4096
+        position = Position.from_moves("1234567123456712", 2)
+        result = self.AI.search_position(position)
+        self.assertEqual(result.limit, NODES)
+        self.assertTrue(position.can_play(result.col))
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertLess(result.depth, 42 - position.moves)
+        self.assertEqual(position.moves, 16)
+
+    def test_search_returns_principal_variation(self):
+        self.AI.time_limit = float('inf')
+        self.AI.solver = None
+        position = Position.from_moves("4453", 2)
+        result = self.AI.search_position(position, 6)
+        self.assertEqual(result.pv[0], result.col)
+        self.assertLessEqual(len(result.pv), 6)
+        self.assertGreater(len(result.pv), 1)
+        self.assertEqual(position.moves, 4)
+        for col in result.pv:
+            self.assertTrue(position.can_play(col))
+            position.play(col)
+
+    def test_principal_variation_ends_with_win(self):
+        position = Position.from_moves("112233")
+        self.assertEqual(self.AI.principal_variation(position, 3, 5), [3])
+        self.assertEqual(self.AI.principal_variation(position, None, 5), [])
+
     def test_evaluate_grid_win(self):
         grid = [[0, 0, 0, 0, 0, 0, 0],
                 [0, 0, 0, 0, 0, 0, 0],
@@ -57,8 +259,7 @@ class TestAI(unittest.TestCase):
                 [0, 0, 0, 0, 1, 1, 2],
                 [0, 0, 2, 2, 2, 2, 1],
                 [0, 0, 1, 2, 1, 2, 1]]
-        self.AI.last_cell = (4, 2)
-        self.assertEqual(self.AI.evaluate_grid(grid), 1000)
+        self.assertEqual(self.AI.evaluate_grid(4, 2, grid), 1000)
 
     def test_evaluate_grid_enemy_win(self):
         grid = [[0, 0, 0, 0, 0, 0, 0],
@@ -67,8 +268,7 @@ class TestAI(unittest.TestCase):
                 [0, 0, 0, 0, 1, 1, 2],
                 [0, 0, 2, 1, 2, 2, 1],
                 [0, 0, 1, 2, 1, 2, 1]]
-        self.AI.last_cell = (4, 3)
-        self.assertEqual(self.AI.evaluate_grid(grid), -1000)
+        self.assertEqual(self.AI.evaluate_grid(4, 3, grid), -1000)
 
     def test_evaluate_grid_no_win(self):
         grid = [[0, 0, 0, 0, 0, 0, 0],
@@ -77,5 +277,4 @@ class TestAI(unittest.TestCase):
                 [0, 0, 0, 0, 1, 1, 2],
                 [0, 0, 2, 0, 2, 2, 1],
                 [0, 0, 1, 2, 1, 2, 1]]
-        self.AI.last_cell = (4, 2)
-        self.assertEqual(self.AI.evaluate_grid(grid), 0)
+        self.assertEqual(self.AI.evaluate_grid(4, 2, grid), 0)
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from analysis import Analyzer, to_position, create_ai, analyse_position, main
+from position import Position
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.grid = [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 2, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0],
+                     [0, 0, 1, 1, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0]]
+
+    def test_to_position_from_moves(self):
+        position = to_position("4453")
+        self.assertEqual(position.player, 2)
+        self.assertEqual(position.moves, 4)
+        self.assertEqual(position.key(), Position.from_moves("4453").key())
+
+    def test_to_position_from_grid(self):
+        position = to_position(self.grid)
+        self.assertEqual(position.player, 2)
+        self.assertEqual(position.key(), Position.from_grid(self.grid, 2).key())
+
+    def test_to_position_swaps_players(self):
+        grid = [row[:] for row in self.grid]
+        grid[5][4] = 2
+        position = to_position(grid)
+        self.assertEqual(position.player, 2)
+        self.assertEqual(position.key(), Position.from_grid(grid, 1).key())
+
+    def test_create_ai(self):
+        ai = create_ai(0.1, 500, False)
+        self.assertEqual(ai.control.clock.max_nodes, 500)
+        self.assertEqual(ai.solver, None)
+        self.assertEqual(ai.time_limit, 0.1)
+
+    def test_analyse(self):
+        analyzer = Analyzer(time_limit=None, max_nodes=2000, solve=False)
+        results = list(analyzer.analyse([self.grid, "353411744443121636347261273", "4444"]))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0], 2)
+        self.assertEqual(analyzer.positions, 3)
+        self.assertGreater(analyzer.positions_per_sec(), 0)
+
+    def test_analyse_ended_game(self):
+        ai = create_ai(None, 2000, True)
+        self.assertEqual(analyse_position(ai, "1212121"), (None, -1000, 0))
+        grid = [[2, 1, 2, 1, 2, 2, 2],
+                [2, 1, 1, 2, 2, 2, 1],
+                [1, 1, 1, 2, 1, 1, 1],
+                [2, 2, 1, 1, 2, 2, 1],
+                [2, 2, 2, 1, 2, 2, 2],
+                [2, 1, 2, 2, 2, 1, 1]]
+        self.assertEqual(analyse_position(ai, grid), (None, 0, 0))
+        self.assertEqual(ai.nodes, 0)
+
+    @patch("builtins.print")
+    def test_main_prints_ended_game(self, output):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("1212121\n")
+            with patch("sys.argv", ["analysis.py", path, "--nodes", "2000"]):
+                main()
+        self.assertEqual(output.call_args_list[0].args, ("1212121", "-", -1000, 0))
+
+    def test_analyse_with_node_budget_is_repeatable(self):
+        items = ["4453", "3", "445566"]
+        first = list(Analyzer(time_limit=None, max_nodes=3000, solve=False).analyse(items))
+        second = list(Analyzer(time_limit=None, max_nodes=3000, solve=False).analyse(items))
+        self.assertEqual(first, second)
+
+    def test_analyse_with_workers(self):
+        items = ["4453", "3", "445566", "1234"]
+        analyzer = Analyzer(time_limit=None, max_nodes=2000, solve=False, workers=2)
+        results = list(analyzer.analyse(items))
+        self.assertEqual(len(results), 4)
+        self.assertEqual(analyzer.positions, 4)
+
+    def test_cache_keeps_solved_positions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, "cache.bin")
+            nodes = []
+            for _ in range(2):
+                ai = create_ai(None, None, True, cache)
+                result = ai.search_position(to_position("6375462537525242176614"))
+                nodes.append(ai.solver.nodes)
+                ai.solver.table.close()
+            self.assertLess(nodes[1], nodes[0])
+            self.assertEqual(result.col, analyse_position(create_ai(None, None, True), "6375462537525242176614")[0])
+
+    def test_analyse_with_workers_and_cache(self):
+        items = ["353411744443121636347261273", "4444"]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, "cache.bin")
+            first = list(Analyzer(time_limit=None, max_nodes=2000, workers=2, cache=cache).analyse(items))
+            second = list(Analyzer(time_limit=None, max_nodes=2000, cache=cache).analyse(items))
+            self.assertTrue(os.path.exists(cache))
+        self.assertEqual(first[0][:2], second[0][:2])
@@ -0,0 +1,61 @@
+import unittest
+from benchmark import (read_corpus, summarize, compare, scan_check_win, bench_corpus_solve, bench_allocations,
+                       bench_windows)
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.results = {"search": [{"name": "empty", "nodes": 100}],
+                        "solve": [{"name": "end-easy 4455", "group": "end-easy", "nodes": 50, "time": 1.0,
+                                   "correct": True}],
+                        "groups": {"end-easy": {"nodes": 50, "time": 1.0}}}
+
+    def test_read_corpus(self):
+        corpus = read_corpus()
+        self.assertGreater(len(corpus), 0)
+        self.assertEqual({group for group, _, _ in corpus}, {"end-easy", "middle-easy", "middle-medium"})
+
+    def test_bench_corpus_solve(self):
+        results = bench_corpus_solve([("end-easy", "353411744443121636347261273571", 1)])
+        self.assertTrue(results[0]["correct"])
+        self.assertGreater(results[0]["nodes"], 0)
+
+    def test_bench_allocations(self):
+        result = bench_allocations(depth=4)
+        self.assertGreater(result["nodes"], 0)
+        self.assertLess(result["blocks_per_node"], 1)
+        self.assertLess(result["bytes_per_node"], 100)
+        self.assertGreater(result["peak_bytes"], 0)
+
+    def test_bench_windows(self):
+        for result in bench_windows(depth=4):
+            self.assertEqual(len(result["nodes_per_depth"]), len(result["full_window_nodes_per_depth"]))
+            self.assertLessEqual(len(result["nodes_per_depth"]), 4)
+            self.assertLess(result["saved"], 1)
+
+    def test_summarize(self):
+        groups = summarize(self.results["solve"] * 2)
+        self.assertEqual(groups["end-easy"]["positions"], 2)
+        self.assertEqual(groups["end-easy"]["nodes"], 100)
+        self.assertEqual(groups["end-easy"]["nodes_per_sec"], 50)
+
+    def test_compare_no_regression(self):
+        self.assertEqual(compare(self.results, self.results), [])
+
+    def test_compare_more_nodes(self):
+        baseline = {"search": [{"name": "empty", "nodes": 50}]}
+        self.assertEqual(len(compare(self.results, baseline)), 1)
+
+    def test_compare_slower_group(self):
+        baseline = {"groups": {"end-easy": {"nodes": 50, "time": 0.5}}}
+        self.assertEqual(len(compare(self.results, baseline)), 1)
+
+    def test_compare_wrong_score(self):
+        self.results["solve"][0]["correct"] = False
+        self.assertEqual(len(compare(self.results, {})), 1)
+
+    def test_scan_check_win(self):
+        grid = [[0] * 7 for _ in range(6)]
+        grid[5][:4] = [1, 1, 1, 1]
+        self.assertTrue(scan_check_win(grid, 5, 3))
+        grid[5][0] = 2
+        self.assertFalse(scan_check_win(grid, 5, 3))
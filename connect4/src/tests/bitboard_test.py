@@ -0,0 +1,66 @@
+import unittest
+from bitboard import cell_bit, bit_cell, grid_to_bitboard, has_four, winning_cells
+
+class TestBitboard(unittest.TestCase):
+    def setUp(self):
+        self.grid = [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 1],
+                     [0, 0, 0, 0, 0, 1, 1],
+                     [0, 0, 0, 0, 1, 1, 2],
+                     [0, 0, 0, 1, 2, 2, 2],
+                     [0, 0, 0, 2, 1, 2, 1]]
+
+    def test_cell_bit(self):
+        self.assertEqual(cell_bit(5, 0), 0)
+        self.assertEqual(cell_bit(0, 0), 5)
+        self.assertEqual(cell_bit(5, 1), 7)
+        self.assertEqual(cell_bit(0, 6), 47)
+
+    def test_bit_cell(self):
+        self.assertEqual(bit_cell(0), (5, 0))
+        self.assertEqual(bit_cell(47), (0, 6))
+        for row in range(6):
+            for col in range(7):
+                self.assertEqual(bit_cell(cell_bit(row, col)), (row, col))
+
+    def test_grid_to_bitboard(self):
+        board = grid_to_bitboard(self.grid, 2)
+        self.assertEqual(bin(board).count("1"), 6)
+        self.assertTrue(board >> cell_bit(5, 3) & 1)
+        self.assertFalse(board >> cell_bit(5, 4) & 1)
+
+    def test_has_four_diagonal(self):
+        self.assertTrue(has_four(grid_to_bitboard(self.grid, 1)))
+        self.assertFalse(has_four(grid_to_bitboard(self.grid, 2)))
+
+    def test_has_four_horizontal(self):
+        board = sum(1 << cell_bit(5, col) for col in range(3, 7))
+        self.assertTrue(has_four(board))
+
+    def test_has_four_vertical(self):
+        board = sum(1 << cell_bit(row, 2) for row in range(1, 5))
+        self.assertTrue(has_four(board))
+
+    def test_no_wrap_between_columns(self):
+        board = (1 << cell_bit(1, 0) | 1 << cell_bit(0, 0) |
+                 1 << cell_bit(5, 1) | 1 << cell_bit(4, 1))
+        self.assertFalse(has_four(board))
+
+    def test_three_is_not_four(self):
+        board = sum(1 << cell_bit(5, col) for col in range(3))
+        self.assertFalse(has_four(board))
+
+    def test_winning_cells(self):
+        board = sum(1 << cell_bit(5, col) for col in (0, 1, 3))
+        board |= sum(1 << cell_bit(row, 6) for row in (5, 4, 3))
+        cells = winning_cells(board, board)
+        self.assertEqual(cells, 1 << cell_bit(5, 2) | 1 << cell_bit(2, 6))
+
+    def test_winning_cells_diagonal(self):
+        board = grid_to_bitboard(self.grid, 1) ^ 1 << cell_bit(4, 3)
+        occupied = board | grid_to_bitboard(self.grid, 2)
+        self.assertEqual(winning_cells(board, occupied), 1 << cell_bit(4, 3))
+
+    def test_winning_cells_full_column(self):
+        board = sum(1 << cell_bit(row, 0) for row in range(3))
+        self.assertEqual(winning_cells(board, board), 0)
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from position import Position
+from solver import Solver
+from AI import AI
+from book import OpeningBook, book_positions, back_up, write_book, generate, HEADER, RECORD
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_book_positions(self):
+        self.assertEqual(len(book_positions(0)), 1)
+        self.assertEqual(len(book_positions(1)), 5)
+        self.assertEqual(len(book_positions(2)), 30)
+
+    def test_write_book(self):
+        write_book(self.path, [(5, 1), (3, -2), (9, 0)], 4)
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + 3 * RECORD.size)
+
+    def test_lookup(self):
+        positions = book_positions(3)
+        write_book(self.path, [(key, position.moves - 2) for key, position in positions.items()], 3)
+        book = OpeningBook(self.path)
+        self.assertEqual(book.plies, 3)
+        self.assertEqual(book.size, len(positions))
+        position = Position()
+        for col in [6, 5, 6]:
+            position.play(col)
+        self.assertEqual(book.lookup(position), 1)
+        position.play(0)
+        self.assertIsNone(book.lookup(position))
+        book.close()
+
+    def test_lookup_mirror_image(self):
+        position = Position()
+        position.play(1)
+        write_book(self.path, [(position.canonical_key(), 7)], 1)
+        book = OpeningBook(self.path)
+        mirrored = Position()
+        mirrored.play(5)
+        self.assertEqual(book.lookup(mirrored), 7)
+        book.close()
+
+    def test_not_a_book(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a book at all")
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_generate(self):
+        solver = Solver()
+        solver.solve = Mock(side_effect=lambda position: position.moves)
+        generate(self.path, 2, solver)
+        self.assertEqual(solver.solve.call_count, 25)
+        self.assertTrue(all(call.args[0].moves == 2 for call in solver.solve.call_args_list))
+        book = OpeningBook(self.path)
+        self.assertEqual(book.size, 30)
+        self.assertEqual(book.lookup(Position()), 2)
+        self.assertEqual(book.lookup(Position.from_moves("4")), -2)
+        book.close()
+
+    def test_back_up(self):
+        position = Position.from_moves("112233")
+        self.assertEqual(back_up(position, {}), 18)
+        position = Position.from_moves("25777131474464721415")
+        solver = Solver()
+        scores = {}
+        for col in range(7):
+            position.play(col)
+            scores[position.canonical_key()] = solver.solve(position)
+            position.undo(col)
+        self.assertEqual(back_up(position, scores), solver.solve(position))
+
+    def test_solver_uses_book(self):
+        write_book(self.path, [(Position().canonical_key(), 1)], 0)
+        solver = Solver()
+        solver.book = OpeningBook(self.path)
+        self.assertTrue(solver.in_book(Position()))
+        self.assertEqual(solver.solve(Position()), 1)
+        self.assertEqual(solver.nodes, 0)
+        solver.book.close()
+
+    def test_ai_plays_from_book(self):
+        records = []
+        for col in range(7):
+            position = Position(2)
+            position.play(col)
+            records.append((position.canonical_key(), -5 if col == 3 else 2))
+        write_book(self.path, records, 1)
+        ai = AI()
+        ai.solver.book = OpeningBook(self.path)
+        self.assertEqual(ai.play([[0] * 7 for _ in range(6)]), (3, 1000))
+        ai.solver.book.close()
@@ -2,12 +2,12 @@ import unittest
 from unittest.mock import Mock
 from unittest.mock import patch
 from io import StringIO
-from connect4 import ConnectFour
+from connect4 import ConnectFour, Game
 
 class TestConnectFour(unittest.TestCase):
     def setUp(self):
         self.mock_AI = Mock()
-        self.connect_four = ConnectFour(self.mock_AI)
+        self.connect_four = ConnectFour(self.mock_AI, delay=0)
 
     def test_play_turn_invalid_player(self):
         player = 0
@@ -285,3 +285,66 @@ class TestConnectFour(unittest.TestCase):
         output = mock_stdout.getvalue()
 
         self.assertIn(expected_grid, output)
+
+
+class TestGame(unittest.TestCase):
+    def setUp(self):
+        self.game = Game()
+
+    def test_init(self):
+        self.assertEqual(self.game.turn, 1)
+        self.assertEqual(self.game.legal_moves(), list(range(7)))
+        self.assertIsNone(self.game.result)
+
+    def test_play(self):
+        self.assertEqual(self.game.play(3), (5, 3))
+        self.assertEqual(self.game.grid[5][3], 1)
+        self.assertEqual(self.game.turn, 2)
+        self.assertEqual(self.game.play(3), (4, 3))
+        self.assertEqual(self.game.grid[4][3], 2)
+
+    def test_play_invalid(self):
+        for _ in range(6):
+            self.game.play(0)
+        self.assertNotIn(0, self.game.legal_moves())
+        self.assertRaises(ValueError, self.game.play, 0)
+        self.assertRaises(ValueError, self.game.play, 7)
+
+    def test_win(self):
+        game = Game.from_moves("4455667")
+        self.assertEqual(game.result, 1)
+        self.assertEqual(game.turn, 1)
+        self.assertEqual(game.legal_moves(), [])
+        self.assertRaises(ValueError, game.play, 0)
+
+    def test_draw(self):
+        game = Game.from_moves("472424756645422154157737216635626711335331")
+        self.assertEqual(len(game.history), 42)
+        self.assertEqual(game.result, 0)
+
+    def test_undo(self):
+        game = Game.from_moves("4455667")
+        self.assertEqual(game.undo(), 6)
+        self.assertIsNone(game.result)
+        self.assertEqual(game.turn, 1)
+        self.assertEqual(game.grid[5][6], 0)
+        self.assertEqual(game.undo(), 5)
+        self.assertEqual(game.turn, 2)
+        self.assertEqual(game.to_moves(), "44556")
+
+    def test_undo_empty(self):
+        self.assertRaises(IndexError, self.game.undo)
+
+    def test_moves(self):
+        game = Game.from_moves("4453")
+        self.assertEqual(game.to_moves(), "4453")
+        self.assertEqual(game.grid[5][2], 2)
+        self.assertRaises(ValueError, Game.from_moves, "44x")
+        self.assertRaises(ValueError, Game.from_moves, "8")
+
+    def test_reset(self):
+        self.game.play(3)
+        self.game.reset()
+        self.assertEqual(self.game.grid, [[0] * 7 for _ in range(6)])
+        self.assertEqual(self.game.turn, 1)
+        self.assertEqual(self.game.history, [])
@@ -0,0 +1,54 @@
+import unittest
+from bitboard import WIDTH, HEIGHT, cell_bit
+from position import Position
+from evaluation import evaluate, score_lines, LINE_STARTS, WEIGHTS, MAX_SCORE
+
+# Bit indexes of the four cells of every line of four, for counting the lines one by one
+LINES = [tuple(cell_bit(row + i * delta_row, col + i * delta_col) for i in range(4))
+         for delta_row, delta_col in ((-1, 0), (0, 1), (1, 1), (-1, 1))
+         for row in range(HEIGHT) for col in range(WIDTH)
+         if 0 <= row + 3 * delta_row < HEIGHT and 0 <= col + 3 * delta_col < WIDTH]
+
+class TestEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.grid = [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 2, 1, 0, 0],
+                     [0, 0, 0, 2, 2, 0, 0],
+                     [0, 0, 2, 1, 2, 1, 0],
+                     [1, 0, 1, 2, 1, 1, 2]]
+        self.position = Position.from_grid(self.grid, 2)
+
+    def count_lines(self, own, other):
+        score = 0
+        for line in LINES:
+            own_count = sum(own >> bit & 1 for bit in line)
+            other_count = sum(other >> bit & 1 for bit in line)
+            if other_count == 0:
+                score += WEIGHTS[own_count]
+            if own_count == 0:
+                score -= WEIGHTS[other_count]
+        return score
+
+    def test_line_count(self):
+        self.assertEqual(len(LINES), 69)
+        self.assertEqual(sum(starts.bit_count() for starts in LINE_STARTS), 69)
+
+    def test_empty_position(self):
+        self.assertEqual(evaluate(Position(), 1), 0)
+
+    def test_matches_line_by_line_count(self):
+        own, other = self.position.current, self.position.opponent
+        self.assertEqual(score_lines(own, other), self.count_lines(own, other))
+        self.assertEqual(score_lines(other, own), self.count_lines(other, own))
+
+    def test_single_line(self):
+        self.assertEqual(score_lines(0b111, 0), WEIGHTS[3] + WEIGHTS[2])
+
+    def test_players_get_opposite_scores(self):
+        score = evaluate(self.position, 2)
+        self.assertGreater(score, 0)
+        self.assertEqual(evaluate(self.position, 1), -score)
+
+    def test_score_stays_below_win(self):
+        self.assertEqual(evaluate(Position.from_grid([[2] * 7 for _ in range(6)], 1), 2), MAX_SCORE)
@@ -0,0 +1,123 @@
+import unittest
+from mcts import MCTS, Tree, RootParallel, OPEN, WON, pick
+from position import Position
+from tournament import parse_engine, create_engine
+
+class TestTree(unittest.TestCase):
+    def setUp(self):
+        self.position = Position.from_moves("4453")
+        self.tree = Tree(self.position.current, self.position.opponent)
+
+    def test_expand_creates_children_in_order(self):
+        self.tree.expand(0)
+        self.assertEqual(self.tree.count[0], 7)
+        self.assertEqual([self.tree.move[child] for child in range(1, 8)], [3, 2, 4, 1, 5, 0, 6])
+        self.assertTrue(all(self.tree.state[child] == OPEN for child in range(1, 8)))
+
+    def test_expand_marks_winning_moves(self):
+        position = Position.from_moves("112233")
+        tree = Tree(position.current, position.opponent)
+        tree.expand(0)
+        states = {tree.move[child]: tree.state[child] for child in range(1, 8)}
+        self.assertEqual(states[3], WON)
+        self.assertEqual(sum(state == WON for state in states.values()), 1)
+
+    def test_select_expands_visited_leaf(self):
+        self.assertEqual(self.tree.select(1.4), 0)
+        self.assertEqual(self.tree.select(1.4), 1)
+        self.assertEqual(len(self.tree), 8)
+        self.assertEqual(self.tree.visits[0], 2)
+
+    def test_backup_flips_signs(self):
+        self.tree.expand(0)
+        self.tree.expand(1)
+        leaf = self.tree.first[1]
+        self.tree.visits[0] = self.tree.visits[1] = self.tree.visits[leaf] = 1
+        self.tree.backup(leaf, 3, 4)
+        self.assertEqual(self.tree.value[leaf], 3)
+        self.assertEqual(self.tree.value[1], -3)
+        self.assertEqual(self.tree.value[0], 3)
+        self.assertEqual(self.tree.visits[leaf], 4)
+        self.assertEqual(self.tree.visits[0], 4)
+
+    def test_find_and_subtree(self):
+        self.tree.expand(0)
+        self.tree.expand(1)
+        self.position.play(3)
+        self.position.play(2)
+        node = self.tree.find(self.position.current, self.position.opponent)
+        self.assertIsNotNone(node)
+        self.tree.expand(node)
+        self.tree.visits[node] = 5
+        subtree = self.tree.subtree(node)
+        self.assertEqual(subtree.boards[0], self.position.current)
+        self.assertEqual(subtree.visits[0], 5)
+        self.assertEqual(subtree.count[0], 7)
+        self.assertEqual(subtree.parent[1], 0)
+
+    def test_find_misses_other_positions(self):
+        position = Position.from_moves("1111")
+        self.assertIsNone(self.tree.find(position.current, position.opponent))
+
+    def test_pick(self):
+        self.assertEqual(pick([(3, 10, 5.0), (2, 30, -30.0), (4, 20, 20.0)]), (2, -999))
+        self.assertEqual(pick([(3, 0, 0.0)]), (3, 0))
+
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self):
+        self.engine = MCTS(seed=0)
+        self.engine.time_limit = 0.2
+
+    def test_takes_win(self):
+        result = self.engine.search_position(Position.from_moves("1122334"))
+        self.assertEqual(result.col, 3)
+        self.assertEqual(result.score, 1000)
+
+    def test_blocks_threat(self):
+        result = self.engine.search_position(Position.from_moves("1122337"))
+        self.assertEqual(result.col, 3)
+
+    def test_play_grid(self):
+        grid = [[0] * 7 for _ in range(6)]
+        grid[5][0] = grid[5][1] = grid[5][2] = 2
+        grid[5][6] = grid[4][6] = 1
+        self.assertEqual(self.engine.play(grid), (3, 1000))
+
+    def test_anytime(self):
+        position = Position()
+        self.engine.start(position)
+        self.assertEqual(self.engine.best_move(), (None, 0))
+        for _ in range(3):
+            self.engine.iterate()
+        col, score = self.engine.best_move()
+        self.assertIn(col, range(7))
+        self.assertLess(abs(score), 1000)
+        self.assertEqual(self.engine.nodes, 3 * self.engine.batch * self.engine.playouts)
+
+    def test_reuses_tree(self):
+        position = Position()
+        result = self.engine.search_position(position)
+        size = len(self.engine.tree)
+        position.play(result.col)
+        position.play(3)
+        self.engine.start(position)
+        self.assertGreater(self.engine.tree.visits[0], 0)
+        self.assertLess(len(self.engine.tree), size)
+
+    def test_root_parallel(self):
+        self.engine.parallel = RootParallel(2)
+        try:
+            result = self.engine.search_position(Position.from_moves("1122337"))
+        finally:
+            self.engine.parallel.close()
+        self.assertEqual(result.col, 3)
+        self.assertGreater(self.engine.nodes, 0)
+
+    def test_tournament_engine(self):
+        config = parse_engine("tree:engine=mcts,time=0.05")
+        engine = create_engine(config)
+        self.assertIsInstance(engine, MCTS)
+        self.assertEqual(engine.time_limit, 0.05)
+        with self.assertRaises(ValueError):
+            parse_engine("tree:engine=alphazero")
@@ -0,0 +1,88 @@
+import unittest
+from AI import AI
+from position import Position
+from parallel import ParallelSearch, search_column, worker_ai
+from timing import NODES, DEPTH
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.grid = [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 2, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0],
+                     [0, 0, 1, 1, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0]]
+        self.position = Position.from_grid(self.grid, 2)
+
+    def test_search_column(self):
+        col, scores, nodes, limit = search_column(self.position, 4, 10, 3)
+        self.assertEqual(col, 4)
+        self.assertEqual(scores[1:], [-1000, -1000])
+        self.assertGreater(nodes, 0)
+        self.assertEqual(limit, DEPTH)
+        self.assertEqual(self.position.moves, 7)
+
+    def test_search_column_reuses_cleared_ai(self):
+        first = search_column(self.position, 4, float('inf'), 5)
+        search_column(self.position, 2, float('inf'), 6)
+        self.assertIs(worker_ai(), worker_ai())
+        self.assertIsNone(worker_ai().solver)
+        self.assertEqual(search_column(self.position, 4, float('inf'), 5), first)
+
+    def test_search_column_win(self):
+        position = Position.from_grid(self.grid, 1)
+        self.assertEqual(search_column(position, 2, 10, 4)[1], [1000] * 4)
+
+    def test_search_one_worker(self):
+        search = ParallelSearch(1)
+        self.assertIsNone(search.executor)
+        best_col, score, depth, limit = search.search(self.position, 100, max_depth=4)
+        self.assertEqual(best_col, 2)
+        self.assertNotEqual(score, -1000)
+        self.assertEqual(depth, 4)
+        self.assertEqual(limit, DEPTH)
+        self.assertGreater(search.nodes, 0)
+
+    def test_search_is_deterministic(self):
+        first = ParallelSearch(1).search(self.position, 100, max_depth=5)
+        second = ParallelSearch(1).search(self.position, 100, max_depth=5)
+        self.assertEqual(first, second)
+
+    def test_search_two_workers(self):
+        search = ParallelSearch(2)
+        try:
+            result = search.search(self.position, 100, max_depth=4)
+        finally:
+            search.close()
+        self.assertEqual(result, ParallelSearch(1).search(self.position, 100, max_depth=4))
+
+    def test_node_limit(self):
+        first = ParallelSearch(1).search(self.position, float('inf'), max_nodes=20000)
+        search = ParallelSearch(2)
+        try:
+            second = search.search(self.position, float('inf'), max_nodes=20000)
+        finally:
+            search.close()
+        self.assertEqual(first, second)
+        self.assertEqual(first[3], NODES)
+
+    def test_ai_passes_limits(self):
+        ai = AI()
+        ai.parallel = ParallelSearch(1)
+        ai.solver = None
+        ai.time_limit = float('inf')
+        ai.control.max_depth = 3
+        result = ai.search_position(self.position)
+        self.assertEqual((result.depth, result.limit), (3, DEPTH))
+        ai.control.max_depth = None
+        ai.max_nodes = 20000
+        result = ai.search_position(self.position)
+        self.assertEqual(result.limit, NODES)
+        self.assertLess(ai.nodes, 20000 + 7 * 1024)
+
+    def test_ai_uses_parallel_search(self):
+        ai = AI()
+        ai.parallel = ParallelSearch(1)
+        ai.time_limit = 0.5
+        best_col, _ = ai.play(self.grid)
+        self.assertEqual(best_col, 2)
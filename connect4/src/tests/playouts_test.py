@@ -0,0 +1,58 @@
+import random
+import unittest
+import numpy as np
+import bitboard
+from connect4 import Game
+from playouts import Playouts, has_four, lowest_column, playout_score
+from position import Position
+
+class TestPlayouts(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_has_four(self):
+        rng = random.Random(0)
+        boards = [rng.getrandbits(49) & bitboard.BOARD_MASK for _ in range(200)]
+        expected = [bitboard.has_four(board) for board in boards]
+        self.assertEqual(has_four(np.array(boards, dtype=np.uint64)).tolist(), expected)
+
+    def test_lowest_column(self):
+        cells = np.array([1 << 3, 1 << 7 | 1 << 20, 1 << 46], dtype=np.uint64)
+        self.assertEqual(lowest_column(cells).tolist(), [0, 1, 6])
+
+    def test_results_match_game(self):
+        playouts = Playouts(np.zeros(300), np.zeros(300))
+        results = playouts.run(self.rng)
+        for moves, result in zip(playouts.move_strings(), results):
+            game = Game.from_moves(moves)
+            self.assertEqual(game.result, {1: 1, -1: 2, 0: 0}[result])
+
+    def test_from_positions(self):
+        position = Position.from_moves("4453")
+        playouts = Playouts.from_positions([position, Position()], repeat=3)
+        self.assertEqual(len(playouts.results), 6)
+        self.assertEqual(playouts.current.tolist(), [position.current] * 3 + [0] * 3)
+        playouts.run(self.rng)
+        for moves in playouts.move_strings()[:3]:
+            self.assertIsNotNone(Game.from_moves("4453" + moves).result)
+
+    def test_full_grid_is_over(self):
+        game = Game.from_moves("472424756645422154157737216635626711335331")
+        position = Position.from_moves(game.to_moves())
+        playouts = Playouts.from_positions([position])
+        self.assertEqual(len(playouts.live), 0)
+        self.assertEqual(playouts.run(self.rng).tolist(), [0])
+
+    def test_greedy_wins(self):
+        position = Position.from_moves("445566")
+        self.assertEqual(playout_score(position, 50, self.rng, greedy=True), 1.0)
+        self.assertLess(playout_score(position, 200, self.rng), 1.0)
+
+    def test_greedy_blocks(self):
+        playouts = Playouts.from_positions([Position.from_moves("1122337")], repeat=50)
+        playouts.run(self.rng, greedy=True)
+        self.assertEqual(set(playouts.history[0][1].tolist()), {3})
+
+    def test_random_first_player_wins_more(self):
+        results = Playouts(np.zeros(20000), np.zeros(20000)).run(self.rng)
+        self.assertGreater(np.mean(results == 1), 0.5)
@@ -0,0 +1,76 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+from AI import AI, SearchResult
+from connect4 import ConnectFour
+from ponder import Ponderer
+from position import Position
+from timing import DEPTH
+
+class TestPonderer(unittest.TestCase):
+    def setUp(self):
+        self.ai = AI()
+        self.ponderer = Ponderer(self.ai)
+
+    def test_searches_every_reply(self):
+        clock = self.ai.control.clock
+        self.ponderer.start(Position.from_moves("4", 2))
+        time.sleep(0.3)
+        result = self.ponderer.stop(2)
+        self.assertIsNone(self.ponderer.thread)
+        self.assertIs(self.ai.control.clock, clock)
+        self.assertEqual(sorted(self.ponderer.results), list(range(7)))
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertEqual(result.pv[0], result.col)
+
+    def test_skips_winning_and_solved_replies(self):
+        self.ponderer.start(Position.from_moves("112233"))
+        time.sleep(0.1)
+        self.ponderer.stop()
+        self.assertNotIn(3, self.ponderer.results)
+        self.ponderer.start(Position.from_moves("4444443333332222"))
+        self.ponderer.thread.join()
+        self.assertEqual(self.ponderer.stop(), None)
+        self.assertEqual(self.ponderer.results, {})
+
+    def test_stop_without_start(self):
+        self.assertIsNone(self.ponderer.stop(3))
+
+    def test_is_hit(self):
+        self.assertFalse(self.ponderer.is_hit(None, 1))
+        self.assertTrue(self.ponderer.is_hit(SearchResult(3, 10, 6, None, [3], DEPTH), 6))
+        self.assertFalse(self.ponderer.is_hit(SearchResult(3, 10, 5, None, [3], DEPTH), 6))
+        self.assertTrue(self.ponderer.is_hit(SearchResult(3, 1000, 2, None, [3], DEPTH), 6))
+
+
+class TestPonderingGame(unittest.TestCase):
+    def setUp(self):
+        self.ai = Mock()
+        self.game = ConnectFour(self.ai, delay=0, ponder=True)
+
+    def test_ai_move_plays_hit(self):
+        self.game.depth = 4
+        self.assertEqual(self.game.ai_move(SearchResult(2, 5, 4, None, [2], DEPTH)), 2)
+        self.ai.search.assert_not_called()
+
+    def test_ai_move_searches_on_miss(self):
+        self.ai.search.return_value = SearchResult(3, 0, 7, None, [3], DEPTH)
+        self.assertEqual(self.game.ai_move(SearchResult(2, 5, 1, None, [2], DEPTH)), 3)
+        self.assertEqual(self.game.depth, 7)
+
+    def test_ai_move_without_pondering(self):
+        game = ConnectFour(self.ai, delay=0)
+        self.ai.play.return_value = (4, 0)
+        self.assertEqual(game.ai_move(None), 4)
+
+    @patch("builtins.print")
+    def test_game_with_pondering(self, _):
+        ai = AI()
+        ai.time_limit = 0.05
+        game = ConnectFour(ai, delay=0, ponder=True)
+        with patch("builtins.input", side_effect=["4", "4", "exit"]):
+            game.run_game()
+        self.assertTrue(game.exit)
+        self.assertIsNone(game.ponderer.thread)
+        self.assertEqual(len(game.history), 4)
+        self.assertLess(game.depth, 42)
@@ -0,0 +1,192 @@
+import unittest
+from position import Position
+from bitboard import cell_bit
+
+class TestPosition(unittest.TestCase):
+    def setUp(self):
+        self.position = Position()
+        self.grid = [[0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0, 0, 0],
+                     [0, 0, 0, 2, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0],
+                     [0, 0, 1, 1, 0, 0, 0],
+                     [0, 0, 1, 2, 0, 0, 0]]
+
+    def test_init(self):
+        self.assertEqual(self.position.current, 0)
+        self.assertEqual(self.position.opponent, 0)
+        self.assertEqual(self.position.heights, [0, 7, 14, 21, 28, 35, 42])
+        self.assertEqual(self.position.player, 1)
+        self.assertEqual(self.position.moves, 0)
+
+    def test_from_grid(self):
+        position = Position.from_grid(self.grid, 2)
+        self.assertEqual(position.player, 2)
+        self.assertEqual(position.moves, 7)
+        self.assertEqual(position.heights[2], 14 + 3)
+        self.assertEqual(position.heights[3], 21 + 4)
+        self.assertTrue(position.current >> cell_bit(2, 3) & 1)
+        self.assertTrue(position.opponent >> cell_bit(3, 2) & 1)
+
+    def test_play_and_undo(self):
+        position = Position.from_grid(self.grid, 2)
+        current, opponent, key = position.current, position.opponent, position.key()
+        self.assertEqual(position.play(4), cell_bit(5, 4))
+        self.assertEqual(position.player, 1)
+        self.assertEqual(position.moves, 8)
+        self.assertTrue(position.opponent >> cell_bit(5, 4) & 1)
+        self.assertNotEqual(position.key(), key)
+        self.assertEqual(position.undo(4), cell_bit(5, 4))
+        self.assertEqual((position.current, position.opponent), (current, opponent))
+        self.assertEqual(position.player, 2)
+        self.assertEqual(position.key(), key)
+
+    def test_can_play(self):
+        for _ in range(6):
+            self.assertTrue(self.position.can_play(0))
+            self.position.play(0)
+        self.assertFalse(self.position.can_play(0))
+
+    def test_is_winning_move(self):
+        position = Position.from_grid(self.grid, 1)
+        self.assertTrue(position.is_winning_move(2))
+        self.assertFalse(position.is_winning_move(4))
+
+    def test_is_winning_move_diagonal(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 1, 1],
+                [0, 0, 0, 0, 1, 1, 2],
+                [0, 0, 0, 1, 2, 2, 2],
+                [0, 0, 0, 2, 1, 2, 1]]
+        position = Position.from_grid(grid, 1)
+        self.assertTrue(position.is_winning_move(6))
+        position = Position.from_grid(grid, 2)
+        self.assertFalse(position.is_winning_move(6))
+
+    def test_key_differs_by_player(self):
+        self.position.play(3)
+        self.position.play(2)
+        other = Position()
+        other.play(2)
+        other.play(3)
+        self.assertNotEqual(self.position.key(), other.key())
+
+    def test_from_key(self):
+        for moves in ("", "4", "4453", "1111112"):
+            position = Position.from_moves(moves)
+            other = Position.from_key(position.key())
+            self.assertEqual((other.current, other.opponent, other.player), (position.current, position.opponent,
+                                                                              position.player))
+            self.assertEqual((other.heights, other.hash), (position.heights, position.hash))
+
+    def test_from_invalid_key(self):
+        with self.assertRaises(ValueError):
+            Position.from_key(127)
+        with self.assertRaises(ValueError):
+            Position.from_key(1 << 49)
+
+    def test_to_grid(self):
+        position = Position.from_grid(self.grid, 2)
+        self.assertEqual(position.to_grid(), self.grid)
+
+    def test_is_full(self):
+        self.assertFalse(self.position.is_full())
+        for col in [0, 1, 2, 3, 4, 5, 6] * 6:
+            self.position.play(col)
+        self.assertTrue(self.position.is_full())
+
+    def test_hash_is_restored_by_undo(self):
+        start = (self.position.hash, self.position.mirror_hash)
+        self.position.play(1)
+        self.position.play(1)
+        self.assertNotEqual(self.position.hash, start[0])
+        self.position.undo(1)
+        self.position.undo(1)
+        self.assertEqual((self.position.hash, self.position.mirror_hash), start)
+
+    def test_hash_matches_from_grid(self):
+        position = Position()
+        for col in [2, 3, 3, 3, 2, 3, 2]:
+            position.play(col)
+        self.assertEqual(position.player, 2)
+        grid_position = Position.from_grid(self.grid, 2)
+        self.assertEqual(position.hash, grid_position.hash)
+        self.assertEqual(position.mirror_hash, grid_position.mirror_hash)
+
+    def test_hash_differs_by_player(self):
+        self.assertNotEqual(Position(1).hash, Position(2).hash)
+
+    def test_canonical_hash_of_mirror(self):
+        self.position.play(0)
+        self.position.play(1)
+        other = Position()
+        other.play(6)
+        other.play(5)
+        self.assertNotEqual(self.position.hash, other.hash)
+        self.assertEqual(self.position.canonical_hash()[0], other.canonical_hash()[0])
+        self.assertNotEqual(self.position.canonical_hash()[1], other.canonical_hash()[1])
+
+    def test_canonical_hash_of_symmetric_position(self):
+        self.position.play(3)
+        self.assertEqual(self.position.hash, self.position.mirror_hash)
+        self.assertEqual(self.position.canonical_hash(), (self.position.hash, False))
+
+    def test_canonical_key_of_mirror(self):
+        self.position.play(0)
+        self.position.play(1)
+        self.position.play(1)
+        other = Position()
+        other.play(6)
+        other.play(5)
+        other.play(5)
+        self.assertNotEqual(self.position.key(), other.key())
+        self.assertEqual(self.position.canonical_key(), other.canonical_key())
+        self.assertEqual(self.position.canonical_key(), min(self.position.key(), other.key()))
+
+    def test_from_moves(self):
+        position = Position.from_moves("3444343")
+        self.assertEqual(position.player, 2)
+        self.assertEqual((position.current, position.opponent),
+                         (Position.from_grid(self.grid, 2).current, Position.from_grid(self.grid, 2).opponent))
+
+    def test_from_moves_invalid(self):
+        with self.assertRaises(ValueError):
+            Position.from_moves("48")
+        with self.assertRaises(ValueError):
+            Position.from_moves("1111111")
+
+    def test_possible(self):
+        position = Position.from_moves("4445")
+        self.assertEqual(position.possible(), sum(1 << cell_bit(5, col) for col in (0, 1, 2, 5, 6))
+                         | 1 << cell_bit(2, 3) | 1 << cell_bit(4, 4))
+
+    def test_winning_cells(self):
+        position = Position.from_moves("12121")
+        self.assertEqual(position.opponent_winning_cells(), 1 << cell_bit(2, 0))
+        self.assertEqual(position.winning_cells(), 0)
+        self.assertFalse(position.can_win_next())
+        position.play(1)
+        self.assertTrue(position.can_win_next())
+
+    def test_forced_blocks(self):
+        position = Position.from_moves("1212")
+        position.play(0)
+        self.assertEqual(position.forced_blocks(), 1 << cell_bit(2, 0))
+        self.assertEqual(position.non_losing_moves(), 1 << cell_bit(2, 0))
+
+    def test_non_losing_moves_avoid_cell_below_threat(self):
+        position = Position.from_moves("3224473")
+        self.assertEqual(position.opponent_winning_cells(), 1 << cell_bit(4, 0) | 1 << cell_bit(4, 4))
+        self.assertEqual(position.forced_blocks(), 0)
+        self.assertEqual(position.non_losing_moves(),
+                         position.possible() & ~(1 << cell_bit(5, 0) | 1 << cell_bit(5, 4)))
+
+    def test_non_losing_moves_with_two_threats(self):
+        position = Position.from_moves("44556")
+        self.assertEqual(position.non_losing_moves(), 0)
+
+    def test_double_threats(self):
+        position = Position.from_moves("4455")
+        self.assertEqual(position.double_threats(), 1 << cell_bit(5, 2) | 1 << cell_bit(5, 5))
+        self.assertEqual(Position.from_moves("4").double_threats(), 0)
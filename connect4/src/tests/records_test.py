@@ -0,0 +1,73 @@
+import io
+import os
+import tempfile
+import unittest
+from position import Position
+from records import (Record, encode, moves_to_grid, key_to_grid, grid_to_key, pack_moves, unpack_moves, read_text,
+                     write_text, read_binary, write_binary, read_records, write_records)
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.records = [encode("", 0), encode("4453", -2), encode("472424756645422154157737216635626711335331"),
+                        encode("1", 127), encode("7777", -127)]
+
+    def test_encode(self):
+        record = encode("4453", 5)
+        self.assertEqual(record, Record("4453", Position.from_moves("4453").key(), 5))
+        self.assertLess(record.key, 1 << 64)
+        with self.assertRaises(ValueError):
+            encode("8")
+
+    def test_grid_conversion(self):
+        grid = moves_to_grid("4453")
+        self.assertEqual(grid[5][3], 1)
+        self.assertEqual(grid[4][3], 2)
+        self.assertEqual(grid[5][4], 1)
+        self.assertEqual(grid[5][2], 2)
+        self.assertEqual(grid_to_key(grid), encode("4453").key)
+        self.assertEqual(key_to_grid(encode("4453").key), grid)
+        self.assertEqual(key_to_grid(encode("445").key), moves_to_grid("445"))
+
+    def test_pack_moves(self):
+        moves = "472424756645422154157737216635626711335331"
+        self.assertEqual(len(pack_moves(moves)), 16)
+        self.assertEqual(unpack_moves(pack_moves(moves), len(moves)), moves)
+        self.assertEqual(unpack_moves(pack_moves(""), 0), "")
+
+    def test_text_round_trip(self):
+        file = io.StringIO()
+        self.assertEqual(write_text(file, self.records), 5)
+        file.seek(0)
+        self.assertEqual(list(read_text(file)), self.records)
+
+    def test_read_plain_move_strings(self):
+        lines = ["# corpus\n", "4453\n", "\n", "44\t\t3\n"]
+        self.assertEqual(list(read_text(lines)), [encode("4453"), encode("44", 3)])
+
+    def test_read_wrong_key(self):
+        with self.assertRaises(ValueError):
+            list(read_text([f"4453\t{encode('4454').key:x}\n"]))
+
+    def test_read_text_is_lazy(self):
+        def lines():
+            yield "4453\n"
+            raise AssertionError("read too far")
+        self.assertEqual(next(read_text(lines())), encode("4453"))
+
+    def test_binary_round_trip(self):
+        file = io.BytesIO()
+        self.assertEqual(write_binary(file, self.records), 5)
+        file.seek(0)
+        self.assertEqual(list(read_binary(file)), self.records)
+        self.assertEqual(len(file.getvalue()), 8 + 5 * 26)
+
+    def test_read_binary_checks_header(self):
+        with self.assertRaises(ValueError):
+            list(read_binary(io.BytesIO(b"4453\n")))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, binary in (("records.txt", False), ("records.bin", True)):
+                path = os.path.join(directory, name)
+                self.assertEqual(write_records(path, iter(self.records), binary), 5)
+                self.assertEqual(list(read_records(path)), self.records)
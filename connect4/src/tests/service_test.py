@@ -0,0 +1,147 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+from service import EngineService, Session, ServiceError
+from loadtest import Client, load_test, percentile
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.session = Session()
+
+    def test_play(self):
+        self.session.play(3)
+        self.assertEqual(self.session.game.grid[5][3], 1)
+        self.assertEqual(self.session.state()["turn"], 2)
+
+    def test_play_invalid_column(self):
+        self.assertRaises(ServiceError, self.session.play, 7)
+        self.assertRaises(ServiceError, self.session.play, "3")
+
+    def test_play_win(self):
+        for col in [0, 1, 0, 1, 0, 1, 0]:
+            self.session.play(col)
+        self.assertEqual(self.session.result, 1)
+        self.assertRaises(ServiceError, self.session.play, 2)
+
+    def test_cancel_while_waiting(self):
+        self.session.cancel()
+        self.assertFalse(self.session.cancelled)
+        self.session.waiting = True
+        self.session.cancel()
+        self.assertTrue(self.session.cancelled)
+
+class TestEngineService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = EngineService(workers=2, time_limit=0.05)
+        self.port = await self.service.start()
+        self.client = await Client.connect("127.0.0.1", self.port)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.service.close()
+
+    async def test_new_and_play(self):
+        state = await self.client.request("new")
+        state = await self.client.request("play", game=state["game"], col=3)
+        self.assertEqual(state["grid"][5][3], 1)
+        self.assertEqual(state["turn"], 2)
+        self.assertEqual(state["result"], None)
+
+    async def test_ai_move(self):
+        state = await self.client.request("new")
+        await self.client.request("play", game=state["game"], col=3)
+        reply = await self.client.request("ai", game=state["game"], time=0.05)
+        self.assertIn(reply["col"], range(7))
+        self.assertEqual(reply["grid"][5 if reply["col"] != 3 else 4][reply["col"]], 2)
+        self.assertEqual(reply["turn"], 1)
+        self.assertGreater(reply["time"], 0)
+
+    async def test_ai_move_with_limits(self):
+        replies = []
+        for _ in range(2):
+            state = await self.client.request("new")
+            await self.client.request("play", game=state["game"], col=3)
+            replies.append(await self.client.request("ai", game=state["game"], time=None, depth=5))
+        self.assertEqual(replies[0]["limit"], "depth")
+        self.assertEqual(replies[0]["depth"], 5)
+        self.assertEqual(replies[0]["col"], replies[1]["col"])
+        state = await self.client.request("new")
+        reply = await self.client.request("ai", game=state["game"], time=None, nodes=2000)
+        self.assertEqual(reply["limit"], "nodes")
+
+    async def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            await self.client.request("state", game=99)
+        with self.assertRaises(RuntimeError):
+            await self.client.request("jump")
+        state = await self.client.request("new")
+        with self.assertRaises(RuntimeError):
+            await self.client.request("play", game=state["game"], col=9)
+
+    async def test_invalid_json(self):
+        self.client.writer.write(b"not json\n")
+        await self.client.writer.drain()
+        future = asyncio.get_running_loop().create_future()
+        self.client.pending[None] = future
+        reply = await future
+        self.assertFalse(reply["ok"])
+
+    async def test_cancel(self):
+        state = await self.client.request("new")
+        start = time.perf_counter()
+        search = asyncio.create_task(self.client.request("ai", game=state["game"], time=30))
+        await asyncio.sleep(0.2)
+        await self.client.request("cancel", game=state["game"])
+        reply = await search
+        self.assertTrue(reply["cancelled"])
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(reply["turn"], 1)
+        self.assertEqual(sum(map(sum, reply["grid"])), 0)
+
+    async def test_close_during_search(self):
+        state = await self.client.request("new")
+        search = asyncio.create_task(self.client.request("ai", game=state["game"], time=30))
+        await asyncio.sleep(0.2)
+        await self.client.request("close", game=state["game"])
+        reply = await search
+        self.assertTrue(reply["cancelled"])
+        self.assertNotIn("col", reply)
+
+    async def test_unexpected_error_gets_reply(self):
+        state = await self.client.request("new")
+        with patch.object(self.service, "search", AsyncMock(side_effect=RuntimeError("broken"))):
+            with self.assertRaises(RuntimeError) as error:
+                await asyncio.wait_for(self.client.request("ai", game=state["game"]), 5)
+        self.assertIn("internal error", str(error.exception))
+
+    async def test_cancel_before_search_starts(self):
+        games = [(await self.client.request("new"))["game"] for _ in range(3)]
+        searches = [asyncio.create_task(self.client.request("ai", game=game, time=30)) for game in games]
+        await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        await self.client.request("cancel", game=games[2])
+        await self.client.request("cancel", game=games[0])
+        await self.client.request("cancel", game=games[1])
+        replies = await asyncio.gather(*searches)
+        self.assertTrue(all(reply["cancelled"] for reply in replies))
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(sum(map(sum, replies[2]["grid"])), 0)
+
+    async def test_concurrent_games(self):
+        games = [(await self.client.request("new"))["game"] for _ in range(3)]
+        replies = await asyncio.gather(*(self.client.request("ai", game=game, time=0.05) for game in games))
+        self.assertEqual([reply["turn"] for reply in replies], [2, 2, 2])
+
+    async def test_load_test(self):
+        results = await load_test("127.0.0.1", self.port, games=2, concurrency=2, time_limit=0.02)
+        self.assertGreater(results["moves"], 0)
+        self.assertLessEqual(results["p50"], results["p99"])
+
+class TestPercentile(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3], 0.99), 3)
+        self.assertEqual(percentile([], 0.5), 0.0)
@@ -0,0 +1,68 @@
+import unittest
+from position import Position
+from solver import Solver
+from timing import TimeManager, SearchTimeout, NODES
+
+class TestSolver(unittest.TestCase):
+    def setUp(self):
+        self.solver = Solver()
+
+    def test_init(self):
+        self.assertEqual(self.solver.columns, [3, 2, 4, 1, 5, 0, 6])
+        self.assertEqual(self.solver.nodes, 0)
+
+    def test_solve_immediate_win(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 1, 1],
+                [0, 0, 0, 0, 1, 1, 2],
+                [0, 0, 0, 2, 2, 2, 1],
+                [0, 0, 1, 2, 1, 2, 1]]
+        position = Position.from_grid(grid, 2)
+        self.assertEqual(self.solver.solve(position), 14)
+        self.assertEqual(self.solver.best_move(position), (2, 14))
+
+    def test_solve_win_with_third_marker(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 2, 1, 0, 0],
+                [0, 0, 0, 2, 2, 0, 0],
+                [0, 0, 2, 1, 2, 1, 0],
+                [1, 0, 1, 2, 1, 1, 2]]
+        position = Position.from_grid(grid, 2)
+        self.assertEqual(self.solver.solve(position), 12)
+        self.assertGreater(self.solver.nodes, 0)
+        self.assertEqual(position.moves, 14)
+        self.assertEqual(self.solver.best_move(position), (5, 12))
+
+    def test_solve_loss(self):
+        grid = [[0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 2, 1, 0, 0],
+                [0, 0, 0, 2, 2, 0, 0],
+                [0, 0, 2, 1, 2, 1, 0],
+                [1, 0, 1, 2, 1, 1, 2]]
+        position = Position.from_grid(grid, 2)
+        position.play(5)
+        self.assertEqual(self.solver.solve(position), -12)
+
+    def test_solve_draw(self):
+        grid = [[2, 0, 2, 1, 2, 2, 2],
+                [2, 1, 1, 2, 2, 2, 1],
+                [1, 1, 1, 2, 1, 1, 1],
+                [2, 2, 1, 1, 2, 2, 1],
+                [2, 2, 2, 1, 2, 2, 2],
+                [2, 1, 2, 2, 2, 1, 1]]
+        position = Position.from_grid(grid, 1)
+        self.assertEqual(self.solver.solve(position), 0)
+        self.assertEqual(self.solver.best_move(position), (1, 0))
+
+    def test_clock_stops_solver(self):
+        position = Position.from_moves("1234567123456712")
+        self.solver.clock = TimeManager(float('inf'), max_nodes=2048)
+        self.solver.clock.start(position.moves)
+        with self.assertRaises(SearchTimeout) as timeout:
+            self.solver.best_move(position)
+        self.assertEqual(timeout.exception.args, (NODES,))
+        self.assertEqual(self.solver.nodes, 1024)
+        self.assertEqual(position.key(), Position.from_moves("1234567123456712").key())
@@ -0,0 +1,62 @@
+import unittest
+from stats import SearchStats
+
+class TestSearchStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = SearchStats()
+
+    def test_init(self):
+        self.assertEqual(self.stats.on_iteration, None)
+        self.assertEqual(sum(self.stats.nodes), 0)
+        self.assertEqual(self.stats.cutoffs, [0] * 7)
+        self.assertEqual(self.stats.iterations, [])
+
+    def test_counters(self):
+        self.stats.node(4)
+        self.stats.node(5)
+        self.stats.node(5)
+        self.stats.cutoff(0)
+        self.stats.cutoff(2)
+        self.stats.cutoff(0)
+        self.stats.probe(True)
+        self.stats.probe(False)
+        self.stats.store()
+        summary = self.stats.summary()
+        self.assertEqual(summary["nodes"], 3)
+        self.assertEqual(summary["nodes_per_depth"], [1, 2])
+        self.assertEqual(summary["cutoffs"], 3)
+        self.assertEqual(summary["cutoffs_per_index"], [2, 0, 1, 0, 0, 0, 0])
+        self.assertAlmostEqual(summary["first_move_cutoff_rate"], 2 / 3)
+        self.assertEqual(summary["probes"], 2)
+        self.assertEqual(summary["hits"], 1)
+        self.assertEqual(summary["hit_rate"], 0.5)
+        self.assertEqual(summary["stores"], 1)
+
+    def test_empty_summary(self):
+        summary = self.stats.summary()
+        self.assertEqual(summary["nodes_per_depth"], [])
+        self.assertEqual(summary["first_move_cutoff_rate"], 0.0)
+        self.assertEqual(summary["hit_rate"], 0.0)
+
+    def test_iteration_hook(self):
+        events = []
+        stats = SearchStats(on_iteration=events.append)
+        stats.node(0)
+        stats.iteration(1, 5, 3)
+        stats.node(1)
+        stats.iteration(2, -2, 2)
+        self.assertEqual([event["depth"] for event in events], [1, 2])
+        self.assertEqual([event["nodes"] for event in events], [1, 2])
+        self.assertEqual(events[1]["col"], 2)
+        self.assertGreaterEqual(events[1]["elapsed"], events[0]["elapsed"])
+        self.assertEqual(stats.summary()["iterations"], events)
+
+    def test_reset(self):
+        self.stats.node(3)
+        self.stats.cutoff(1)
+        self.stats.iteration(1, 0, 3)
+        self.stats.reset()
+        summary = self.stats.summary()
+        self.assertEqual(summary["nodes"], 0)
+        self.assertEqual(summary["cutoffs"], 0)
+        self.assertEqual(summary["iterations"], [])
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+from timing import TimeManager, SearchTimeout, TIME, NODES
+
+class TestTimeManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = TimeManager(2)
+
+    def test_init(self):
+        self.assertEqual(self.clock.time_limit, 2)
+        self.assertEqual(self.clock.remaining, None)
+        self.assertEqual(self.clock.increment, 0)
+        self.assertEqual(self.clock.interval, 1024)
+        self.assertEqual(self.clock.max_nodes, None)
+        self.assertEqual(self.clock.iterations, [])
+
+    def test_fixed_budget(self):
+        self.clock.start(10)
+        self.assertEqual(self.clock.budget, 2)
+        self.clock.stop()
+        self.assertEqual(self.clock.remaining, None)
+
+    def test_game_budget(self):
+        clock = TimeManager(total=60)
+        clock.start(0)
+        self.assertEqual(clock.budget, 60 / 21)
+        clock.start(40)
+        self.assertEqual(clock.budget, 60)
+
+    def test_increment(self):
+        clock = TimeManager(total=10, increment=1)
+        with patch("timing.time.perf_counter", side_effect=[100.0, 103.0]):
+            clock.start(41)
+            clock.stop()
+        self.assertEqual(clock.budget, 10)
+        self.assertEqual(clock.remaining, 8)
+
+    def test_first_iteration_is_not_stopped(self):
+        self.clock.time_limit = 0
+        self.clock.start(0)
+        self.clock.check(0)
+        self.clock.iteration_done()
+        self.assertRaises(SearchTimeout, self.clock.check, 0)
+
+    def test_node_limit(self):
+        clock = TimeManager(100, max_nodes=2048)
+        clock.start(0)
+        clock.iteration_done()
+        clock.check(1024)
+        self.assertRaises(SearchTimeout, clock.check, 2048)
+
+    def test_timeout_tells_limit(self):
+        clock = TimeManager(0, max_nodes=1024)
+        clock.start(0)
+        clock.iteration_done()
+        with self.assertRaises(SearchTimeout) as nodes:
+            clock.check(1024)
+        self.assertEqual(nodes.exception.args, (NODES,))
+        with self.assertRaises(SearchTimeout) as timeout:
+            clock.check(0)
+        self.assertEqual(timeout.exception.args, (TIME,))
+
+    def test_cancel(self):
+        self.clock.start(0)
+        self.clock.cancel()
+        self.clock.start(0)
+        self.clock.iteration_done()
+        self.assertRaises(SearchTimeout, self.clock.check, 1024)
+
+    def test_can_finish(self):
+        with patch("timing.time.perf_counter", return_value=100.0):
+            self.clock.start(0)
+        self.assertTrue(self.clock.can_finish())
+        self.clock.iterations = [0.1, 0.3]
+        with patch("timing.time.perf_counter", return_value=100.4):
+            self.assertTrue(self.clock.can_finish())
+        self.clock.iterations = [0.1, 0.3, 0.9]
+        with patch("timing.time.perf_counter", return_value=101.3):
+            self.assertFalse(self.clock.can_finish())
+
+    def test_growth_is_limited(self):
+        with patch("timing.time.perf_counter", return_value=100.0):
+            self.clock.start(0)
+        self.clock.iterations = [0.001, 0.2]
+        with patch("timing.time.perf_counter", return_value=100.201):
+            self.assertTrue(self.clock.can_finish())
+
+    def test_exceeded_with_share(self):
+        clock = TimeManager(2, max_nodes=1000)
+        with patch("timing.time.perf_counter", return_value=100.0):
+            clock.start(0)
+        with patch("timing.time.perf_counter", return_value=101.5):
+            self.assertEqual(clock.exceeded(400, 0.5), TIME)
+            self.assertEqual(clock.exceeded(400), None)
+            self.assertEqual(clock.exceeded(500, 0.5), NODES)
+
+    def test_restart(self):
+        clock = TimeManager(2)
+        with patch("timing.time.perf_counter", return_value=100.0):
+            clock.start(0)
+        clock.iterations = [0.5]
+        with patch("timing.time.perf_counter", return_value=101.5):
+            clock.restart()
+        self.assertEqual(clock.start_time, 101.5)
+        self.assertEqual(clock.budget, 0.5)
+        self.assertEqual(clock.iterations, [])
@@ -0,0 +1,72 @@
+import random
+import unittest
+from bitboard import has_four
+from position import Position
+from tournament import parse_engine, create_engine, random_opening, wilson_interval, play_game, run_tournament
+
+class TestTournament(unittest.TestCase):
+    def setUp(self):
+        self.shallow = parse_engine("shallow:time=none,depth=1,solve=off")
+        self.deep = parse_engine("deep:time=none,depth=5,solve=off")
+
+    def test_parse_engine(self):
+        config = parse_engine("fast:time=0.05,nodes=500,solve=off,book=on")
+        self.assertEqual(config, {"name": "fast", "engine": "minimax", "time": 0.05, "depth": None, "nodes": 500,
+                                  "solve": False, "book": True})
+
+    def test_parse_engine_errors(self):
+        self.assertRaises(ValueError, parse_engine, "fast:speed=1")
+        self.assertRaises(ValueError, parse_engine, "fast:solve=yes")
+        self.assertRaises(ValueError, parse_engine, "fast:depth=deep")
+
+    def test_create_engine(self):
+        ai = create_engine(parse_engine("slow:time=2,nodes=100,book=off"))
+        self.assertEqual(ai.time_limit, 2)
+        self.assertEqual(ai.control.clock.max_nodes, 100)
+        self.assertIsNone(ai.solver.book)
+        self.assertIsNone(create_engine(self.shallow).solver)
+
+    def test_random_opening(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            moves = random_opening(rng, 6)
+            self.assertEqual(len(moves), 6)
+            position = Position.from_moves(moves)
+            self.assertEqual(position.moves, 6)
+            self.assertFalse(has_four(position.current) or has_four(position.opponent))
+
+    def test_random_opening_is_repeatable(self):
+        self.assertEqual(random_opening(random.Random(3), 8), random_opening(random.Random(3), 8))
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(5, 10)
+        self.assertAlmostEqual(low + high, 1.0)
+        self.assertLess(low, 0.5)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        low, high = wilson_interval(10, 10)
+        self.assertGreater(low, 0.6)
+        self.assertEqual(high, 1.0)
+
+    def test_play_game(self):
+        result, records = play_game((self.shallow, self.deep), "44")
+        self.assertIn(result, (0, 1, 2))
+        self.assertGreater(records[0][0], 0)
+        self.assertGreater(records[1][1], records[1][0])
+
+    def test_run_tournament(self):
+        results = run_tournament([self.shallow, self.deep], openings=2, plies=2)
+        pair = results["pairs"][0]
+        self.assertEqual(pair["engines"], ("shallow", "deep"))
+        self.assertEqual(pair["games"], 4)
+        self.assertEqual(pair["wins"] + pair["losses"] + pair["draws"], 4)
+        self.assertLessEqual(pair["low"], pair["score"])
+        self.assertGreaterEqual(pair["high"], pair["score"])
+        self.assertGreater(results["engines"][1]["nodes_per_move"], results["engines"][0]["nodes_per_move"])
+
+    def test_run_tournament_with_workers(self):
+        configs = [self.shallow, self.deep]
+        self.assertEqual(run_tournament(configs, openings=2, plies=2, workers=2)["pairs"],
+                         run_tournament(configs, openings=2, plies=2)["pairs"])
+
+    def test_names_must_differ(self):
+        self.assertRaises(ValueError, run_tournament, [self.shallow, self.shallow])
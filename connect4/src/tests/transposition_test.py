@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER, bound_flag
+
+def store_in_process(path):
+    table = SharedTranspositionTable(path)
+    table.store(4321, 7, 3, LOWER, 1)
+    table.close()
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(memory=32 * 64)
+
+    def test_init(self):
+        self.assertEqual(self.table.buckets, 64)
+        self.assertEqual(len(self.table.keys), 128)
+
+    def test_probe_empty(self):
+        self.assertIsNone(self.table.probe(0))
+        self.assertIsNone(self.table.probe(12345))
+
+    def test_store_and_probe(self):
+        self.table.store(12345, 5, -1000, UPPER, 3)
+        self.assertEqual(self.table.probe(12345), (5, -1000, UPPER, 3))
+
+    def test_store_without_move(self):
+        self.table.store(7, 2, 0, EXACT, None)
+        self.assertEqual(self.table.probe(7), (2, 0, EXACT, None))
+
+    def test_deeper_entry_is_kept(self):
+        self.table.store(1, 8, 10, EXACT, 2)
+        self.table.store(65, 3, 20, LOWER, 4)
+        self.table.store(129, 4, 30, UPPER, 5)
+        self.assertEqual(self.table.probe(1), (8, 10, EXACT, 2))
+        self.assertIsNone(self.table.probe(65))
+        self.assertEqual(self.table.probe(129), (4, 30, UPPER, 5))
+
+    def test_deeper_entry_replaces(self):
+        self.table.store(1, 3, 10, EXACT, 2)
+        self.table.store(65, 6, 20, LOWER, 4)
+        self.assertEqual(self.table.probe(65), (6, 20, LOWER, 4))
+        self.assertEqual(self.table.probe(1), (3, 10, EXACT, 2))
+
+    def test_same_position_is_updated(self):
+        self.table.store(1, 6, 10, EXACT, 2)
+        self.table.store(1, 2, 0, LOWER, 3)
+        self.assertEqual(self.table.probe(1), (2, 0, LOWER, 3))
+
+    def test_clear(self):
+        self.table.store(1, 6, 10, EXACT, 2)
+        self.table.clear()
+        self.assertIsNone(self.table.probe(1))
+
+    def test_bound_flag(self):
+        self.assertEqual(bound_flag(-5, -5, 5), UPPER)
+        self.assertEqual(bound_flag(5, -5, 5), LOWER)
+        self.assertEqual(bound_flag(0, -5, 5), EXACT)
+
+
+class TestSharedTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "table.bin")
+        self.table = SharedTranspositionTable(self.path, memory=32 * 64)
+
+    def tearDown(self):
+        self.table.close()
+        self.directory.cleanup()
+
+    def test_init(self):
+        self.assertEqual(self.table.buckets, 64)
+        self.assertEqual(len(self.table.keys), 128)
+        self.assertEqual(os.path.getsize(self.path), 16 + 32 * 64)
+
+    def test_store_and_probe(self):
+        self.table.store(12345, 5, -1000, UPPER, 3)
+        self.assertEqual(self.table.probe(12345), (5, -1000, UPPER, 3))
+        self.assertIsNone(self.table.probe(54321))
+
+    def test_warm_start_keeps_entries(self):
+        self.table.store(12345, 5, 10, EXACT, 3)
+        self.table.close()
+        self.table = SharedTranspositionTable(self.path, memory=1 << 20)
+        self.assertEqual(self.table.buckets, 64)
+        self.assertEqual(self.table.probe(12345), (5, 10, EXACT, 3))
+
+    def test_cold_start_empties(self):
+        self.table.store(12345, 5, 10, EXACT, 3)
+        self.table.close()
+        self.table = SharedTranspositionTable(self.path, warm_start=False)
+        self.assertIsNone(self.table.probe(12345))
+
+    def test_invalid_file_is_replaced(self):
+        self.table.close()
+        with open(self.path, "wb") as file:
+            file.write(b"not a table")
+        self.table = SharedTranspositionTable(self.path, memory=32 * 64)
+        self.assertEqual(self.table.buckets, 64)
+        self.assertIsNone(self.table.probe(0))
+
+    def test_mixed_slot_is_ignored(self):
+        self.table.store(1, 6, 10, EXACT, 2)
+        slot = 2 * (1 % self.table.buckets)
+        self.table.entries[slot] = self.table.entries[slot] + (1 << 16)
+        self.assertIsNone(self.table.probe(1))
+
+    def test_shared_between_processes(self):
+        with ProcessPoolExecutor(1) as executor:
+            executor.submit(store_in_process, self.path).result()
+        self.assertEqual(self.table.probe(4321), (7, 3, LOWER, 1))
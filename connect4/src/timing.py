@@ -0,0 +1,169 @@
+"""This module provides time management for the iterative deepening search of the Connect 4 AI.
+All times are measured with the same monotonic clock, time.perf_counter."""
+
+import time
+from bitboard import SIZE
+
+# The next iteration is predicted to take this many times longer than the latest one,
+# unless two iterations have been finished and their ratio can be used instead
+BRANCHING = 4
+MIN_BRANCHING = 2
+MAX_BRANCHING = 8
+
+# Limits that can end a search: the time, the nodes, the depth, or an exact result from the solver
+TIME = "time"
+NODES = "nodes"
+DEPTH = "depth"
+SOLVED = "solved"
+
+
+class SearchTimeout(Exception):
+
+    """ Raised inside the search when the time or the nodes for the move have run out.
+        The first argument is the limit that ran out, TIME or NODES. """
+
+
+class TimeManager:
+
+    """ Class for deciding how long the AI may think and for stopping the search in time.
+        By default every move gets the same fixed time. With a time for the whole game
+        the time left is shared between the moves the AI still has to make, and an
+        increment adds time after every move like in a chess clock. The search can
+        also be limited to a number of nodes, which doesn't depend on the machine.
+
+    Attributes:
+        time_limit: seconds for every move when there is no time for the whole game
+        remaining: seconds left for the rest of the game, None for a fixed time per move
+        increment: seconds added to the remaining time after every move
+        interval: the clock is checked once every this many nodes
+        max_nodes: nodes a move may search, None for no limit
+        start_time: clock time when the current move started
+        budget: seconds the current move may take
+        iterations: seconds taken by every finished iteration of the current move """
+
+    def __init__(self, time_limit=5, total=None, increment=0, interval=1024, max_nodes=None):
+
+        """ Constructor for the class.
+
+        Args:
+            time_limit: seconds for every move when total is not given
+            total: seconds for the whole game, None for a fixed time per move
+            increment: seconds added after every move when total is given
+            interval: number of nodes between clock checks
+            max_nodes: nodes a move may search, None for no limit """
+
+        self.time_limit = time_limit
+        self.remaining = total
+        self.increment = increment
+        self.interval = interval
+        self.max_nodes = max_nodes
+        self.start_time = None
+        self.budget = time_limit
+        self.iterations = []
+
+    def start(self, moves):
+
+        """ Starts the clock for a move and decides how long the move may take.
+
+        Args:
+            moves: number of markers on the grid """
+
+        self.start_time = time.perf_counter()
+        self.iterations = []
+        if self.remaining is None:
+            self.budget = self.time_limit
+        else:
+            moves_left = max(1, (SIZE - moves + 1) // 2)
+            self.budget = min(self.remaining, self.remaining / moves_left + self.increment)
+
+    def stop(self):
+
+        """ Stops the clock after a move and updates the time left for the game. """
+
+        if self.remaining is not None and self.start_time is not None:
+            self.remaining = max(0.0, self.remaining - self.elapsed()) + self.increment
+
+    def restart(self):
+
+        """ Starts timing the iterations of a new search within the same move, for example
+            after the solver ran out of its share. The time already spent is taken off
+            the budget of the move and off the time left for the game, so the move still
+            ends at the same time, but the first iteration of the new search is timed on its own. """
+
+        spent = self.elapsed()
+        self.start_time += spent
+        self.budget = max(0.0, self.budget - spent)
+        if self.remaining is not None:
+            self.remaining = max(0.0, self.remaining - spent)
+        self.iterations = []
+
+    def elapsed(self):
+
+        """ Returns the seconds since the move started. """
+
+        return time.perf_counter() - self.start_time
+
+    def check(self, nodes):
+
+        """ Stops the search if the time or the nodes for the move have run out.
+            The first iteration is never stopped, so there is always a move to play.
+
+        Args:
+            nodes: number of nodes searched for the move so far
+
+        Raises:
+            SearchTimeout: if the time or the nodes have run out """
+
+        if not self.iterations:
+            return
+        limit = self.exceeded(nodes)
+        if limit is not None:
+            raise SearchTimeout(limit)
+
+    def exceeded(self, nodes, share=1.0):
+
+        """ Checks if a share of the time or the nodes for the move has run out.
+
+        Args:
+            nodes: number of nodes searched for the move so far
+            share: part of the time and the nodes to check against, 1.0 for all of them
+
+        Returns:
+            NODES or TIME for the limit that has run out, None if neither has """
+
+        if self.max_nodes is not None and nodes >= self.max_nodes * share:
+            return NODES
+        if time.perf_counter() - self.start_time > self.budget * share:
+            return TIME
+        return None
+
+    def cancel(self):
+
+        """ Stops the search at the next check, like a node limit of zero.
+            The limit stays until max_nodes is set again, so a search that
+            hasn't started yet is stopped too. """
+
+        self.max_nodes = 0
+
+    def iteration_done(self):
+
+        """ Records the time of a finished iteration. """
+
+        self.iterations.append(self.elapsed() - sum(self.iterations))
+
+    def can_finish(self):
+
+        """ Predicts if the next iteration can finish in the time that is left.
+            Every iteration takes a few times longer than the previous one, so
+            the next one is estimated from the growth between the latest two.
+
+        Returns:
+            True if the next iteration is expected to finish in time
+            False if it would most likely be stopped before finishing """
+
+        if not self.iterations:
+            return True
+        growth = BRANCHING
+        if len(self.iterations) >= 2 and self.iterations[-2] > 0:
+            growth = min(MAX_BRANCHING, max(MIN_BRANCHING, self.iterations[-1] / self.iterations[-2]))
+        return self.elapsed() + self.iterations[-1] * growth <= self.budget
@@ -0,0 +1,291 @@
+"""This module provides a self-play tournament between AI configurations.
+Games are played on the headless game state, from random openings and
+on worker processes, to compare how strong a configuration is against how much it computes."""
+
+import argparse
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from analysis import create_ai, to_position
+from bitboard import WIDTH, COLUMN_MASKS
+from connect4 import Game
+from mcts import MCTS
+from position import Position
+
+# Settings of a configuration that are not given
+DEFAULTS = {"engine": "minimax", "time": 0.1, "depth": None, "nodes": None, "solve": True, "book": True}
+ENGINES = ("minimax", "mcts")
+
+
+def parse_engine(text):
+
+    """ Reads an AI configuration from the command line.
+
+    Args:
+        text: name and settings like "fast:time=0.05,depth=6,solve=off" or "tree:engine=mcts,time=0.5"
+
+    Returns:
+        dictionary with the name and every setting of the configuration
+
+    Raises:
+        ValueError: if a setting is unknown or has an invalid value """
+
+    name, _, settings = text.partition(":")
+    config = {"name": name, **DEFAULTS}
+    for setting in filter(None, settings.split(",")):
+        key, _, value = setting.partition("=")
+        if key not in DEFAULTS:
+            raise ValueError(f"unknown setting {key}")
+        if key == "engine":
+            if value not in ENGINES:
+                raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+            config[key] = value
+        elif key in ("solve", "book"):
+            if value not in ("on", "off"):
+                raise ValueError(f"{key} must be on or off")
+            config[key] = value == "on"
+        elif value == "none":
+            config[key] = None
+        else:
+            config[key] = float(value) if key == "time" else int(value)
+    return config
+
+
+def create_engine(config):
+
+    """ Creates an AI for a configuration.
+        The tree search engine only uses the time limit of the settings.
+
+    Args:
+        config: configuration from parse_engine
+
+    Returns:
+        ai: AI playing with the settings of the configuration """
+
+    if config["engine"] == "mcts":
+        engine = MCTS()
+        engine.time_limit = config["time"] if config["time"] is not None else 1.0
+        return engine
+    ai = create_ai(config["time"], config["nodes"], config["solve"])
+    if ai.solver is not None and not config["book"]:
+        ai.solver.book = None
+    return ai
+
+
+def random_opening(rng, plies):
+
+    """ Makes a random opening. Winning moves are never picked, and neither
+        are moves that let the opponent win right away if there are others.
+
+    Args:
+        rng: random number generator
+        plies: number of moves in the opening
+
+    Returns:
+        opening as a string of columns from 1 to 7 """
+
+    position = Position()
+    moves = ""
+    for _ in range(plies):
+        safe = position.non_losing_moves() or position.possible()
+        columns = [col for col in range(WIDTH) if safe & COLUMN_MASKS[col] and not position.is_winning_move(col)]
+        if not columns:
+            break
+        col = rng.choice(columns)
+        position.play(col)
+        moves += str(col + 1)
+    return moves
+
+
+def wilson_interval(score, games, z=1.96):
+
+    """ Returns the Wilson score interval of a win rate.
+        Unlike the normal approximation it stays between 0 and 1 and works
+        for few games and for win rates close to 0 or 1.
+
+    Args:
+        score: wins plus half of the draws
+        games: number of games
+        z: number of standard deviations, 1.96 for a 95% interval
+
+    Returns:
+        low: lower end of the interval
+        high: upper end of the interval """
+
+    if games == 0:
+        return 0.0, 1.0
+    rate = score / games
+    spread = z * z / games
+    center = (rate + spread / 2) / (1 + spread)
+    margin = z * math.sqrt(rate * (1 - rate) / games + spread / (4 * games)) / (1 + spread)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def play_game(configs, opening):
+
+    """ Plays one game between two configurations.
+
+    Args:
+        configs: configurations of player 1 and player 2
+        opening: moves played before the AIs take over, as a string of columns from 1 to 7
+
+    Returns:
+        result: the winning player (1 or 2), 0 for a draw
+        records: [moves, nodes, cpu seconds, seconds] of player 1's and player 2's AI """
+
+    engines = [create_engine(config) for config in configs]
+    records = [[0, 0, 0.0, 0.0] for _ in configs]
+    game = Game.from_moves(opening)
+    while game.result is None:
+        ai, record = engines[game.turn - 1], records[game.turn - 1]
+        start, cpu_start = time.perf_counter(), time.process_time()
+        result = ai.search_position(to_position(game.to_moves()), configs[game.turn - 1]["depth"])
+        record[0] += 1
+        record[1] += ai.nodes
+        record[2] += time.process_time() - cpu_start
+        record[3] += time.perf_counter() - start
+
+        game.play(result.col)
+    return game.result, records
+
+
+def play_pairing(task):
+
+    """ Plays one game of a tournament, on a worker process if there are workers.
+
+    Args:
+        task: (pair, swapped, configs, opening), where swapped tells if the
+            second configuration of the pair is player 1
+
+    Returns:
+        pair: the same pair
+        swapped: the same swapped
+        result: result of the game from play_game
+        records: records of the game from play_game """
+
+    pair, swapped, configs, opening = task
+    result, records = play_game(configs[::-1] if swapped else configs, opening)
+    return pair, swapped, result, records
+
+
+def tally(results, pairs, names):
+
+    """ Adds up the games of a tournament.
+
+    Args:
+        results: results of the games from play_pairing
+        pairs: pairs of configuration indexes that play each other
+        names: names of the configurations
+
+    Returns:
+        games: [wins, losses, draws] of every pair, from the view of the pair's first configuration
+        costs: [moves, nodes, cpu seconds, seconds] of every configuration by name """
+
+    games = {pair: [0, 0, 0] for pair in pairs}
+    costs = {name: [0, 0, 0.0, 0.0] for name in names}
+    for pair, swapped, result, records in results:
+        if result == 0:
+            games[pair][2] += 1
+        else:
+            games[pair][0 if (result == 1) != swapped else 1] += 1
+        for index, record in zip(pair[::-1] if swapped else pair, records):
+            costs[names[index]] = [total + value for total, value in zip(costs[names[index]], record)]
+    return games, costs
+
+
+def report(games, costs, names):
+
+    """ Turns the totals of a tournament into results.
+
+    Args:
+        games: [wins, losses, draws] of every pair from tally
+        costs: [moves, nodes, cpu seconds, seconds] of every configuration from tally
+        names: names of the configurations
+
+    Returns:
+        dictionary with the score and its 95% interval of every pair, and the
+        nodes, CPU time and time per move of every configuration """
+
+    standings = []
+    for (first, second), (wins, losses, draws) in games.items():
+        played = wins + losses + draws
+        low, high = wilson_interval(wins + draws / 2, played)
+        standings.append({"engines": (names[first], names[second]), "games": played, "wins": wins,
+                          "losses": losses, "draws": draws, "score": (wins + draws / 2) / played if played else 0.0,
+                          "low": low, "high": high})
+    engines = [{"name": name, "moves": moves, "nodes_per_move": nodes / moves if moves else 0.0,
+                "cpu_per_move": cpu / moves if moves else 0.0, "time_per_move": seconds / moves if moves else 0.0}
+               for name, (moves, nodes, cpu, seconds) in costs.items()]
+    return {"pairs": standings, "engines": engines}
+
+
+def run_tournament(configs, openings=10, plies=4, workers=1, seed=0):
+
+    """ Plays every pair of configurations against each other.
+        Every opening is played twice by each pair, once with each
+        configuration as player 1, so neither one gets better openings.
+
+    Args:
+        configs: configurations from parse_engine, with different names
+        openings: number of random openings for every pair
+        plies: number of moves in every opening
+        workers: number of worker processes, 1 to play in this process
+        seed: seed for the random openings
+
+    Returns:
+        dictionary with the results of every pair, the costs of every configuration and the total time
+
+    Raises:
+        ValueError: if two configurations have the same name """
+
+    names = [config["name"] for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("every configuration needs its own name")
+    rng = random.Random(seed)
+    book = [random_opening(rng, plies) for _ in range(openings)]
+    pairs = list(itertools.combinations(range(len(configs)), 2))
+    tasks = [((first, second), swapped, (configs[first], configs[second]), opening)
+             for first, second in pairs for opening in book for swapped in (False, True)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        games, costs = tally(map(play_pairing, tasks), pairs, names)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            games, costs = tally(executor.map(play_pairing, tasks), pairs, names)
+    elapsed = time.perf_counter() - start
+
+    return {**report(games, costs, names), "time": elapsed}
+
+
+def main():
+
+    """ Runs a tournament from the command line and prints the results. """
+
+    parser = argparse.ArgumentParser(description="Self-play tournament between Connect 4 AI configurations")
+    parser.add_argument("--engine", action="append", type=parse_engine, required=True,
+                        help="configuration like fast:engine=minimax,time=0.05,depth=6,nodes=none,solve=off,"
+                             "book=on, give at least two")
+    parser.add_argument("--openings", type=int, default=10, help="random openings for every pair")
+    parser.add_argument("--plies", type=int, default=4, help="moves in every opening")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the openings")
+    arguments = parser.parse_args()
+    if len(arguments.engine) < 2:
+        parser.error("give at least two configurations")
+
+    results = run_tournament(arguments.engine, arguments.openings, arguments.plies, arguments.workers, arguments.seed)
+    for pair in results["pairs"]:
+        first, second = pair["engines"]
+        print(f'{first} vs {second}: +{pair["wins"]} -{pair["losses"]} ={pair["draws"]}, '
+              f'score {pair["score"]:.3f} (95% {pair["low"]:.3f}-{pair["high"]:.3f})')
+    for engine in results["engines"]:
+        print(f'{engine["name"]}: {engine["moves"]} moves, {engine["nodes_per_move"]:.0f} nodes/move, '
+              f'{engine["cpu_per_move"] * 1000:.1f} ms CPU/move, {engine["time_per_move"] * 1000:.1f} ms/move')
+    print(f'{sum(pair["games"] for pair in results["pairs"])} games in {results["time"]:.2f} s')
+
+
+if __name__ == "__main__":
+    main()
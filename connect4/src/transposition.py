@@ -0,0 +1,185 @@
+"""This module provides a transposition table for the Connect 4 AI.
+The table remembers searched positions so that the same position doesn't have to be searched twice.
+A table can also be kept in a file, so that many processes share it and it survives restarts."""
+
+import mmap
+import os
+from array import array
+
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+SLOT_BYTES = 16
+SCORE_OFFSET = 1 << 15
+NO_MOVE = 15
+
+# A table file starts with this marker and the number of buckets
+MAGIC = b"C4TABLE1"
+HEADER_BYTES = 16
+
+
+class TranspositionTable:
+
+    """ Class for a fixed size transposition table.
+        Every bucket has two slots. The first slot keeps the entry searched to
+        the greatest depth and the second slot always takes the newest entry.
+        An entry is packed into a single integer. The key is stored XORed with
+        the entry, so a slot only matches its key if both were written together.
+
+    Attributes:
+        buckets: number of buckets in the table
+        keys: position key of each slot XORed with its entry
+        entries: packed depth, score, flag and move of each slot """
+
+    def __init__(self, memory=16 * 1024 * 1024):
+
+        """ Constructor for the class. Creates an empty table.
+
+        Args:
+            memory: size of the table in bytes """
+
+        self.buckets = max(1, memory // (2 * SLOT_BYTES))
+        self.keys = array('Q', bytes(16 * self.buckets))
+        self.entries = array('Q', bytes(16 * self.buckets))
+
+    def probe(self, key):
+
+        """ Looks up a position from the table.
+
+        Args:
+            key: key of the position
+
+        Returns:
+            (depth, score, flag, move) of the stored entry, None if the position isn't stored
+            move is None if no best move was stored """
+
+        keys, entries = self.keys, self.entries
+        slot = 2 * (key % self.buckets)
+        entry = entries[slot]
+        if keys[slot] ^ entry != key or not entry:
+            slot += 1
+            entry = entries[slot]
+            if keys[slot] ^ entry != key or not entry:
+                return None
+
+        move = entry & 15
+        return (entry >> 8 & 255, (entry >> 16) - SCORE_OFFSET, entry >> 4 & 15,
+                None if move == NO_MOVE else move)
+
+    def store(self, key, depth, score, flag, move):
+
+        """ Stores a searched position in the table.
+            An entry searched deeper than the one in the first slot replaces it,
+            and the old entry moves to the second slot.
+
+        Args:
+            key: key of the position
+            depth: depth the position was searched to
+            score: score of the position
+            flag: EXACT if score is exact, LOWER or UPPER if it is a bound
+            move: best move found, None if there is none """
+
+        entry = (score + SCORE_OFFSET) << 16 | depth << 8 | flag << 4 | (NO_MOVE if move is None else move)
+        keys, entries = self.keys, self.entries
+        slot = 2 * (key % self.buckets)
+        same = keys[slot] ^ entries[slot] == key
+        if same or depth >= entries[slot] >> 8 & 255:
+            if not same:
+                entries[slot + 1] = entries[slot]
+                keys[slot + 1] = keys[slot]
+        else:
+            slot += 1
+        entries[slot] = entry
+        keys[slot] = key ^ entry
+
+    def clear(self):
+
+        """ Removes all entries from the table. """
+
+        self.entries[:] = array('Q', bytes(16 * self.buckets))
+
+
+class SharedTranspositionTable(TranspositionTable):
+
+    """ Class for a transposition table kept in a memory-mapped file.
+        Every process that opens the same file works on the same table, so
+        positions solved by one worker help all the others, and the entries
+        stay in the file for the next run. A file on a memory file system
+        like /dev/shm is shared without being written to disk.
+        Writes don't take a lock. Two processes writing the same slot at the
+        same time can leave a key and an entry that don't belong together,
+        but then the key no longer matches and the slot is treated as empty.
+
+    Attributes:
+        buckets: number of buckets in the table
+        keys: position key of each slot XORed with its entry
+        entries: packed depth, score, flag and move of each slot
+        path: path of the table file
+        map: memory map of the file """
+
+    def __init__(self, path, memory=16 * 1024 * 1024, warm_start=True):
+
+        """ Constructor for the class. Opens the table file, or creates it if it
+            doesn't exist. An existing table keeps its size and its entries.
+
+        Args:
+            path: path of the table file
+            memory: size of the table in bytes when a new file is created
+            warm_start: True to keep the entries of an existing file, False to empty it
+
+        Raises:
+            OSError: if the file can't be opened """
+
+        # pylint: disable=super-init-not-called
+        self.path = path
+        # Append mode creates a missing file without emptying an existing one
+        with open(path, "a+b") as file:
+            file.seek(0)
+            header = file.read(HEADER_BYTES)
+            buckets = int.from_bytes(header[8:], "little") if header[:8] == MAGIC else 0
+            size = HEADER_BYTES + 2 * SLOT_BYTES * buckets
+            if not buckets or os.fstat(file.fileno()).st_size != size:
+                buckets = max(1, memory // (2 * SLOT_BYTES))
+                size = HEADER_BYTES + 2 * SLOT_BYTES * buckets
+                file.truncate(0)
+                file.write(MAGIC + buckets.to_bytes(8, "little"))
+                file.truncate(size)
+                file.flush()
+            self.map = mmap.mmap(file.fileno(), size)
+
+        self.buckets = buckets
+        view = memoryview(self.map)
+        self.keys = view[HEADER_BYTES:HEADER_BYTES + SLOT_BYTES * buckets].cast('Q')
+        self.entries = view[HEADER_BYTES + SLOT_BYTES * buckets:].cast('Q')
+        if not warm_start:
+            self.clear()
+
+    def close(self):
+
+        """ Writes the table to its file and closes it. The table can't be used after this. """
+
+        self.keys.release()
+        self.entries.release()
+        self.map.flush()
+        self.map.close()
+
+
+def bound_flag(score, alpha, beta):
+
+    """ Tells what kind of score a search with the window (alpha, beta) returned.
+        A score outside the window is only a bound for the real score.
+
+    Args:
+        score: score returned by the search
+        alpha: alpha the search was started with
+        beta: beta the search was started with
+
+    Returns:
+        UPPER if the score is at most alpha, LOWER if it is at least beta, EXACT otherwise """
+
+    if score <= alpha:
+        return UPPER
+    if score >= beta:
+        return LOWER
+    return EXACT
@@ -18,4 +18,12 @@ def coverage_report(ctx):
 
 @task
 def lint(ctx):
-    ctx.run("pylint src", pty=True)
\ No newline at end of file
+    ctx.run("pylint src", pty=True)
+
+@task
+def book(ctx, plies=8):
+    ctx.run(f"python3 src/book.py {plies} src/book.bin", pty=True)
+
+@task
+def bench(ctx, save=False):
+    ctx.run("python3 src/benchmark.py" + (" --save" if save else ""), pty=True)